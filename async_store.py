@@ -0,0 +1,103 @@
+"""
+Async interface to the recognition store for the tool handlers
+Ledger reads run on a pool sized to the ledger's reader connections, writes
+on a single writer thread (SQLite has one writer anyway) and CPU-heavy
+aggregation on its own pool, so a burst of slow analytics never holds up
+post_recognition and none of it blocks the event loop. The analytics pool
+is a fair scheduler that serves tenants round-robin. The derived views
+live in this process, so aggregation uses threads rather than processes
+"""
+import asyncio
+import contextvars
+import functools
+import time
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import List, Optional, Dict, Any, Callable, Tuple
+
+from instrumentation import charge_cpu
+from mcp_schemas import MockDataStore
+from recognition_ledger import RecognitionLedger
+from tenant_quotas import FairScheduler
+
+
+def _charged(fn: Callable) -> Any:
+    start = time.thread_time()
+    try:
+        return fn()
+    finally:
+        charge_cpu(time.thread_time() - start)
+
+
+class AsyncRecognitionStore:
+    def __init__(self, store: MockDataStore, read_workers: Optional[int] = None, analytics_workers: int = 4,
+                 analytics_max_per_tenant: Optional[int] = None):
+        self.store = store
+        read_workers = read_workers or max(1, store.recognitions.read_connections)
+        self._reads = ThreadPoolExecutor(read_workers, thread_name_prefix="store-read")
+        self._writes = ThreadPoolExecutor(1, thread_name_prefix="store-write")
+        self.scheduler = FairScheduler(analytics_workers, analytics_max_per_tenant, thread_name_prefix="analytics")
+
+    @property
+    def ledger(self) -> RecognitionLedger:
+        return self.store.recognitions
+
+    @staticmethod
+    async def _run(executor: Executor, fn: Callable, *args, **kwargs) -> Any:
+        loop = asyncio.get_running_loop()
+        # Run in a copy of the caller's context so pool CPU time is charged to the calling tool
+        context = contextvars.copy_context()
+        return await loop.run_in_executor(executor, context.run, _charged, functools.partial(fn, *args, **kwargs))
+
+    async def read(self, fn: Callable, *args, **kwargs) -> Any:
+        return await self._run(self._reads, fn, *args, **kwargs)
+
+    async def analytics(self, tenant_id: str, fn: Callable, *args, **kwargs) -> Any:
+        """Run a CPU-heavy aggregation for ``tenant_id`` off the event loop, on the fair analytics pool."""
+        return await self._run(self.scheduler.executor(tenant_id), fn, *args, **kwargs)
+
+    async def record_recognitions(self, records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        return await self._run(self._writes, self.store.record_recognitions, records)
+
+    async def write(self, fn: Callable, *args, **kwargs) -> Any:
+        """Run another store update on the writer thread, in order with recognition writes."""
+        return await self._run(self._writes, fn, *args, **kwargs)
+
+    async def catch_up(self) -> List[Dict[str, Any]]:
+        return await self._run(self._writes, self.store.catch_up)
+
+    async def summary(self, tenant_id: str, user_id: str) -> Dict[str, int]:
+        return await self.read(self.ledger.summary, tenant_id, user_id)
+
+    async def monthly_trends(self, tenant_id: str, user_id: str, months: List[str]) -> Dict[str, List[int]]:
+        return await self.read(self.ledger.monthly_trends, tenant_id, user_id, months)
+
+    async def top_behaviors(self, tenant_id: str, user_id: str, limit: int = 5) -> List[Dict[str, Any]]:
+        return await self.read(self.ledger.top_behaviors, tenant_id, user_id, limit)
+
+    async def frequent_collaborators(self, tenant_id: str, user_id: str, limit: int = 5) -> List[Dict[str, Any]]:
+        return await self.read(self.ledger.frequent_collaborators, tenant_id, user_id, limit)
+
+    async def page(
+        self,
+        tenant_id: str,
+        user_id: str,
+        limit: int = 20,
+        before_seq: Optional[int] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+    ) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+        return await self.read(self.ledger.page, tenant_id, user_id, limit, before_seq, since, until)
+
+    async def count(self, tenant_id: str, user_id: str, since: Optional[str] = None,
+                    until: Optional[str] = None) -> int:
+        return await self.read(self.ledger.count, tenant_id, user_id, since, until)
+
+    async def collaborator_counts(self, tenant_id: str, user_id: str) -> Dict[str, int]:
+        return await self.read(self.ledger.collaborator_counts, tenant_id, user_id)
+
+    async def recent_received(self, tenant_id: str, user_id: str, limit: int = 3) -> List[Dict[str, Any]]:
+        return await self.read(self.ledger.recent_received, tenant_id, user_id, limit)
+
+    def shutdown(self) -> None:
+        for executor in (self._reads, self._writes, self.scheduler):
+            executor.shutdown(wait=False)
@@ -0,0 +1,6 @@
+"""
+Micro-benchmarks for the MCP server data structures
+Run individual modules from the repository root, e.g. python -m benchmarks.bench_user_directory
+End to end: benchmarks.workload generates a synthetic dataset and tool-call workload, and
+benchmarks.run_suite replays it in-process or over HTTP with per-tool percentiles as JSON
+"""
@@ -0,0 +1,71 @@
+"""
+Year-long milestone cohort query: AnniversaryIndex range lookup vs. scanning every hire date
+Usage: python -m benchmarks.bench_anniversary_index [--users 500000]
+"""
+import argparse
+import random
+import time
+from datetime import date, timedelta
+from typing import Dict, List
+
+from mcp_schemas import AnniversaryIndex, anniversary_in_year
+
+MILESTONES = [5, 10, 15, 20, 25]
+
+
+def make_hire_dates(count: int, seed: int = 5) -> Dict[str, date]:
+    rng = random.Random(seed)
+    first = date(1990, 1, 1).toordinal()
+    last = date(2024, 12, 31).toordinal()
+    return {f"u{i}": date.fromordinal(rng.randint(first, last)) for i in range(count)}
+
+
+def scan(hire_dates: Dict[str, date], start: date, end: date, milestones: List[int]) -> List[tuple]:
+    results = []
+    for user_id, hire in hire_dates.items():
+        for year in range(start.year, end.year + 1):
+            years = year - hire.year
+            if years in milestones:
+                anniversary = anniversary_in_year(hire, year)
+                if start <= anniversary <= end:
+                    results.append((user_id, anniversary, years))
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=500_000)
+    parser.add_argument("--year", type=int, default=2025)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    hire_dates = make_hire_dates(args.users)
+    index = AnniversaryIndex()
+    start = time.perf_counter()
+    for user_id, hire in hire_dates.items():
+        index.upsert(user_id, hire)
+    print(f"Built index over {args.users:,} hire dates in {time.perf_counter() - start:.2f}s")
+
+    start_date, end_date = date(args.year, 1, 1), date(args.year, 12, 31)
+    for name, fn in (
+        ("scan", lambda: scan(hire_dates, start_date, end_date, MILESTONES)),
+        ("index", lambda: index.celebrants(start_date, end_date, MILESTONES)),
+    ):
+        timings = []
+        for _ in range(args.repeat):
+            t0 = time.perf_counter()
+            cohort = fn()
+            timings.append(time.perf_counter() - t0)
+        print(f"{name:>6}: {len(cohort):,} celebrants, best {min(timings) * 1000:.1f}ms")
+
+    # Incremental update cost when a hire date is corrected
+    rng = random.Random(1)
+    ids = list(hire_dates)
+    t0 = time.perf_counter()
+    for _ in range(10_000):
+        index.upsert(rng.choice(ids), date(2015, 6, 1) + timedelta(days=rng.randrange(365)))
+    print(f"hire-date update: {(time.perf_counter() - t0) / 10_000 * 1e6:.2f}us")
+
+
+if __name__ == "__main__":
+    main()
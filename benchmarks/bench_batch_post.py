@@ -0,0 +1,71 @@
+"""
+Anniversary recognition throughput: post_recognitions_batch vs. one post_recognition request per item
+Requests go through an in-memory FastMCP client, so per-request protocol overhead is included
+Usage: python -m benchmarks.bench_batch_post [--items 500] [--batch-size 500]
+"""
+import argparse
+import asyncio
+import time
+
+from fastmcp import Client
+
+import server
+from mcp_schemas import mock_store
+
+TENANT_ID = "bench-batch"
+
+
+def load_tenant(users: int) -> None:
+    partition = mock_store.directory.partition(TENANT_ID)
+    for i in range(users):
+        partition.upsert({
+            "user_id": f"u{i}",
+            "basic_info": {"name": f"User {i}"},
+            "role_info": {"title": "Engineer", "team": f"Team {i % 20}", "department": "Engineering", "manager_id": "u0"},
+            "employment_info": {"hire_date": "2019-03-15"},
+        })
+
+
+def details(i: int) -> dict:
+    return {
+        "milestone_years": 5,
+        "anniversary_date": "2025-03-15",
+        "recognition_message": f"Happy 5 year anniversary #{i}!",
+        "celebration_type": "team",
+    }
+
+
+async def run(items: int, batch_size: int) -> None:
+    async with Client(server.mcp) as client:
+        start = time.perf_counter()
+        for i in range(items):
+            await client.call_tool("post_recognition", {
+                "sender_id": "u0", "celebrant_id": f"u{1 + i % 999}", "tenant_id": TENANT_ID,
+                "anniversary_details": details(i), "context": {},
+            })
+        single = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for offset in range(0, items, batch_size):
+            batch = [dict(details(i), celebrant_id=f"u{1 + i % 999}") for i in range(offset, min(items, offset + batch_size))]
+            result = await client.call_tool("post_recognitions_batch", {
+                "sender_id": "u0", "tenant_id": TENANT_ID, "recognitions": batch, "context": {},
+            })
+            assert result.structured_content["status"] == "success", result.structured_content
+        batched = time.perf_counter() - start
+
+    print(f"one-at-a-time: {items / single:,.0f} recognitions/s ({single * 1000:.0f}ms for {items:,})")
+    print(f"batched ({batch_size}/request): {items / batched:,.0f} recognitions/s ({batched * 1000:.0f}ms for {items:,})")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--items", type=int, default=500)
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+    load_tenant(1000)
+    asyncio.run(run(args.items, args.batch_size))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Milestone/department breakdown: CohortAggregator vs. the per-celebrant dict loop
+Usage: python -m benchmarks.bench_cohort_aggregation [--sizes 10000 100000 1000000]
+"""
+import argparse
+import random
+import time
+from typing import Any, Dict, List
+
+from cohort_aggregation import CohortAggregator
+
+MILESTONES = [5, 10, 15, 20, 25]
+LOCATIONS = ["San Francisco", "New York", "London", "Remote", "Bangalore", "Berlin"]
+ROLE_LEVELS = ["Junior", "Mid", "Senior", "Staff", "Principal"]
+
+
+def make_celebrants(count: int, seed: int = 9) -> List[Dict[str, Any]]:
+    rng = random.Random(seed)
+    return [
+        {
+            "department": f"Dept {rng.randrange(40)}",
+            "location": rng.choice(LOCATIONS),
+            "role_level": rng.choice(ROLE_LEVELS),
+            "years_of_service": rng.choice(MILESTONES),
+        }
+        for _ in range(count)
+    ]
+
+
+def dict_loop(celebrants: List[Dict[str, Any]], anniversary_years: List[int]) -> List[Dict[str, Any]]:
+    # The row-by-row loop get_group_recognition used before CohortAggregator
+    milestone_distribution = {f"{year}_years": 0 for year in anniversary_years}
+    dept_breakdown = {}
+    for celebrant in celebrants:
+        milestone_key = f"{celebrant['years_of_service']}_years"
+        if milestone_key in milestone_distribution:
+            milestone_distribution[milestone_key] += 1
+        dept = celebrant["department"]
+        if dept not in dept_breakdown:
+            dept_breakdown[dept] = {
+                "department": dept,
+                "celebrant_count": 0,
+                "milestone_breakdown": {f"{year}_years": 0 for year in anniversary_years}
+            }
+        dept_breakdown[dept]["celebrant_count"] += 1
+        if milestone_key in dept_breakdown[dept]["milestone_breakdown"]:
+            dept_breakdown[dept]["milestone_breakdown"][milestone_key] += 1
+    return list(dept_breakdown.values())
+
+
+def columnar(years: List[int], columns: Dict[str, List[Any]], group_by: List[Any]) -> Dict[str, Any]:
+    aggregator = CohortAggregator(years, columns, MILESTONES)
+    return {
+        "milestone_distribution": aggregator.milestone_distribution(),
+        "breakdowns": [aggregator.breakdown(spec) for spec in group_by],
+    }
+
+
+def best_of(fn, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'celebrants':>11} {'dict loop ms':>13} {'columnar ms':>12} {'columnar +loc/role ms':>22}")
+    for size in args.sizes:
+        celebrants = make_celebrants(size)
+        years = [c["years_of_service"] for c in celebrants]
+        columns = {field: [c[field] for c in celebrants] for field in ("department", "location", "role_level")}
+        loop_ms = best_of(lambda: dict_loop(celebrants, MILESTONES), args.repeat)
+        dept_ms = best_of(lambda: columnar(years, {"department": columns["department"]}, ["department"]), args.repeat)
+        multi_ms = best_of(
+            lambda: columnar(years, columns, ["department", "location", "role_level", ["department", "location"]]),
+            args.repeat,
+        )
+        print(f"{size:>11} {loop_ms:>13.1f} {dept_ms:>12.1f} {multi_ms:>22.1f}")
+
+
+if __name__ == "__main__":
+    main()
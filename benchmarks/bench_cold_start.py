@@ -0,0 +1,169 @@
+"""
+Cold start: time until the store is ready and the first lookup is answered, restoring from a
+store snapshot versus rebuilding it (roster upsert + full ledger replay)
+Each start runs in a fresh interpreter; importing the MCP framework is timed separately
+since it is the same for both paths.
+Usage: python -m benchmarks.bench_cold_start [--users 1000000] [--recognitions 2000000] [--tenants 20] [--dir /tmp/cold]
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from typing import Any, Dict
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TEAM_SIZE = 50
+
+
+def tenant_of(i: int, tenants: int) -> str:
+    return f"tenant{i % tenants}"
+
+
+def user(i: int, tenants: int) -> Dict[str, Any]:
+    n = i // tenants
+    return {
+        "user_id": f"u{n}",
+        "basic_info": {"name": f"User {n}", "email": f"user{n}@example.com"},
+        "role_info": {"title": "Engineer", "team": f"Team {n // TEAM_SIZE}", "department": f"Dept {n // 5000}",
+                      "manager_id": f"u{n // TEAM_SIZE * TEAM_SIZE}" if n % TEAM_SIZE else None},
+        "employment_info": {"hire_date": f"{2000 + n % 24}-{1 + n % 12:02d}-{1 + n % 28:02d}"},
+    }
+
+
+def generate(directory: str, users: int, recognitions: int, tenants: int) -> None:
+    from recognition_ledger import RecognitionLedger
+
+    with open(os.path.join(directory, "roster.jsonl"), "w") as f:
+        for i in range(users):
+            f.write(json.dumps({"tenant_id": tenant_of(i, tenants), "user": user(i, tenants)}) + "\n")
+
+    per_tenant = users // tenants
+    rng = random.Random(17)
+    ledger = RecognitionLedger(os.path.join(directory, "ledger.db"))
+    batch = []
+    for i in range(recognitions):
+        sender, recipient = rng.randrange(per_tenant), rng.randrange(per_tenant)
+        batch.append({
+            "recognition_id": f"r{i}", "tenant_id": tenant_of(i, tenants),
+            "sender_id": f"u{sender}", "sender_name": f"User {sender}",
+            "recipient_id": f"u{recipient}", "recipient_name": f"User {recipient}",
+            "program_id": "prog1", "program_name": "Peer Recognition Program",
+            "behavior_id": None, "behavior_name": ("Exceptional Collaboration", "Innovation Excellence", None)[i % 3],
+            "points": 25, "title": "Thanks", "message": f"Recognition #{i}",
+            "created_at": f"2025-{1 + i % 12:02d}-{1 + i % 28:02d}T09:00:00",
+            "status": "completed", "visibility": "public",
+        })
+        if len(batch) == 50_000:
+            ledger.append_many(batch)
+            batch = []
+    ledger.append_many(batch)
+    ledger.close()
+
+
+def load_roster(store: Any, directory: str) -> None:
+    with open(os.path.join(directory, "roster.jsonl")) as f:
+        for line in f:
+            entry = json.loads(line)
+            store.directory.upsert(entry["tenant_id"], entry["user"])
+
+
+def child(mode: str, directory: str) -> None:
+    """Runs in the measured interpreter; prints timings as JSON."""
+    ledger_path = os.path.join(directory, "ledger.db")
+    start = time.perf_counter()
+    if mode == "import":
+        import fastmcp  # noqa: F401
+        print(json.dumps({"import_ms": (time.perf_counter() - start) * 1000}))
+        return
+
+    from store_backends import SQLiteWALBackend
+    import mcp_schemas  # builds the default (empty, in-memory) store
+    imported = time.perf_counter()
+    if mode == "restore":
+        os.environ["STORE_SNAPSHOT_PATH"] = os.path.join(directory, "store.snap")
+        os.environ["STORE_SNAPSHOT_INTERVAL"] = "0"
+        store = mcp_schemas.MockDataStore(SQLiteWALBackend(ledger_path))
+        assert store.restored_from_snapshot
+    else:
+        from store_backends import MemoryBackend
+        store = mcp_schemas.MockDataStore(MemoryBackend())
+        load_roster(store, directory)
+        store.recognitions = SQLiteWALBackend(ledger_path).open_ledger()
+        store.catch_up(collect=False)
+    ready = time.perf_counter()
+
+    # What lookup_team reads for one user: their tenant, team roster, team view and ledger summary
+    users = store.directory_for("tenant0")
+    team = users["u1"]["role_info"]["team"]
+    members = users.team_members(team)
+    analytics = store.team_views.snapshot("tenant0", team, len(members))
+    summary = store.recognitions.summary("tenant0", "u1")
+    first = time.perf_counter()
+    print(json.dumps({
+        "module_import_ms": (imported - start) * 1000,
+        "store_ready_ms": (ready - imported) * 1000,
+        "first_lookup_ms": (first - ready) * 1000,
+        "check": [len(members), analytics["recognition_summary"], summary["total_received"]],
+    }))
+
+
+def measure(mode: str, directory: str) -> Dict[str, Any]:
+    env = {key: value for key, value in os.environ.items()
+           if key not in ("STORE_SNAPSHOT_PATH", "RECOGNITION_LEDGER_PATH", "STORE_BACKEND")}
+    output = subprocess.run([sys.executable, "-m", "benchmarks.bench_cold_start", "--child", mode, "--dir", directory],
+                            cwd=REPO_ROOT, env=env, check=True, capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=1_000_000)
+    parser.add_argument("--recognitions", type=int, default=2_000_000)
+    parser.add_argument("--tenants", type=int, default=20)
+    parser.add_argument("--dir", default="/tmp/bench_cold_start")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--child", choices=["import", "restore", "rebuild"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        child(args.child, args.dir)
+        return
+
+    os.makedirs(args.dir, exist_ok=True)
+    if not os.path.exists(os.path.join(args.dir, "ledger.db")):
+        start = time.perf_counter()
+        generate(args.dir, args.users, args.recognitions, args.tenants)
+        print(f"generated {args.users:,} users / {args.recognitions:,} recognitions "
+              f"in {time.perf_counter() - start:.0f}s", file=sys.stderr)
+
+    rebuild = measure("rebuild", args.dir)
+    if not os.path.exists(os.path.join(args.dir, "store.snap")):
+        # Take the snapshot from a rebuilt store, as a running server would
+        sys.path.insert(0, REPO_ROOT)
+        from store_backends import MemoryBackend, SQLiteWALBackend
+        import mcp_schemas
+        store = mcp_schemas.MockDataStore(MemoryBackend())
+        load_roster(store, args.dir)
+        store.recognitions = SQLiteWALBackend(os.path.join(args.dir, "ledger.db")).open_ledger()
+        store.catch_up(collect=False)
+        store.save_snapshot(os.path.join(args.dir, "store.snap"))
+    snapshot_mb = os.path.getsize(os.path.join(args.dir, "store.snap")) / 1e6
+
+    results = {"import": [measure("import", args.dir) for _ in range(args.runs)],
+               "restore": [measure("restore", args.dir) for _ in range(args.runs)],
+               "rebuild": [rebuild]}
+    best = {mode: min(runs, key=lambda r: sum(v for k, v in r.items() if k.endswith("_ms"))) for mode, runs in results.items()}
+    assert best["restore"]["check"] == best["rebuild"]["check"], (best["restore"]["check"], best["rebuild"]["check"])
+
+    print(f"snapshot: {snapshot_mb:.1f}MB, fastmcp import: {best['import']['import_ms']:.0f}ms (both paths)")
+    print(f"{'path':>8} {'modules ms':>11} {'store ready ms':>15} {'first lookup ms':>16} {'total ms':>9}")
+    for mode in ("restore", "rebuild"):
+        r = best[mode]
+        total = r["module_import_ms"] + r["store_ready_ms"] + r["first_lookup_ms"]
+        print(f"{mode:>8} {r['module_import_ms']:>11.0f} {r['store_ready_ms']:>15.1f} {r['first_lookup_ms']:>16.1f} {total:>9.0f}")
+
+
+if __name__ == "__main__":
+    main()
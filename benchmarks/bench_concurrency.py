@@ -0,0 +1,127 @@
+"""
+1,000 mixed tool calls fired concurrently through an in-memory FastMCP client
+Compares the pooled async handlers with the same work run inline on the event
+loop (what blocking store access does) and reports per-tool tail latency;
+lookup_team runs against a 500-member team by default so its analytics are the slow path
+Usage: python -m benchmarks.bench_concurrency [--calls 1000] [--team-size 500] [--ledger-path /tmp/ledger.db]
+"""
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+from typing import Any, Dict, List, Tuple
+
+TENANT_ID = "bench-concurrency"
+# (tool, share of calls)
+MIX = (("get_recognitions", 0.4), ("post_recognition", 0.3), ("lookup_team", 0.2), ("get_group_recognition", 0.1))
+
+
+def load_tenant(mock_store: Any, users: int, team_size: int) -> None:
+    partition = mock_store.directory.partition(TENANT_ID)
+    for i in range(users):
+        partition.upsert({
+            "user_id": f"u{i}",
+            "basic_info": {"name": f"User {i}"},
+            "role_info": {"title": "Engineer", "team": f"Team {i // team_size}", "department": f"Dept {i // 1000}",
+                          "manager_id": "u0"},
+            "employment_info": {"hire_date": f"{2000 + i % 24}-{1 + i % 12:02d}-{1 + i % 28:02d}"},
+        })
+
+
+def plan_calls(calls: int, users: int, team_size: int, seed: int = 15) -> List[Tuple[str, Dict[str, Any]]]:
+    rng = random.Random(seed)
+    tools, weights = zip(*MIX)
+    plan = []
+    for i in range(calls):
+        tool = rng.choices(tools, weights)[0]
+        user_id = f"u{rng.randrange(users)}"
+        if tool == "post_recognition":
+            arguments = {
+                "sender_id": user_id, "celebrant_id": f"u{rng.randrange(users)}", "tenant_id": TENANT_ID,
+                "anniversary_details": {"milestone_years": 5, "anniversary_date": "2025-03-15",
+                                        "recognition_message": f"Congratulations #{i}", "celebration_type": "team"},
+                "context": {},
+            }
+        elif tool == "lookup_team":
+            # Members of the large first team, each a distinct cache key
+            arguments = {"user_id": f"u{rng.randrange(team_size)}", "tenant_id": TENANT_ID, "context": {}}
+        elif tool == "get_group_recognition":
+            month = 1 + i % 12
+            arguments = {"user_id": user_id, "tenant_id": TENANT_ID, "context": {"milestone_criteria": {
+                "date_range": {"start_date": f"2025-{month:02d}-01", "end_date": f"2025-{month:02d}-28"}}}}
+        else:
+            arguments = {"user_id": user_id, "tenant_id": TENANT_ID, "context": {}}
+        plan.append((tool, arguments))
+    return plan
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))] if ordered else 0.0
+
+
+async def fire(client: Any, plan: List[Tuple[str, Dict[str, Any]]]) -> Tuple[float, Dict[str, List[float]]]:
+    latencies: Dict[str, List[float]] = {tool: [] for tool, _ in MIX}
+
+    async def one(tool: str, arguments: Dict[str, Any]) -> None:
+        start = time.perf_counter()
+        result = await client.call_tool(tool, arguments)
+        latencies[tool].append((time.perf_counter() - start) * 1000)
+        assert result.structured_content["status"] == "success", result.structured_content
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(tool, arguments) for tool, arguments in plan))
+    return time.perf_counter() - start, latencies
+
+
+def report(label: str, elapsed: float, latencies: Dict[str, List[float]]) -> None:
+    total = sum(len(samples) for samples in latencies.values())
+    print(f"\n{label}: {total} calls in {elapsed * 1000:.0f}ms ({total / elapsed:,.0f} calls/s)")
+    print(f"{'tool':>22} {'calls':>6} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    for tool, samples in latencies.items():
+        print(f"{tool:>22} {len(samples):>6} {percentile(samples, 50):>8.1f} {percentile(samples, 95):>8.1f} "
+              f"{percentile(samples, 99):>8.1f} {max(samples, default=0):>8.1f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=1_000)
+    parser.add_argument("--users", type=int, default=20_000)
+    parser.add_argument("--team-size", type=int, default=500)
+    parser.add_argument("--ledger-path", help="file ledger, so reads use the connection pool (default: temp file)")
+    args = parser.parse_args()
+
+    # The store is built on import, so point it at a file ledger first
+    os.environ["RECOGNITION_LEDGER_PATH"] = args.ledger_path or os.path.join(tempfile.mkdtemp(), "ledger.db")
+    from fastmcp import Client
+
+    import server
+    from async_store import AsyncRecognitionStore
+    from mcp_schemas import mock_store
+
+    class InlineStore(AsyncRecognitionStore):
+        """Runs store and analytics work directly on the event loop, like blocking handlers would."""
+
+        @staticmethod
+        async def _run(executor, fn, *fn_args, **fn_kwargs):
+            return fn(*fn_args, **fn_kwargs)
+
+    load_tenant(mock_store, args.users, args.team_size)
+    plan = plan_calls(args.calls, args.users, args.team_size)
+    pooled_store = server.async_store
+
+    async def run() -> None:
+        async with Client(server.mcp) as client:
+            for label, store in (("inline (blocking)", InlineStore(mock_store)), ("pooled async", pooled_store)):
+                server.async_store = store
+                server.response_cache.clear()
+                elapsed, latencies = await fire(client, plan)
+                report(label, elapsed, latencies)
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+cross_functional invitee resolution over a large tenant: resolve_invitees vs. the old scan + list(set(...)) path
+Usage: python -m benchmarks.bench_invitee_resolution [--users 100000]
+"""
+import argparse
+import random
+import time
+from typing import Any, Dict, List
+
+from invitee_resolution import resolve_invitees
+from mcp_schemas import TenantUserPartition
+
+
+def make_partition(count: int) -> TenantUserPartition:
+    partition = TenantUserPartition("bench")
+    for i in range(count):
+        partition.upsert({
+            "user_id": f"u{i}",
+            "basic_info": {"name": f"User {i}"},
+            "role_info": {"title": "Engineer", "team": f"Team {i // 10}", "department": f"Dept {i // 200}", "manager_id": "u0"},
+            "employment_info": {"hire_date": "2019-03-15"},
+        })
+    return partition
+
+
+def old_resolution(users: Dict[str, Dict[str, Any]], celebrant_id: str, invite_criteria: Dict[str, Any]) -> List[Dict[str, Any]]:
+    # The per-user if/elif scan, list(set(...)) merge and list-membership test send_celebration_invite used before
+    suggested_invitees = [uid for uid in users if uid != celebrant_id]
+    all_invitees = list(set(suggested_invitees + invite_criteria.get("required_attendees", []) +
+                            invite_criteria.get("optional_attendees", [])))
+    max_invitees = invite_criteria.get("max_invitees")
+    if max_invitees and len(all_invitees) > max_invitees:
+        all_invitees = all_invitees[:max_invitees]
+    return [
+        {"user_id": uid, "invite_type": "required" if uid in invite_criteria.get("required_attendees", []) else "optional"}
+        for uid in all_invitees
+    ]
+
+
+def new_resolution(partition: TenantUserPartition, celebrant_id: str, invite_criteria: Dict[str, Any],
+                   strength: Dict[str, int]) -> List[Dict[str, Any]]:
+    resolution = resolve_invitees(partition, celebrant_id, invite_criteria, strength)
+    return [
+        {"user_id": uid, "invite_type": "required" if uid in resolution.required else "optional"}
+        for uid in resolution.invitees
+    ]
+
+
+def best_ms(fn, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--required", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    partition = make_partition(args.users)
+    rng = random.Random(4)
+    strength = {f"u{rng.randrange(args.users)}": rng.randint(1, 20) for _ in range(500)}
+    required = [f"u{rng.randrange(args.users)}" for _ in range(args.required)]
+
+    print(f"{'max_invitees':>13} {'old ms':>9} {'new ms':>9}")
+    for max_invitees in (200, 5_000, None):
+        criteria = {"invite_type": "cross_functional", "required_attendees": required, "max_invitees": max_invitees}
+        old_ms = best_ms(lambda: old_resolution(partition.users, "u0", criteria), args.repeat)
+        new_ms = best_ms(lambda: new_resolution(partition, "u0", criteria, strength), args.repeat)
+        print(f"{str(max_invitees):>13} {old_ms:>9.1f} {new_ms:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Org subtree queries over a synthetic hierarchy: recursive direct-report scans vs. the tour intervals
+Usage: python -m benchmarks.bench_org_hierarchy [--users 200000] [--fanout 8]
+"""
+import argparse
+import random
+import time
+from typing import List
+
+from mcp_schemas import TenantUserPartition
+
+
+def make_partition(count: int, fanout: int) -> TenantUserPartition:
+    partition = TenantUserPartition("bench")
+    for i in range(count):
+        partition.upsert({
+            "user_id": f"u{i}",
+            "basic_info": {"name": f"User {i}"},
+            "role_info": {"title": "Engineer", "team": f"Team {i // 10}", "department": f"Dept {i // 200}",
+                          "manager_id": f"u{(i - 1) // fanout}" if i else None},
+            "employment_info": {"hire_date": "2019-03-15"},
+        })
+    return partition
+
+
+def recursive_org(partition: TenantUserPartition, root_id: str) -> List[str]:
+    members = []
+    for report_id in partition.direct_reports(root_id):
+        members.append(report_id)
+        members.extend(recursive_org(partition, report_id))
+    return members
+
+
+def best_ms(fn, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=200_000)
+    parser.add_argument("--fanout", type=int, default=8)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    partition = make_partition(args.users, args.fanout)
+    rng = random.Random(13)
+    roots = ["u1", "u9", "u100"]
+
+    start = time.perf_counter()
+    partition.org.org_members("u0")
+    print(f"first whole-org query for {args.users:,} users (walk + tour build): {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    print(f"{'root':>6} {'members':>9} {'recursive ms':>13} {'interval ms':>12}")
+    for root in roots:
+        size = len(partition.org.org_members(root))
+        recursive_ms = best_ms(lambda: recursive_org(partition, root), args.repeat)
+        interval_ms = best_ms(lambda: partition.org.org_members(root), args.repeat)
+        print(f"{root:>6} {size:>9,} {recursive_ms:>13.2f} {interval_ms:>12.2f}")
+
+    # Membership tests for a cohort, e.g. get_group_recognition with filters.org_root_id
+    cohort = [f"u{rng.randrange(args.users)}" for _ in range(10_000)]
+    chain_ms = best_ms(lambda: [uid for uid in cohort if "u1" in partition.org.manager_chain(uid)], args.repeat)
+    interval_ms = best_ms(lambda: [uid for uid in cohort if partition.org.in_org("u1", uid)], args.repeat)
+    print(f"10k in-org checks: manager chain walk {chain_ms:.2f} ms, interval {interval_ms:.2f} ms")
+
+    # A move costs O(1) index work; queries walk the reports index until a rebuild is worth it
+    moved = partition["u500"]
+    start = time.perf_counter()
+    partition.upsert({**moved, "role_info": {**moved["role_info"], "manager_id": "u2"}})
+    partition.org.org_members("u2")
+    print(f"move + first query after it: {(time.perf_counter() - start) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
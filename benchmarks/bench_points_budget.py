@@ -0,0 +1,126 @@
+"""
+Points budget stress test: 64 concurrent posters against individual limits and a program total
+First drives PointsBudgetLedger from threads (sharded/striped versus one lock for everything) on an
+ample budget and one sized to run out mid-run, then posts through post_recognition with enforcement
+on, once hitting the sender limits (prog1) and once the program total (prog2). Every run checks that
+nothing was overspent; the posts are checked against the points actually in the ledger.
+Usage: python -m benchmarks.bench_points_budget [--posters 64] [--ops 5000] [--posts 10]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import threading
+import time
+from typing import Any, Dict
+
+from points_budget import BudgetExceeded, PointsBudgetLedger
+
+TENANT_ID = "bench-budget"
+
+
+def hammer(ledger: PointsBudgetLedger, posters: int, ops: int, points: int, senders: int) -> Dict[str, Any]:
+    """Each poster thread reserves ``ops`` times, committing 9 in 10 and releasing the rest."""
+    committed = [0] * posters
+    start_line = threading.Barrier(posters)
+
+    def poster(n: int) -> None:
+        start_line.wait()
+        for i in range(ops):
+            sender = f"u{(n * ops + i) % senders}"
+            try:
+                reservation = ledger.reserve(TENANT_ID, "bench", sender, points)
+            except BudgetExceeded:
+                continue
+            if i % 10 == 9:
+                ledger.release(reservation)
+            else:
+                ledger.commit(reservation)
+                committed[n] += points
+
+    threads = [threading.Thread(target=poster, args=(n,)) for n in range(posters)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    program = ledger.stats()["programs"][f"{TENANT_ID}/bench"]
+    over_limit = [f"u{s}" for s in range(senders)
+                  if ledger.balance(TENANT_ID, "bench", f"u{s}")["spent"] > ledger.programs["bench"]["budget_config"]["individual_limit"]]
+    assert program["spent"] == sum(committed), (program, sum(committed))
+    assert program["spent"] <= program["total"] and program["reserved"] == 0, program
+    assert not over_limit, over_limit
+    return {"elapsed_s": elapsed, "ops_per_s": posters * ops / elapsed, "spent": program["spent"],
+            "total": program["total"], "rebalances": program["rebalances"]}
+
+
+async def post_all(server: Any, program_id: str, posters: int, posts: int, points: int) -> Dict[str, Any]:
+    codes: Dict[str, int] = {}
+
+    async def poster(n: int) -> None:
+        for i in range(posts):
+            response = await server.post_recognition(
+                sender_id=f"u{n}", celebrant_id=f"u{(n + i + 1) % posters}", tenant_id=TENANT_ID,
+                anniversary_details={"milestone_years": 5, "anniversary_date": "2025-03-15", "points": points,
+                                     "program_id": program_id, "recognition_message": f"Congratulations #{i}",
+                                     "celebration_type": "team"},
+                context={})
+            code = response["error"]["code"] if response["status"] == "error" else "created"
+            codes[code] = codes.get(code, 0) + 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(poster(n) for n in range(posters)))
+    return {"elapsed_s": time.perf_counter() - start, "codes": codes}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--posters", type=int, default=64)
+    parser.add_argument("--ops", type=int, default=5_000, help="reservations per poster thread")
+    parser.add_argument("--senders", type=int, default=1_000)
+    parser.add_argument("--posts", type=int, default=10, help="post_recognition calls per poster")
+    args = parser.parse_args()
+    # Switch threads often so reservations really interleave
+    sys.setswitchinterval(1e-5)
+
+    points = 10
+    attempted = args.posters * args.ops * points
+    print(f"{args.posters} threads x {args.ops:,} reservations of {points} points from {args.senders:,} senders")
+    print(f"{'program total':>14} {'ledger':>22} {'ops/s':>9} {'spent':>11} {'rebalances':>11}")
+    # Ample, then enough for about two thirds of the attempts so the stripes run dry and rebalance mid-run
+    for total in (attempted, attempted * 2 // 3):
+        budget = {"total_budget": total, "individual_limit": attempted // args.senders, "frequency_limit": "monthly"}
+        for label, shards, stripes in (("one lock", 1, 1), ("64 shards, 16 stripes", 64, 16)):
+            ledger = PointsBudgetLedger({"bench": {"budget_config": budget}}, shards=shards, stripes=stripes)
+            result = hammer(ledger, args.posters, args.ops, points, args.senders)
+            print(f"{total:>14,} {label:>22} {result['ops_per_s']:>9,.0f} {result['spent']:>11,} {result['rebalances']:>11,}")
+
+    os.environ["POINTS_BUDGET_ENFORCE"] = "1"
+    import server
+    from mcp_schemas import mock_store
+
+    partition = mock_store.directory.partition(TENANT_ID)
+    for n in range(args.posters):
+        partition.upsert({"user_id": f"u{n}", "basic_info": {"name": f"User {n}"},
+                          "role_info": {"team": f"Team {n // 8}", "manager_id": "u0"}})
+    for program_id in ("prog1", "prog2"):
+        config = mock_store.programs[program_id]["budget_config"]
+        # Each sender's limit covers about half its posts; for prog2 together they still overrun the program total
+        post_points = config["individual_limit"] // max(1, args.posts // 2)
+        result = asyncio.run(post_all(server, program_id, args.posters, args.posts, post_points))
+        with mock_store.recognitions._reader() as conn:
+            per_sender = dict(conn.execute(
+                "SELECT sender_id, SUM(points) FROM recognitions WHERE tenant_id = ? AND program_id = ? "
+                "GROUP BY sender_id", (TENANT_ID, program_id)).fetchall())
+        spent = sum(per_sender.values())
+        assert spent <= config["total_budget"], spent
+        assert max(per_sender.values()) <= config["individual_limit"], per_sender
+        assert spent == mock_store.budgets.stats()["programs"][f"{TENANT_ID}/{program_id}"]["spent"]
+        print(f"post_recognition {program_id}: {args.posters} posters x {args.posts} posts of {post_points} points, "
+              f"{args.posters * args.posts / result['elapsed_s']:.0f} posts/s, {result['codes']}; ledger holds "
+              f"{spent:,} of {config['total_budget']:,} program points, "
+              f"at most {max(per_sender.values()):,} of {config['individual_limit']:,} per sender")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+get_recognitions latency over a large synthetic recognition ledger
+Usage: python -m benchmarks.bench_recognition_ledger [--count 10000000] [--users 100000]
+"""
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator, List
+
+from recognition_ledger import RecognitionLedger
+
+BEHAVIORS = [("collab1", "Exceptional Collaboration"), ("innov1", "Innovation Excellence"), (None, None)]
+
+
+def synthetic_recognitions(count: int, users: int, tenant_id: str, seed: int = 11) -> Iterator[Dict[str, Any]]:
+    rng = random.Random(seed)
+    start = datetime.now() - timedelta(days=3 * 365)
+    step = (3 * 365 * 86400) / max(count, 1)
+    for i in range(count):
+        sender = rng.randrange(users)
+        recipient = rng.randrange(users)
+        behavior_id, behavior_name = BEHAVIORS[i % len(BEHAVIORS)]
+        yield {
+            "recognition_id": f"rec{i}",
+            "tenant_id": tenant_id,
+            "sender_id": f"u{sender}",
+            "sender_name": f"User {sender}",
+            "recipient_id": f"u{recipient}",
+            "recipient_name": f"User {recipient}",
+            "program_id": "prog1",
+            "program_name": "Peer Recognition Program",
+            "behavior_id": behavior_id,
+            "behavior_name": behavior_name,
+            "points": 25 + 25 * (i % 4),
+            "title": "Great teamwork!",
+            "message": "Thanks for helping with the project deadline",
+            "created_at": (start + timedelta(seconds=i * step)).isoformat(),
+            "status": "completed",
+            "visibility": "public",
+        }
+
+
+def load(ledger: RecognitionLedger, count: int, users: int, tenant_id: str, batch_size: int) -> float:
+    start = time.perf_counter()
+    batch: List[Dict[str, Any]] = []
+    for i, record in enumerate(synthetic_recognitions(count, users, tenant_id), 1):
+        batch.append(record)
+        if len(batch) == batch_size:
+            ledger.append_many(batch)
+            batch = []
+        if i % 1_000_000 == 0:
+            print(f"  loaded {i:,} recognitions ({time.perf_counter() - start:.0f}s)")
+    if batch:
+        ledger.append_many(batch)
+    return time.perf_counter() - start
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--count", type=int, default=10_000_000)
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=2_000)
+    parser.add_argument("--batch-size", type=int, default=50_000)
+    parser.add_argument("--path", help="ledger file to create (defaults to a temporary file)")
+    args = parser.parse_args()
+
+    tenant_id = "bench"
+    path = args.path or os.path.join(tempfile.mkdtemp(), "ledger.db")
+    ledger = RecognitionLedger(path)
+    print(f"Loading {args.count:,} recognitions for {args.users:,} users into {path}")
+    elapsed = load(ledger, args.count, args.users, tenant_id, args.batch_size)
+    print(f"Load: {elapsed:.1f}s ({args.count / elapsed:,.0f} recognitions/s)")
+
+    # Import after loading so the server module picks up the populated ledger
+    import server
+    from mcp_schemas import mock_store
+    mock_store.recognitions = ledger
+
+    rng = random.Random(3)
+    samples = []
+    loop = asyncio.new_event_loop()
+    for _ in range(args.queries):
+        user_id = f"u{rng.randrange(args.users)}"
+        start = time.perf_counter()
+        response = loop.run_until_complete(server.get_recognitions(user_id, tenant_id, {}))
+        samples.append((time.perf_counter() - start) * 1000)
+        assert response["status"] == "success", response["error"]
+    print(f"get_recognitions over {args.queries:,} calls: "
+          f"p50={percentile(samples, 50):.2f}ms p99={percentile(samples, 99):.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
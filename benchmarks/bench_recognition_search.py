@@ -0,0 +1,137 @@
+"""
+Recognition search: BM25 over the inverted index versus scanning messages
+Indexes synthetic recognitions (Zipf-distributed vocabulary, 2k senders,
+3 programs, 10 behaviors, two years of dates) into one TenantSearchIndex,
+then times top-10 queries of rare, common and multi-term words, alone and
+with user, program and date filters. The baseline is a LIKE scan of the
+same messages in SQLite, which has to visit every row, for the
+first --scan-docs of them.
+Usage: python -m benchmarks.bench_recognition_search [--docs 5000000] [--queries 50] [--scan-docs 500000]
+"""
+import argparse
+import random
+import resource
+import sqlite3
+import time
+from datetime import date, timedelta
+from typing import Any, Dict, Iterator, List
+
+from recognition_search import TenantSearchIndex
+
+OPENERS = ("Thank you for", "Huge thanks for", "Shout out for", "Congrats on", "Really appreciated")
+BEHAVIORS = ("Teamwork", "Innovation", "Customer Focus", "Ownership", "Mentoring", "Quality", "Courage",
+             "Inclusion", "Delivery", "Learning")
+PROGRAMS = ("Service Anniversary", "Peer Recognition", "Spot Award")
+# The Zipf rank 1 word is common; the rank --vocabulary one is rare
+QUERIES = {
+    "common": lambda words: words[1],
+    "mid": lambda words: words[200],
+    "rare": lambda words: words[20_000],
+    "two terms": lambda words: f"{words[3]} {words[900]}",
+    "three terms": lambda words: f"{words[10]} {words[150]} {words[4_000]}",
+}
+
+
+def generate(docs: int, vocabulary: int, seed: int = 7) -> Iterator[Dict[str, Any]]:
+    rng = random.Random(seed)
+    words = [f"word{rank}" for rank in range(vocabulary)]
+    cumulative, total = [], 0.0
+    for rank in range(vocabulary):
+        total += 1 / (rank + 1)
+        cumulative.append(total)
+    start = date(2024, 1, 1)
+    for seq in range(1, docs + 1):
+        sender, recipient = rng.randrange(2_000), rng.randrange(2_000)
+        behavior = rng.randrange(len(BEHAVIORS))
+        program = rng.randrange(len(PROGRAMS))
+        body = " ".join(rng.choices(words, cum_weights=cumulative, k=rng.randint(6, 24)))
+        yield {
+            "seq": seq,
+            "title": f"{rng.choice(OPENERS)} {BEHAVIORS[behavior].lower()}",
+            "message": body,
+            "behavior_id": f"b{behavior}",
+            "behavior_name": BEHAVIORS[behavior],
+            "program_id": f"prog{program}",
+            "program_name": PROGRAMS[program],
+            "sender_id": f"u{sender}",
+            "recipient_id": f"u{recipient}",
+            "created_at": (start + timedelta(days=rng.randrange(730))).isoformat() + "T09:00:00",
+            "visibility": "public" if rng.random() < 0.9 else "private",
+        }
+
+
+def quantiles(samples: List[float]) -> str:
+    samples = sorted(samples)
+    p50 = samples[len(samples) // 2]
+    p99 = samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+    return f"{p50:>9.2f} {p99:>9.2f}"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--docs", type=int, default=5_000_000)
+    parser.add_argument("--vocabulary", type=int, default=50_000)
+    parser.add_argument("--queries", type=int, default=50, help="runs of each query")
+    parser.add_argument("--scan-docs", type=int, default=500_000, help="messages in the SQLite LIKE baseline, 0 to skip")
+    args = parser.parse_args()
+
+    index = TenantSearchIndex()
+    scan = sqlite3.connect(":memory:")
+    scan.execute("CREATE TABLE recognitions (seq INTEGER PRIMARY KEY, title TEXT, message TEXT, sender_id TEXT)")
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    rows = []
+    for record in generate(args.docs, args.vocabulary):
+        index.add(record)
+        if record["seq"] <= args.scan_docs:
+            rows.append((record["seq"], record["title"], record["message"], record["sender_id"]))
+            if len(rows) == 10_000:
+                scan.executemany("INSERT INTO recognitions VALUES (?, ?, ?, ?)", rows)
+                rows = []
+        if record["seq"] % 1_000_000 == 0:
+            print(f"  indexed {record['seq']:,} in {time.perf_counter() - start:.0f}s")
+    scan.executemany("INSERT INTO recognitions VALUES (?, ?, ?, ?)", rows)
+    elapsed = time.perf_counter() - start
+    stats = index.stats()
+    rss_growth = (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss_before) / 1024
+    print(f"indexed {stats['documents']:,} recognitions in {elapsed:.0f}s ({stats['documents'] / elapsed:,.0f}/s): "
+          f"{stats['terms']:,} terms, {stats['postings']:,} postings, {stats['segments']} segments, "
+          f"peak RSS +{rss_growth:,.0f} MB (including generation and the scan table)")
+
+    words = [f"word{rank}" for rank in range(args.vocabulary)]
+    filter_sets = {
+        "none": {},
+        "recipient": {"user_id": "u42", "direction": "received"},
+        "program+year": {"program_id": "prog1", "since": "2025-01-01", "until": "2026-01-01"},
+        "behavior+month": {"behavior_id": "b3", "since": "2025-06-01", "until": "2025-07-01"},
+    }
+    print(f"\n{'query':>12} {'filters':>15} {'matches':>10} {'p50 ms':>9} {'p99 ms':>9}")
+    for name, make in QUERIES.items():
+        query = make(words)
+        for label, filters in filter_sets.items():
+            encoded = index.encode_filters(viewer_id="u7", **filters)
+            samples = []
+            for _ in range(args.queries):
+                began = time.perf_counter()
+                _, matched = index.search(query, encoded, 10)
+                samples.append((time.perf_counter() - began) * 1000)
+            print(f"{name:>12} {label:>15} {matched:>10,} {quantiles(samples)}")
+
+    if args.scan_docs:
+        scanned = min(args.scan_docs, args.docs)
+        print(f"\nLIKE scan of {scanned:,} messages in SQLite (linear in messages; "
+              f"x{args.docs / scanned:.0f} for all {args.docs:,})")
+        for name in ("common", "rare"):
+            word = QUERIES[name](words)
+            samples = []
+            for _ in range(3):
+                began = time.perf_counter()
+                # Ranking needs every match, so the scan cannot stop at the first ten
+                scan.execute("SELECT COUNT(*) FROM recognitions WHERE message LIKE ? OR title LIKE ?",
+                             (f"%{word}%", f"%{word}%")).fetchall()
+                samples.append((time.perf_counter() - began) * 1000)
+            print(f"{name:>12} {'none':>15} {'':>10} {quantiles(samples)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Memory per user and per recognition record: nested/row dicts versus compact slotted records
+Users are parsed from JSON lines as a roster import would and recognitions read back from the
+ledger, so every string starts out as its own object; sizes are traced with tracemalloc
+Usage: python -m benchmarks.bench_record_memory [--users 200000] [--recognitions 200000]
+"""
+import argparse
+import json
+import random
+import tracemalloc
+from typing import Any, Callable, List
+
+from compact_records import UserRecord
+from recognition_ledger import RECORD_FIELDS, RecognitionLedger
+
+TITLES = ["Software Engineer", "Senior Software Engineer", "Product Manager", "Designer", "Data Scientist"]
+LOCATIONS = ["San Francisco", "New York", "Remote", "London", "Berlin"]
+BEHAVIORS = [("collab1", "Exceptional Collaboration"), ("innov1", "Innovation Excellence"), (None, None)]
+
+
+def roster_lines(users: int) -> List[str]:
+    rng = random.Random(18)
+    lines = []
+    for i in range(users):
+        lines.append(json.dumps({
+            "user_id": f"user{i}",
+            "basic_info": {"name": f"Person {i}", "email": f"person{i}@company.com", "display_name": f"P{i}",
+                           "avatar_url": f"https://example.com/avatars/{i}.jpg"},
+            "role_info": {"title": rng.choice(TITLES), "department": f"Department {i % 40}",
+                          "team": f"Team {i // 25}", "manager_id": f"user{i // 25 * 25}",
+                          "direct_reports": [], "role_level": rng.choice(["Junior", "Mid", "Senior"])},
+            "employment_info": {"employee_id": f"EMP{i:07d}", "hire_date": f"{2000 + i % 24}-{1 + i % 12:02d}-{1 + i % 28:02d}",
+                                "tenure_years": round(rng.uniform(0, 25), 1), "location": rng.choice(LOCATIONS),
+                                "timezone": "America/Los_Angeles"},
+        }))
+    return lines
+
+
+def fill_ledger(ledger: RecognitionLedger, recognitions: int, users: int) -> None:
+    rng = random.Random(19)
+    batch = []
+    for i in range(recognitions):
+        behavior_id, behavior_name = BEHAVIORS[i % len(BEHAVIORS)]
+        sender, recipient = rng.randrange(users), rng.randrange(users)
+        batch.append({
+            "recognition_id": f"rec{i}", "tenant_id": "bench", "sender_id": f"user{sender}",
+            "sender_name": f"Person {sender}", "recipient_id": f"user{recipient}", "recipient_name": f"Person {recipient}",
+            "program_id": "prog1", "program_name": "Peer Recognition Program", "behavior_id": behavior_id,
+            "behavior_name": behavior_name, "points": rng.choice([25, 50, 75, 100]), "title": "Great work",
+            "message": f"Thanks for the help on #{i}", "created_at": f"2025-{1 + i % 12:02d}-{1 + i % 28:02d}T09:00:00",
+            "status": "completed", "visibility": "public",
+        })
+    ledger.append_many(batch)
+
+
+def traced_bytes(build: Callable[[], List[Any]]) -> int:
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    records = build()
+    size = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del records
+    return size
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=200_000)
+    parser.add_argument("--recognitions", type=int, default=200_000)
+    args = parser.parse_args()
+
+    lines = roster_lines(args.users)
+    nested = traced_bytes(lambda: [json.loads(line) for line in lines])
+    compact = traced_bytes(lambda: [UserRecord.from_dict(json.loads(line)) for line in lines])
+    check = json.loads(lines[-1])
+    assert UserRecord.from_dict(check).to_dict() == check
+
+    ledger = RecognitionLedger()
+    fill_ledger(ledger, args.recognitions, args.users)
+    query = f"SELECT seq, {', '.join(RECORD_FIELDS)} FROM recognitions ORDER BY seq"
+    rows = traced_bytes(lambda: [dict(row) for row in ledger._conn.execute(query)])
+    records = traced_bytes(lambda: list(ledger.iter_since(0)))
+
+    print(f"{'record':>12} {'count':>9} {'dict B/rec':>11} {'compact B/rec':>14} {'saving':>7}")
+    for label, count, before, after in (("user", args.users, nested, compact),
+                                        ("recognition", args.recognitions, rows, records)):
+        print(f"{label:>12} {count:>9,} {before / count:>11.0f} {after / count:>14.0f} {1 - after / before:>7.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Thundering herd: many agents asking the same question in the same instant
+An anniversary announcement invalidates a team's cached reads, then --callers
+agents call lookup_team and get_group_recognition with identical arguments
+at once, each through the full tool stack in-process (as separate sessions
+would reach it) and serializing its own response. Each round runs with
+request coalescing off (every call recomputes) and on (one computation per
+distinct call), spread over --keys distinct teams, and reports the
+computations run, wall time, CPU time and per-caller latency.
+Usage: python -m benchmarks.bench_request_coalescing [--callers 500] [--keys 1] [--team-size 500] [--rounds 3]
+"""
+import argparse
+import asyncio
+import json
+import time
+from typing import Any, Dict, List, Tuple
+
+from benchmarks.bench_concurrency import load_tenant, percentile, TENANT_ID
+
+
+def herd(callers: int, keys: int, team_size: int) -> List[Tuple[str, Dict[str, Any]]]:
+    plan = []
+    for i in range(callers):
+        # The manager of one of the first ``keys`` teams, asking about that team or its March anniversaries
+        user_id = f"u{(i % keys) * team_size}"
+        if i % 2 == 0:
+            plan.append(("lookup_team", {"user_id": user_id, "tenant_id": TENANT_ID, "context": {}}))
+        else:
+            plan.append(("get_group_recognition", {"user_id": user_id, "tenant_id": TENANT_ID, "context": {
+                "milestone_criteria": {"date_range": {"start_date": "2025-03-01", "end_date": "2025-03-31"}}}}))
+    return plan
+
+
+async def stampede(server: Any, plan: List[Tuple[str, Dict[str, Any]]]) -> Tuple[float, float, List[float]]:
+    latencies: List[float] = []
+
+    async def one(tool: str, arguments: Dict[str, Any]) -> None:
+        start = time.perf_counter()
+        response = await getattr(server, tool)(**arguments)
+        json.dumps(response)
+        latencies.append((time.perf_counter() - start) * 1000)
+        assert response["status"] == "success", response
+
+    wall, cpu = time.perf_counter(), time.process_time()
+    await asyncio.gather(*(one(tool, arguments) for tool, arguments in plan))
+    return time.perf_counter() - wall, time.process_time() - cpu, latencies
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--callers", type=int, default=500)
+    parser.add_argument("--keys", type=int, default=1, help="distinct teams the callers ask about")
+    parser.add_argument("--users", type=int, default=20_000)
+    parser.add_argument("--team-size", type=int, default=500)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    import server
+    from mcp_schemas import mock_store
+
+    load_tenant(mock_store, args.users, args.team_size)
+    plan = herd(args.callers, args.keys, args.team_size)
+    distinct = len({(tool, str(arguments)) for tool, arguments in plan})
+    print(f"{args.callers} concurrent calls, {distinct} distinct (tool, arguments) pairs, "
+          f"teams of {args.team_size} in a {args.users:,}-user tenant")
+    print(f"{'coalescing':>10} {'round':>5} {'computed':>8} {'coalesced':>9} {'wall ms':>8} {'cpu ms':>8} "
+          f"{'p50 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+
+    async def run() -> None:
+        for enabled in (False, True):
+            server.request_flights.enabled = enabled
+            for round_number in range(1, args.rounds + 1):
+                # The announcement: the team's cached reads are dropped just before the herd arrives
+                server.response_cache.clear()
+                before = server.request_flights.stats()
+                wall, cpu, latencies = await stampede(server, plan)
+                after = server.request_flights.stats()
+                computed = after["executed"] - before["executed"] if enabled else len(plan)
+                print(f"{'on' if enabled else 'off':>10} {round_number:>5} {computed:>8} "
+                      f"{after['coalesced'] - before['coalesced']:>9} {wall * 1000:>8.0f} {cpu * 1000:>8.0f} "
+                      f"{percentile(latencies, 50):>8.1f} {percentile(latencies, 99):>8.1f} {max(latencies):>8.1f}")
+
+    asyncio.run(run())
+    print(f"\nlargest flight: {server.request_flights.stats()['largest_flight']} callers")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+send_celebration_invite with 5,000 invitees: validated model_dump() responses vs. the FAST_RESPONSES path
+Each call is followed by the JSON encode the transport performs, so the
+numbers cover build + serialize
+Usage: python -m benchmarks.bench_response_serialization [--invitees 5000]
+"""
+import argparse
+import asyncio
+import json
+import time
+import tracemalloc
+
+import mcp_schemas
+import server
+from mcp_schemas import mock_store
+
+TENANT_ID = "bench-invites"
+
+
+def load_tenant(invitees: int) -> None:
+    partition = mock_store.directory.partition(TENANT_ID)
+    for i in range(invitees + 1):
+        partition.upsert({
+            "user_id": f"u{i}",
+            "basic_info": {"name": f"User {i}"},
+            "role_info": {"title": "Engineer", "team": f"Team {i % 50}", "department": "Engineering", "manager_id": "u0"},
+            "employment_info": {"hire_date": "2019-03-15"},
+        })
+
+
+LOOP = asyncio.new_event_loop()
+
+
+def call() -> bytes:
+    response = LOOP.run_until_complete(server.send_celebration_invite(
+        "u1", "u0", TENANT_ID,
+        {"celebration_id": "c1", "milestone_years": 10, "celebration_date": "2025-03-20T10:00:00", "celebration_type": "virtual"},
+        {"invite_type": "cross_functional", "required_attendees": ["u1"]},
+        {},
+    ))
+    assert response["status"] == "success", response["error"]
+    return json.dumps(response, default=str).encode()
+
+
+def measure(fast: bool, repeat: int) -> dict:
+    mcp_schemas.FAST_RESPONSES = fast
+    payload = call()
+    start = time.process_time()
+    for _ in range(repeat):
+        call()
+    cpu_ms = (time.process_time() - start) / repeat * 1000
+
+    # Response construction alone, on the data of a real call
+    data = json.loads(payload)
+    start = time.process_time()
+    for _ in range(repeat):
+        mcp_schemas.CelebrationInviteResponse.dump(status="success", data=data["data"], metadata=data["metadata"])
+    build_ms = (time.process_time() - start) / repeat * 1000
+
+    tracemalloc.start()
+    call()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+    mcp_schemas.CelebrationInviteResponse.dump(status="success", data=data["data"], metadata=data["metadata"])
+    _, build_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "cpu_ms": cpu_ms,
+        "build_ms": build_ms,
+        "peak_kib": peak / 1024,
+        "build_peak_kib": build_peak / 1024,
+        "payload_kib": len(payload) / 1024,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--invitees", type=int, default=5_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    load_tenant(args.invitees)
+    print(f"{'mode':>10} {'call+encode ms':>15} {'call peak KiB':>14} {'build ms':>9} {'build peak KiB':>15} {'payload KiB':>12}")
+    for name, fast in (("validated", False), ("fast", True)):
+        r = measure(fast, args.repeat)
+        print(f"{name:>10} {r['cpu_ms']:>15.2f} {r['peak_kib']:>14.0f} {r['build_ms']:>9.2f} "
+              f"{r['build_peak_kib']:>15.0f} {r['payload_kib']:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
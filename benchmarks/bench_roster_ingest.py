@@ -0,0 +1,109 @@
+"""
+Roster ingestion: rows per second and memory for a large CSV or JSONL export
+Writes a synthetic roster (teams of 10 under a manager, 100 departments),
+loads it into an empty tenant, applies a delta of changed employees (moves
+and new hires) to the indexed tenant, then reloads the full file over it.
+After each stage the peak RSS is compared with the RSS of the loaded
+directory; the difference is what the ingestion itself held at once.
+Usage: python -m benchmarks.bench_roster_ingest [--rows 1000000] [--format csv] [--batch-size 5000]
+"""
+import argparse
+import csv
+import json
+import os
+import resource
+import tempfile
+import time
+from typing import Any, Dict
+
+from mcp_schemas import TenantUserPartition
+from roster_ingest import DEFAULT_BATCH_SIZE, FORMATS, ingest_file
+
+COLUMNS = ("user_id", "name", "email", "title", "department", "team", "manager_id", "role_level",
+           "employee_id", "hire_date", "location")
+
+
+def employee(i: int) -> Dict[str, Any]:
+    team = i // 10
+    return {
+        "user_id": f"emp{i}",
+        "name": f"Employee {i}",
+        "email": f"emp{i}@example.com",
+        "title": "Engineering Manager" if i % 10 == 0 else "Engineer",
+        "department": f"Department {team % 100}",
+        "team": f"Team {team}",
+        # Team leads report to the lead of every tenth team, who are the roots
+        "manager_id": f"emp{team * 10}" if i % 10 else (f"emp{(team // 10) * 100}" if team % 10 else ""),
+        "role_level": "manager" if i % 10 == 0 else "individual_contributor",
+        "employee_id": f"E{i:07d}",
+        "hire_date": f"{2000 + i % 25}-{1 + i % 12:02d}-{1 + i % 28:02d}",
+        "location": ("Austin", "Berlin", "Dublin", "Tokyo")[i % 4],
+    }
+
+
+def write_roster(path: str, fmt: str, rows) -> None:
+    with open(path, "w", newline="", encoding="utf-8") as out:
+        if fmt == "csv":
+            writer = csv.writer(out)
+            writer.writerow(COLUMNS)
+            for row in rows:
+                writer.writerow([row.get(column, "") for column in COLUMNS])
+        else:
+            for row in rows:
+                out.write(json.dumps(row) + "\n")
+
+
+def rss_mb() -> float:
+    with open("/proc/self/statm") as statm:
+        return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+
+
+def peak_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--format", choices=FORMATS, default="csv")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--delta-share", type=float, default=0.1, help="share of employees in the delta file")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="roster-bench-")
+    full_path = os.path.join(workdir, f"roster.{args.format}")
+    delta_path = os.path.join(workdir, f"delta.{args.format}")
+    start = time.perf_counter()
+    write_roster(full_path, args.format, (employee(i) for i in range(args.rows)))
+    changed = int(args.rows * args.delta_share)
+    # Half the delta moves existing employees to another team, half are new hires
+    write_roster(delta_path, args.format, (
+        {"user_id": f"emp{i}", "team": f"Team {i // 10 + 1}"} if n % 2 == 0 else employee(args.rows + n)
+        for n, i in enumerate(range(0, args.rows, max(1, args.rows // changed)))
+    ))
+    print(f"wrote {args.rows:,}-row roster ({os.path.getsize(full_path) / 2 ** 20:,.0f} MB) and "
+          f"{changed:,}-row delta as {args.format} in {time.perf_counter() - start:.1f}s; batches of {args.batch_size:,}")
+
+    partition = TenantUserPartition("bench-roster")
+    print(f"{'stage':>12} {'rows':>10} {'rows/s':>9} {'created':>9} {'updated':>9} {'deleted':>8} {'invalid':>8} "
+          f"{'users':>10} {'RSS MB':>7} {'peak-RSS MB':>12}")
+    for stage, path, mode in (("full load", full_path, "full"), ("delta", delta_path, "delta"),
+                              ("full reload", full_path, "full")):
+        report = ingest_file(partition, path, args.format, mode, args.batch_size)
+        rss = rss_mb()
+        print(f"{stage:>12} {report['rows']:>10,} {report['rows_per_second']:>9,} {report['created']:>9,} "
+              f"{report['updated']:>9,} {report['deleted']:>8,} {report['invalid']:>8,} {report['users']:>10,} "
+              f"{rss:>7,.0f} {max(0.0, peak_mb() - rss):>12,.0f}")
+        if stage == "full load":
+            # The load into an empty tenant leaves indexing to first use: one pass, then row-by-row updates
+            start = time.perf_counter()
+            members = len(partition.team_members("Team 1"))
+            print(f"{'':>12} team/department/manager/anniversary indexes built in one pass on first use: "
+                  f"{time.perf_counter() - start:.2f}s (Team 1 has {members} members)")
+    for path in (full_path, delta_path):
+        os.remove(path)
+    os.rmdir(workdir)
+
+
+if __name__ == "__main__":
+    main()
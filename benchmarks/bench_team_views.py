@@ -0,0 +1,60 @@
+"""
+Team materialized views: refresh cost per recognition write and lookup_team read latency
+Usage: python -m benchmarks.bench_team_views [--team-size 10000] [--writes 200000]
+"""
+import argparse
+import random
+import time
+
+from team_analytics import TeamAnalyticsViews
+
+BEHAVIORS = ["Exceptional Collaboration", "Innovation Excellence", None]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--team-size", type=int, default=10_000)
+    parser.add_argument("--teams", type=int, default=50)
+    parser.add_argument("--writes", type=int, default=200_000)
+    parser.add_argument("--reads", type=int, default=200)
+    args = parser.parse_args()
+
+    tenant_id = "bench"
+    rng = random.Random(2)
+    member_team = {f"u{i}": f"Team {i % args.teams}" for i in range(args.team_size * args.teams)}
+    members = list(member_team)
+    records = []
+    for i in range(args.writes):
+        sender, recipient = rng.choice(members), rng.choice(members)
+        records.append(({
+            "tenant_id": tenant_id,
+            "sender_id": sender,
+            "recipient_id": recipient,
+            "points": rng.choice([25, 50, 75, 100]),
+            "behavior_name": BEHAVIORS[i % len(BEHAVIORS)],
+        }, member_team[sender], member_team[recipient]))
+
+    views = TeamAnalyticsViews()
+    start = time.perf_counter()
+    for record, sender_team, recipient_team in records:
+        views.apply(record, sender_team, recipient_team)
+    per_write = (time.perf_counter() - start) / args.writes
+    print(f"view refresh: {per_write * 1e6:.2f}us per write ({1 / per_write:,.0f} writes/s)")
+
+    team = "Team 0"
+    team_members = [uid for uid, t in member_team.items() if t == team]
+    start = time.perf_counter()
+    for _ in range(args.reads):
+        views.snapshot(tenant_id, team, len(team_members))
+    print(f"team analytics snapshot: {(time.perf_counter() - start) / args.reads * 1e6:.1f}us")
+
+    start = time.perf_counter()
+    for _ in range(args.reads // 10 or 1):
+        views.snapshot(tenant_id, team, len(team_members))
+        [views.member_stats(tenant_id, team, uid) for uid in team_members]
+    elapsed = (time.perf_counter() - start) / (args.reads // 10 or 1)
+    print(f"snapshot + member stats for {len(team_members):,} members: {elapsed * 1000:.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Noisy-neighbour test: a large tenant floods get_group_recognition while a small tenant makes
+interactive lookup_team calls; reports the small tenant's latency with a FIFO analytics pool
+versus the per-tenant fair scheduler, then the large tenant's calls rejected by its token bucket
+(by default the server's burst of 2x the rate, below the tool's cost of 5)
+Usage: python -m benchmarks.bench_tenant_isolation [--big-users 200000] [--flood 40] [--probes 30]
+"""
+import argparse
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List
+
+BIG, SMALL = "bench-big", "bench-small"
+
+
+def load_tenant(mock_store: Any, tenant_id: str, users: int, team_size: int = 50) -> None:
+    partition = mock_store.directory.partition(tenant_id)
+    for i in range(users):
+        partition.upsert({
+            "user_id": f"u{i}",
+            "basic_info": {"name": f"User {i}"},
+            "role_info": {"title": "Engineer", "team": f"Team {i // team_size}", "department": f"Dept {i // 1000}",
+                          "manager_id": f"u{i // team_size * team_size}"},
+            "employment_info": {"hire_date": f"{2000 + i % 24}-{1 + i % 12:02d}-{1 + i % 28:02d}"},
+        })
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))] if ordered else 0.0
+
+
+async def noisy_neighbour(server: Any, flood: int, probes: int) -> Dict[str, Any]:
+    async def heavy(i: int) -> Dict[str, Any]:
+        month = 1 + i % 12
+        # A distinct day range per call, so nothing is served from the response cache
+        return await server.get_group_recognition(user_id="u1", tenant_id=BIG, context={"milestone_criteria": {
+            "anniversary_years": [5, 10, 15, 20],
+            "date_range": {"start_date": f"2025-{month:02d}-01", "end_date": f"2025-{month:02d}-{2 + i % 26:02d}"}}})
+
+    async def probe() -> List[float]:
+        latencies = []
+        for i in range(probes):
+            server.response_cache.clear()
+            start = time.perf_counter()
+            response = await server.lookup_team(user_id=f"u{i % 500}", tenant_id=SMALL, context={})
+            latencies.append((time.perf_counter() - start) * 1000)
+            assert response["status"] == "success", response["error"]
+        return latencies
+
+    start = time.perf_counter()
+    flood_task = asyncio.gather(*(heavy(i) for i in range(flood)))
+    await asyncio.sleep(0.05)  # let the flood queue up first
+    latencies = await probe()
+    responses = await flood_task
+    return {
+        "elapsed_s": time.perf_counter() - start,
+        "small_p50_ms": percentile(latencies, 50),
+        "small_p99_ms": percentile(latencies, 99),
+        "big_ok": sum(r["status"] == "success" for r in responses),
+        "big_limited": sum((r.get("error") or {}).get("code") == "RATE_LIMITED" for r in responses),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--big-users", type=int, default=200_000)
+    parser.add_argument("--small-users", type=int, default=500)
+    parser.add_argument("--flood", type=int, default=40)
+    parser.add_argument("--probes", type=int, default=30)
+    parser.add_argument("--rate", type=float, default=2.0, help="large tenant's token bucket for the last run (tokens/s)")
+    parser.add_argument("--burst", type=float, default=None, help="default: the server's 2x rate")
+    args = parser.parse_args()
+
+    import server
+    from async_store import AsyncRecognitionStore
+    from mcp_schemas import mock_store
+    from tenant_quotas import TenantRateLimiter
+
+    class FifoStore(AsyncRecognitionStore):
+        """The previous analytics pool: one FIFO queue shared by every tenant."""
+
+        def __init__(self, *store_args, **store_kwargs):
+            super().__init__(*store_args, **store_kwargs)
+            self._fifo = ThreadPoolExecutor(self.scheduler.workers, thread_name_prefix="fifo")
+
+        async def analytics(self, tenant_id: str, fn: Callable, *fn_args, **fn_kwargs) -> Any:
+            return await self._run(self._fifo, fn, *fn_args, **fn_kwargs)
+
+    # Calls costing more than the burst must still be limited, not waved through for free
+    limiter = TenantRateLimiter(rate=1)
+    assert [limiter.acquire(BIG, 5) == 0 for _ in range(10)] == [True] + [False] * 9, "cost above burst not limited"
+
+    load_tenant(mock_store, BIG, args.big_users)
+    load_tenant(mock_store, SMALL, args.small_users)
+
+    runs = [
+        ("FIFO analytics pool", FifoStore(mock_store), 0),
+        ("fair scheduler", AsyncRecognitionStore(mock_store), 0),
+        (f"fair + {args.rate:g} tokens/s", AsyncRecognitionStore(mock_store), args.rate),
+    ]
+    print(f"{args.flood} get_group_recognition calls on {args.big_users:,} users vs {args.probes} lookup_team calls")
+    print(f"{'setup':>24} {'small p50 ms':>13} {'small p99 ms':>13} {'big ok':>7} {'big limited':>12} {'total s':>8}")
+    for label, store, rate in runs:
+        server.async_store = store
+        server.tenant_limiter.set_limit(BIG, rate, args.burst)
+        server.response_cache.clear()
+        result = asyncio.run(noisy_neighbour(server, args.flood, args.probes))
+        print(f"{label:>24} {result['small_p50_ms']:>13.1f} {result['small_p99_ms']:>13.1f} {result['big_ok']:>7} "
+              f"{result['big_limited']:>12} {result['elapsed_s']:>8.1f}")
+        store.shutdown()
+
+
+if __name__ == "__main__":
+    main()
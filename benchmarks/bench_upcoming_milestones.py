@@ -0,0 +1,123 @@
+"""
+Upcoming milestones: one vectorized pass over hire dates versus a per-team walk
+Builds a tenant of --users employees in teams of 10 under 1,000 departments
+and reports everyone reaching 1/5/10/.../30 years within the window: once
+with the datetime64 column (first call builds it), once with the pure
+Python fallback, and once the way the nightly HR script did it - list the
+teams, then check every member's hire date team by team, as calling
+lookup_team per team would. Streaming the report as NDJSON is timed too.
+Usage: python -m benchmarks.bench_upcoming_milestones [--users 1000000] [--days 30] [--repeat 5]
+"""
+import argparse
+import json
+import random
+import time
+from datetime import date, timedelta
+from typing import Callable, List
+
+import upcoming_milestones
+from compact_records import UserRecord
+from mcp_schemas import TenantUserPartition, anniversary_in_year
+from upcoming_milestones import UpcomingMilestones
+
+MILESTONES = [1, 5, 10, 15, 20, 25, 30]
+
+
+def build_tenant(users: int, seed: int = 11) -> TenantUserPartition:
+    rng = random.Random(seed)
+    partition = TenantUserPartition("bench-milestones")
+    first_hire = date(1990, 1, 1)
+    span = (date(2026, 1, 1) - first_hire).days
+    records = []
+    for i in range(users):
+        team = i // 10
+        records.append(UserRecord.from_dict({
+            "user_id": f"emp{i}",
+            "basic_info": {"name": f"Employee {i}"},
+            "role_info": {"team": f"Team {team}", "department": f"Department {team % 1_000}",
+                          "manager_id": f"emp{team * 10}" if i % 10 else None},
+            "employment_info": {"hire_date": (first_hire + timedelta(days=rng.randrange(span))).isoformat(),
+                                "tenure_years": 5.5},
+        }))
+        if len(records) == 50_000:
+            partition.upsert_many(records)
+            records = []
+    partition.upsert_many(records)
+    return partition
+
+
+def per_team_walk(partition: TenantUserPartition, start: date, days: int) -> int:
+    end = start + timedelta(days=days)
+    found = 0
+    for team in partition.teams():
+        for user_id in partition.team_members(team):
+            hired = partition[user_id]["employment_info"].get("hire_date")
+            if not hired:
+                continue
+            hired = date.fromisoformat(hired)
+            for year in range(start.year, end.year + 1):
+                if year - hired.year in MILESTONES and start <= anniversary_in_year(hired, year) <= end:
+                    found += 1
+    return found
+
+
+def timed(fn: Callable, repeat: int) -> List[float]:
+    samples = []
+    for _ in range(repeat):
+        began = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - began) * 1000)
+    return sorted(samples)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=1_000_000)
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    partition = build_tenant(args.users)
+    partition.team_members("Team 0")
+    print(f"built and indexed a {args.users:,}-user tenant in {time.perf_counter() - start:.1f}s")
+    as_of = date(2026, 3, 1)
+
+    began = time.perf_counter()
+    report = UpcomingMilestones(partition, as_of, args.days, MILESTONES)
+    first = (time.perf_counter() - began) * 1000
+    print(f"{len(report):,} celebrants in {report.summary()['groups']:,} manager groups over {args.days} days; "
+          f"first call (builds the hire-date column) {first:,.0f} ms")
+    print(f"{'approach':>34} {'min ms':>9} {'median ms':>10}")
+    for label, days in (("datetime64 pass", args.days), ("datetime64 pass, 366 days", 366)):
+        samples = timed(lambda: UpcomingMilestones(partition, as_of, days, MILESTONES), args.repeat)
+        print(f"{label:>34} {samples[0]:>9,.1f} {samples[len(samples) // 2]:>10,.1f}")
+    samples = timed(lambda: UpcomingMilestones(partition, as_of, args.days, MILESTONES, "department"), args.repeat)
+    print(f"{'datetime64 pass by department':>34} {samples[0]:>9,.1f} {samples[len(samples) // 2]:>10,.1f}")
+
+    numpy = upcoming_milestones.np
+    upcoming_milestones.np = None
+    try:
+        upcoming_milestones._columns.clear()
+        samples = timed(lambda: UpcomingMilestones(partition, as_of, args.days, MILESTONES), 1)
+        print(f"{'pure Python fallback':>34} {samples[0]:>9,.1f} {samples[0]:>10,.1f}")
+    finally:
+        upcoming_milestones.np = numpy
+        upcoming_milestones._columns.clear()
+    found = [0]
+    samples = timed(lambda: found.__setitem__(0, per_team_walk(partition, as_of, args.days)), 1)
+    assert found[0] == len(report), (found[0], len(report))
+    print(f"{'per-team walk (nightly script)':>34} {samples[0]:>9,.1f} {samples[0]:>10,.1f}")
+
+    report = UpcomingMilestones(partition, as_of, 366, MILESTONES)
+    began = time.perf_counter()
+    size = lines = 0
+    for group in report.groups():
+        size += len(json.dumps(group)) + 1
+        lines += 1
+    print(f"\nNDJSON of the 366-day report: {len(report):,} celebrants in {lines:,} group lines, "
+          f"{size / 2 ** 20:,.1f} MB, encoded in {time.perf_counter() - began:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Team/department lookup: indexed UserDirectory vs. linear scan of a flat user dict
+Usage: python -m benchmarks.bench_user_directory [--sizes 1000 100000 1000000]
+"""
+import argparse
+import random
+import time
+from typing import Any, Dict, List
+
+from mcp_schemas import TenantUserPartition
+
+TEAMS_PER_DEPARTMENT = 20
+USERS_PER_TEAM = 10
+
+
+def make_users(count: int, seed: int = 7) -> List[Dict[str, Any]]:
+    rng = random.Random(seed)
+    team_count = max(1, count // USERS_PER_TEAM)
+    users = []
+    for i in range(count):
+        team = rng.randrange(team_count)
+        users.append({
+            "user_id": f"u{i}",
+            "basic_info": {"name": f"User {i}"},
+            "role_info": {
+                "title": "Engineer",
+                "team": f"Team {team}",
+                "department": f"Dept {team // TEAMS_PER_DEPARTMENT}",
+                "manager_id": f"u{rng.randrange(count)}",
+            },
+            "employment_info": {"hire_date": "2019-03-15"},
+        })
+    return users
+
+
+def scan_team(users: Dict[str, Dict[str, Any]], team: str) -> List[str]:
+    return [uid for uid, u in users.items() if u["role_info"]["team"] == team]
+
+
+def scan_department(users: Dict[str, Dict[str, Any]], department: str) -> List[str]:
+    return [uid for uid, u in users.items() if u["role_info"]["department"] == department]
+
+
+def time_per_call(fn, args_list: List[Any]) -> float:
+    start = time.perf_counter()
+    for args in args_list:
+        fn(args)
+    return (time.perf_counter() - start) / len(args_list)
+
+
+def run(size: int, queries: int) -> Dict[str, float]:
+    users = make_users(size)
+    flat = {u["user_id"]: u for u in users}
+    partition = TenantUserPartition("bench")
+    start = time.perf_counter()
+    for u in users:
+        partition.upsert(u)
+    build = time.perf_counter() - start
+
+    rng = random.Random(size)
+    teams = [users[rng.randrange(size)]["role_info"]["team"] for _ in range(queries)]
+    departments = [users[rng.randrange(size)]["role_info"]["department"] for _ in range(queries)]
+    # Linear scans are slow at large sizes; a handful of calls is enough to time them
+    scan_queries = max(1, min(queries, 2_000_000 // size))
+
+    return {
+        "users": size,
+        "build_s": build,
+        "scan_team_us": time_per_call(lambda t: scan_team(flat, t), teams[:scan_queries]) * 1e6,
+        "index_team_us": time_per_call(partition.team_members, teams) * 1e6,
+        "scan_dept_us": time_per_call(lambda d: scan_department(flat, d), departments[:scan_queries]) * 1e6,
+        "index_dept_us": time_per_call(partition.department_members, departments) * 1e6,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 100_000, 1_000_000])
+    parser.add_argument("--queries", type=int, default=1_000)
+    args = parser.parse_args()
+
+    print(f"{'users':>10} {'build s':>9} {'scan team us':>13} {'index team us':>14} "
+          f"{'scan dept us':>13} {'index dept us':>14}")
+    for size in args.sizes:
+        r = run(size, args.queries)
+        print(f"{r['users']:>10} {r['build_s']:>9.2f} {r['scan_team_us']:>13.1f} {r['index_team_us']:>14.2f} "
+              f"{r['scan_dept_us']:>13.1f} {r['index_dept_us']:>14.2f}")
+
+
+if __name__ == "__main__":
+    main()
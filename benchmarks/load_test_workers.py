@@ -0,0 +1,170 @@
+"""
+Multi-worker load test: starts server.py with 1..N workers on a shared SQLite-WAL store and
+drives a mixed read/write tool-call load over streamable HTTP from several client processes
+Reports calls/s and latency per worker count, then checks every worker sees every write.
+Only the ledger is shared, so the load sticks to the ledger-backed tools.
+Usage: python -m benchmarks.load_test_workers [--workers 1 2 4 8] [--clients 16] [--duration 10]
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from typing import Any, Dict, List
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CONTEXT = {"agent_type": "recognition"}
+# One post per WRITE_EVERY calls; the rest alternate between the two cached read tools
+WRITE_EVERY = 10
+
+
+def call_tool(port: int, name: str, arguments: Dict[str, Any], request_id: int = 1) -> Dict[str, Any]:
+    body = json.dumps({
+        "jsonrpc": "2.0", "id": request_id, "method": "tools/call",
+        "params": {"name": name, "arguments": arguments},
+    }).encode()
+    request = urllib.request.Request(f"http://127.0.0.1:{port}/mcp", data=body, headers={
+        "Content-Type": "application/json",
+        "Accept": "application/json, text/event-stream",
+    })
+    with urllib.request.urlopen(request, timeout=30) as response:
+        payload = response.read().decode()
+    # Stateless streamable HTTP answers with a single SSE message
+    for line in payload.splitlines():
+        if line.startswith("data:"):
+            payload = line[5:]
+            break
+    message = json.loads(payload)
+    return json.loads(message["result"]["content"][0]["text"])
+
+
+def mixed_call(port: int, i: int) -> Dict[str, Any]:
+    if i % WRITE_EVERY == 0:
+        return call_tool(port, "post_recognition", {
+            "sender_id": "user2", "celebrant_id": "user1", "tenant_id": "load",
+            "anniversary_details": {"milestone_years": 5, "anniversary_date": "2024-03-15",
+                                    "recognition_message": "Congratulations!", "celebration_type": "team"},
+            "context": CONTEXT,
+        }, i)
+    if i % 2:
+        return call_tool(port, "get_recognitions", {"user_id": "user1", "tenant_id": "load", "context": CONTEXT}, i)
+    return call_tool(port, "lookup_team", {"user_id": "user1", "tenant_id": "load", "context": CONTEXT}, i)
+
+
+def client(port: int, deadline: float, client_id: int, results: "multiprocessing.Queue") -> None:
+    latencies, errors, writes = [], 0, 0
+    i = client_id
+    while time.time() < deadline:
+        start = time.perf_counter()
+        try:
+            response = mixed_call(port, i)
+            if response["status"] != "success":
+                errors += 1
+            elif i % WRITE_EVERY == 0:
+                writes += 1
+        except Exception:
+            errors += 1
+        latencies.append(time.perf_counter() - start)
+        i += 1
+    results.put((latencies, errors, writes))
+
+
+def wait_for_port(port: int, timeout: float = 60.0) -> None:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=1):
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"server did not start listening on {port}")
+
+
+def percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))] if ordered else 0.0
+
+
+def run(workers: int, clients: int, duration: float, port: int) -> Dict[str, Any]:
+    with tempfile.TemporaryDirectory() as tmp:
+        env = {
+            **os.environ,
+            "STORE_BACKEND": "sqlite",
+            "RECOGNITION_LEDGER_PATH": os.path.join(tmp, "ledger.db"),
+            "SERVER_WORKERS": str(workers),
+            "SERVER_PORT": str(port),
+        }
+        server = subprocess.Popen([sys.executable, "server.py"], cwd=REPO_ROOT, env=env,
+                                  stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            wait_for_port(port)
+            call_tool(port, "lookup_team", {"user_id": "user1", "tenant_id": "load", "context": CONTEXT})
+
+            results: "multiprocessing.Queue" = multiprocessing.Queue()
+            deadline = time.time() + duration
+            processes = [multiprocessing.Process(target=client, args=(port, deadline, n * 1_000_003, results))
+                         for n in range(clients)]
+            for process in processes:
+                process.start()
+            latencies, errors, writes = [], 0, 0
+            for _ in processes:
+                client_latencies, client_errors, client_writes = results.get()
+                latencies.extend(client_latencies)
+                errors += client_errors
+                writes += client_writes
+            for process in processes:
+                process.join()
+
+            # Fresh requests land on arbitrary workers; each must report every write
+            received = {
+                call_tool(port, "get_recognitions", {"user_id": "user1", "tenant_id": "load", "context": CONTEXT})
+                ["data"]["summary"]["total_received"]
+                for _ in range(4 * workers)
+            }
+        finally:
+            server.terminate()
+            server.wait(timeout=30)
+    return {
+        "workers": workers,
+        "calls": len(latencies),
+        "calls_per_second": round(len(latencies) / duration, 1),
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+        "errors": errors,
+        "writes": writes,
+        "consistent": received == {writes},
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--json", action="store_true", help="print one JSON object per worker count")
+    args = parser.parse_args()
+
+    print(f"{os.cpu_count()} CPUs, {args.clients} client processes, {args.duration:.0f}s per run", file=sys.stderr)
+    if (os.cpu_count() or 1) < max(args.workers) + 1:
+        # Workers and client processes then time-share the same cores, so calls/s cannot scale with workers
+        print(f"warning: fewer CPUs than workers plus clients; run on a host with more than {max(args.workers)} "
+              f"CPUs to measure scaling", file=sys.stderr)
+    if not args.json:
+        print(f"{'workers':>7} {'calls/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'errors':>7} {'consistent':>10}")
+    for workers in args.workers:
+        result = run(workers, args.clients, args.duration, args.port)
+        if args.json:
+            print(json.dumps(result))
+        else:
+            print(f"{result['workers']:>7} {result['calls_per_second']:>9.1f} {result['p50_ms']:>8.2f} "
+                  f"{result['p99_ms']:>8.2f} {result['errors']:>7} {str(result['consistent']):>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,368 @@
+"""
+Replays a benchmarks.workload JSONL workload across all MCP tools and reports throughput and
+p50/p95/p99 latency per tool as JSON, tagged with the git revision so runs can be compared
+inproc awaits the tool handlers directly; http drives the streamable-http endpoint at a target
+QPS, either on a server.py it starts or on a running --url. Both work on a copy of the dataset.
+With --qps, calls are sent on schedule and latency counts from the scheduled time, so a server
+that falls behind shows it as latency instead of sending fewer calls; --qps 0 runs closed-loop
+with --concurrency calls in flight. compare diffs two result files and fails on p99 regressions.
+Usage: python -m benchmarks.run_suite inproc --dataset /tmp/mcp-bench [--qps 0] [--concurrency 8] [--out results.json]
+       python -m benchmarks.run_suite http --dataset /tmp/mcp-bench [--qps 100] [--workers 1] [--url http://host:8080/mcp]
+       python -m benchmarks.run_suite compare baseline.json results.json [--threshold 0.2]
+"""
+import argparse
+import asyncio
+import http.client
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Optional, Dict, Any, List, Tuple
+from urllib.parse import urlsplit
+
+from benchmarks.load_test_workers import wait_for_port
+from benchmarks.workload import REPO_ROOT, load_specs, read_jsonl
+
+DATASET_FILES = ("ledger.db", "ledger.db-wal", "store.snap")
+# Notification ids kept for get_notification_status calls planned with an empty list
+RECENT_NOTIFICATIONS = 64
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))] if ordered else 0.0
+
+
+def notification_ids(value: Any) -> List[str]:
+    """Every notification_id anywhere in a tool response."""
+    if isinstance(value, dict):
+        found = [value["notification_id"]] if isinstance(value.get("notification_id"), str) else []
+        for item in value.values():
+            if isinstance(item, (dict, list)):
+                found.extend(notification_ids(item))
+        return found
+    if isinstance(value, list):
+        return [found for item in value for found in notification_ids(item)]
+    return []
+
+
+class Recorder:
+    """Per-tool latencies and error codes of one run; safe to use from driver threads."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies: Dict[str, List[float]] = {}
+        self.errors: Dict[str, Counter] = {}
+        self.notifications: Dict[str, deque] = {}
+
+    def prepare(self, call: Dict[str, Any]) -> Dict[str, Any]:
+        arguments = call["arguments"]
+        if call["tool"] == "get_notification_status" and not arguments.get("notification_ids"):
+            with self._lock:
+                recent = list(self.notifications.get(arguments["tenant_id"], ()))[-5:]
+            arguments = {**arguments, "notification_ids": recent or ["unknown"]}
+        return arguments
+
+    def record(self, tool: str, latency_ms: float, response: Optional[Dict[str, Any]],
+               error_code: Optional[str] = None, tenant_id: Optional[str] = None) -> None:
+        if error_code is None and (response or {}).get("status") == "error":
+            error_code = (response.get("error") or {}).get("code") or "ERROR"
+        ids = notification_ids(response.get("data")) if response and tenant_id else []
+        with self._lock:
+            self.latencies.setdefault(tool, []).append(latency_ms)
+            errors = self.errors.setdefault(tool, Counter())
+            if error_code is not None:
+                errors[error_code] += 1
+            if ids:
+                self.notifications.setdefault(tenant_id, deque(maxlen=RECENT_NOTIFICATIONS)).extend(ids)
+
+    def summary(self, elapsed: float) -> Dict[str, Any]:
+        def stats(samples: List[float], errors: Counter) -> Dict[str, Any]:
+            return {
+                "calls": len(samples),
+                "errors": sum(errors.values()),
+                "error_codes": dict(errors),
+                "throughput_per_s": round(len(samples) / elapsed, 2) if elapsed else 0.0,
+                "mean_ms": round(sum(samples) / len(samples), 3) if samples else 0.0,
+                "p50_ms": round(percentile(samples, 50), 3),
+                "p95_ms": round(percentile(samples, 95), 3),
+                "p99_ms": round(percentile(samples, 99), 3),
+                "max_ms": round(max(samples, default=0.0), 3),
+            }
+        tools = {tool: stats(samples, self.errors[tool]) for tool, samples in sorted(self.latencies.items())}
+        every = [latency for samples in self.latencies.values() for latency in samples]
+        return {"elapsed_s": round(elapsed, 3), "total": stats(every, sum(self.errors.values(), Counter())),
+                "tools": tools}
+
+
+def git_revision() -> Tuple[Optional[str], bool]:
+    try:
+        revision = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, check=True,
+                                  capture_output=True, text=True).stdout.strip()
+        dirty = bool(subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=REPO_ROOT,
+                                    check=True, capture_output=True, text=True).stdout.strip())
+        return revision, dirty
+    except (OSError, subprocess.CalledProcessError):
+        return None, False
+
+
+def copy_dataset(dataset: str, target: str) -> Dict[str, str]:
+    """Copy the dataset so a run's writes never leak into the next; returns the server's store env."""
+    for name in DATASET_FILES:
+        if os.path.exists(os.path.join(dataset, name)):
+            shutil.copy(os.path.join(dataset, name), os.path.join(target, name))
+    return {
+        "STORE_BACKEND": "sqlite",
+        "RECOGNITION_LEDGER_PATH": os.path.join(target, "ledger.db"),
+        "STORE_SNAPSHOT_PATH": os.path.join(target, "store.snap"),
+        "STORE_SNAPSHOT_INTERVAL": "0",
+    }
+
+
+async def replay_inproc(server: Any, calls: List[Dict[str, Any]], recorder: Optional[Recorder],
+                        qps: float, concurrency: int) -> float:
+    slots = asyncio.Semaphore(concurrency)
+
+    async def one(call: Dict[str, Any], scheduled: Optional[float]) -> None:
+        async with slots:
+            start = scheduled if scheduled is not None else time.perf_counter()
+            arguments = recorder.prepare(call) if recorder else call["arguments"]
+            try:
+                response, error_code = await getattr(server, call["tool"])(**arguments), None
+            except Exception as e:
+                response, error_code = None, type(e).__name__
+            if recorder:
+                recorder.record(call["tool"], (time.perf_counter() - start) * 1000, response, error_code,
+                                arguments.get("tenant_id"))
+
+    begin = time.perf_counter()
+    tasks = []
+    for n, call in enumerate(calls):
+        scheduled = None
+        if qps:
+            scheduled = begin + n / qps
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(one(call, scheduled)))
+    await asyncio.gather(*tasks)
+    return time.perf_counter() - begin
+
+
+def run_inproc(args: argparse.Namespace, calls: List[Dict[str, Any]], warmup: List[Dict[str, Any]]) -> Tuple[float, Recorder]:
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ.update(copy_dataset(args.dataset, tmp))
+        sys.path.insert(0, REPO_ROOT)
+        import server
+
+        recorder = Recorder()
+        asyncio.run(replay_inproc(server, warmup, None, 0, args.concurrency))
+        elapsed = asyncio.run(replay_inproc(server, calls, recorder, args.qps, args.concurrency))
+        server.async_store.shutdown()
+        # Nothing to keep: skip the exit-time snapshot of the temporary copy
+        server.mock_store.snapshot_path = None
+    return elapsed, recorder
+
+
+class HttpClient:
+    """JSON-RPC tools/call over stateless streamable HTTP, one keep-alive connection per thread."""
+
+    def __init__(self, url: str, timeout: float = 60.0):
+        parts = urlsplit(url)
+        self.host, self.port = parts.hostname, parts.port or 80
+        self.path = parts.path or "/mcp"
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _connection(self) -> http.client.HTTPConnection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = self._local.connection = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+        return connection
+
+    def call(self, tool: str, arguments: Dict[str, Any], request_id: int = 1) -> Dict[str, Any]:
+        body = json.dumps({"jsonrpc": "2.0", "id": request_id, "method": "tools/call",
+                           "params": {"name": tool, "arguments": arguments}})
+        connection = self._connection()
+        try:
+            connection.request("POST", self.path, body=body, headers={
+                "Content-Type": "application/json",
+                "Accept": "application/json, text/event-stream",
+            })
+            response = connection.getresponse()
+            payload = response.read().decode()
+        except (OSError, http.client.HTTPException):
+            connection.close()
+            self._local.connection = None
+            raise
+        if response.status != 200:
+            raise RuntimeError(f"HTTP {response.status}")
+        # Stateless streamable HTTP answers with a single SSE message
+        for line in payload.splitlines():
+            if line.startswith("data:"):
+                payload = line[5:]
+                break
+        message = json.loads(payload)
+        if "error" in message:
+            raise RuntimeError(message["error"].get("message", "JSON-RPC error"))
+        return json.loads(message["result"]["content"][0]["text"])
+
+
+def replay_http(client: HttpClient, calls: List[Dict[str, Any]], recorder: Optional[Recorder],
+                qps: float, connections: int) -> float:
+    def one(n: int, call: Dict[str, Any], scheduled: Optional[float]) -> None:
+        start = scheduled if scheduled is not None else time.perf_counter()
+        arguments = recorder.prepare(call) if recorder else call["arguments"]
+        try:
+            response, error_code = client.call(call["tool"], arguments, n), None
+        except Exception as e:
+            response, error_code = None, type(e).__name__
+        if recorder:
+            recorder.record(call["tool"], (time.perf_counter() - start) * 1000, response, error_code,
+                            arguments.get("tenant_id"))
+
+    begin = time.perf_counter()
+    with ThreadPoolExecutor(connections, thread_name_prefix="replay") as pool:
+        for n, call in enumerate(calls):
+            scheduled = None
+            if qps:
+                scheduled = begin + n / qps
+                delay = scheduled - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            pool.submit(one, n, call, scheduled)
+    return time.perf_counter() - begin
+
+
+def run_http(args: argparse.Namespace, calls: List[Dict[str, Any]], warmup: List[Dict[str, Any]]) -> Tuple[float, Recorder]:
+    recorder = Recorder()
+    if args.url:
+        client = HttpClient(args.url)
+        replay_http(client, warmup, None, 0, args.concurrency)
+        return replay_http(client, calls, recorder, args.qps, args.concurrency), recorder
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = {**os.environ, **copy_dataset(args.dataset, tmp),
+               "SERVER_WORKERS": str(args.workers), "SERVER_PORT": str(args.port)}
+        server = subprocess.Popen([sys.executable, "server.py"], cwd=REPO_ROOT, env=env,
+                                  stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            wait_for_port(args.port)
+            client = HttpClient(f"http://127.0.0.1:{args.port}/mcp")
+            replay_http(client, warmup, None, 0, args.concurrency)
+            elapsed = replay_http(client, calls, recorder, args.qps, args.concurrency)
+        finally:
+            server.terminate()
+            server.wait(timeout=60)
+    return elapsed, recorder
+
+
+def print_table(result: Dict[str, Any]) -> None:
+    print(f"{'tool':>24} {'calls':>6} {'errors':>6} {'calls/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}",
+          file=sys.stderr)
+    for tool, stats in list(result["tools"].items()) + [("total", result["total"])]:
+        print(f"{tool:>24} {stats['calls']:>6} {stats['errors']:>6} {stats['throughput_per_s']:>8.1f} "
+              f"{stats['p50_ms']:>8.2f} {stats['p95_ms']:>8.2f} {stats['p99_ms']:>8.2f}", file=sys.stderr)
+
+
+def run(args: argparse.Namespace) -> None:
+    workload_path = args.workload or os.path.join(args.dataset, "workload.jsonl")
+    calls = read_jsonl(workload_path)
+    if args.calls:
+        calls = calls[:args.calls]
+    warmup = calls[:args.warmup]
+
+    elapsed, recorder = (run_inproc if args.mode == "inproc" else run_http)(args, calls, warmup)
+    revision, dirty = git_revision()
+    result = {
+        "mode": args.mode,
+        "revision": revision,
+        "dirty": dirty,
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "cpus": os.cpu_count(),
+        "target_qps": args.qps,
+        "concurrency": args.concurrency,
+        "workers": args.workers if args.mode == "http" and not args.url else None,
+        "url": args.url if args.mode == "http" else None,
+        "dataset": {"path": args.dataset, "tenants": [spec.to_dict() for spec in load_specs(args.dataset)]},
+        "workload": {"path": workload_path, "calls": len(calls), "warmup": len(warmup)},
+        **recorder.summary(elapsed),
+    }
+    print_table(result)
+    output = json.dumps(result, indent=2)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+
+def compare(args: argparse.Namespace) -> None:
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.candidate) as f:
+        candidate = json.load(f)
+
+    def change(old: float, new: float) -> str:
+        return f"{(new - old) / old:+.0%}" if old else "n/a"
+
+    print(f"{baseline['revision']}{'+' if baseline['dirty'] else ''} -> "
+          f"{candidate['revision']}{'+' if candidate['dirty'] else ''} ({candidate['mode']})")
+    print(f"{'tool':>24} {'p50 ms base/new':>17} {'p99 ms base/new':>17} {'calls/s base/new':>17} {'p99':>6}")
+    regressions = []
+    tools = [tool for tool in candidate["tools"] if tool in baseline["tools"]] + ["total"]
+    for tool in tools:
+        old = baseline["tools"][tool] if tool != "total" else baseline["total"]
+        new = candidate["tools"][tool] if tool != "total" else candidate["total"]
+        print(f"{tool:>24} {old['p50_ms']:>8.2f}{new['p50_ms']:>9.2f} {old['p99_ms']:>8.2f}{new['p99_ms']:>9.2f} "
+              f"{old['throughput_per_s']:>8.1f}{new['throughput_per_s']:>9.1f} {change(old['p99_ms'], new['p99_ms']):>6}")
+        if (new["p99_ms"] > old["p99_ms"] * (1 + args.threshold) and new["p99_ms"] - old["p99_ms"] > args.min_ms
+                and tool != "total"):
+            regressions.append(tool)
+    if regressions:
+        print(f"p99 regressed by more than {args.threshold:.0%} for: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    modes = parser.add_subparsers(dest="mode", required=True)
+    for mode in ("inproc", "http"):
+        replay = modes.add_parser(mode)
+        replay.add_argument("--dataset", required=True, help="directory written by benchmarks.workload")
+        replay.add_argument("--workload", help="JSONL workload (default: <dataset>/workload.jsonl)")
+        replay.add_argument("--calls", type=int, default=0, help="replay only the first N calls")
+        replay.add_argument("--warmup", type=int, default=100, help="calls replayed untimed first")
+        replay.add_argument("--qps", type=float, default=0.0 if mode == "inproc" else 100.0,
+                            help="target calls/s; 0 = closed loop")
+        replay.add_argument("--concurrency", type=int, default=8 if mode == "inproc" else 32,
+                            help="calls in flight (http: client connections)")
+        replay.add_argument("--out", help="write the JSON result here instead of stdout")
+        if mode == "http":
+            replay.add_argument("--url", help="replay against this running server instead of starting one")
+            replay.add_argument("--workers", type=int, default=1, help="SERVER_WORKERS of the started server")
+            replay.add_argument("--port", type=int, default=8766)
+    diff = modes.add_parser("compare")
+    diff.add_argument("baseline")
+    diff.add_argument("candidate")
+    diff.add_argument("--threshold", type=float, default=0.2, help="allowed relative p99 increase per tool")
+    diff.add_argument("--min-ms", type=float, default=1.0, help="ignore p99 increases smaller than this")
+    args = parser.parse_args()
+
+    if args.mode == "compare":
+        compare(args)
+    else:
+        run(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,320 @@
+"""
+Synthetic tenants and tool-call workloads for the benchmark suite
+Builds a dataset directory with a store snapshot and SQLite ledger holding N generated tenants
+(users in teams and departments under a manager hierarchy, skewable hire dates, a history of
+recognitions) plus workload.jsonl: one {"tool", "arguments"} object per line, replayed by
+benchmarks.run_suite either in-process or against the streamable-http endpoint
+Usage: python -m benchmarks.workload --dir /tmp/mcp-bench [--tenants 2] [--users 20000] [--recognitions 100000] [--calls 5000]
+"""
+import argparse
+import json
+import math
+import os
+import random
+import sys
+import time
+from datetime import date, datetime, timedelta
+from typing import Optional, Dict, Any, Iterator, List, Tuple
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+TITLES = ("Software Engineer", "Senior Software Engineer", "Staff Engineer", "Product Manager", "Designer",
+          "Data Scientist", "Account Executive", "Support Specialist")
+ROLE_LEVELS = ("Junior", "Mid", "Senior", "Staff")
+LOCATIONS = (("San Francisco", "America/Los_Angeles"), ("New York", "America/New_York"), ("London", "Europe/London"),
+             ("Berlin", "Europe/Berlin"), ("Remote", "UTC"))
+BEHAVIORS = (("collab1", "Exceptional Collaboration"), ("innov1", "Innovation Excellence"), (None, None))
+HIRE_DISTRIBUTIONS = ("uniform", "recent")
+
+# (tool, share of calls) of the default mix; reads dominate as they do in production
+DEFAULT_MIX = (
+    ("get_recognitions", 0.35),
+    ("lookup_team", 0.20),
+    ("get_group_recognition", 0.08),
+    ("post_recognition", 0.15),
+    ("post_recognitions_batch", 0.02),
+    ("send_celebration_invite", 0.05),
+    ("get_notification_status", 0.12),
+    ("get_server_stats", 0.03),
+)
+TOOLS = tuple(tool for tool, _ in DEFAULT_MIX)
+
+
+class TenantSpec:
+    """Shape of one generated tenant.
+
+    Users are split into teams of ``team_size`` spread over ``departments``;
+    each team's first member manages it and reports to the department head.
+    Hire dates cover the last ``hire_years`` years, either uniformly or,
+    with ``hire_distribution="recent"``, skewed toward recent hires as in a
+    growing company. Recognitions mostly stay within a team and are spread
+    over the last ``recognition_days`` days.
+    """
+
+    FIELDS = ("tenant_id", "users", "team_size", "departments", "hire_years", "hire_distribution",
+              "recognitions", "recognition_days", "in_team_share", "seed")
+
+    def __init__(self, tenant_id: str, users: int = 20_000, team_size: int = 12, departments: int = 20,
+                 hire_years: int = 25, hire_distribution: str = "uniform", recognitions: int = 100_000,
+                 recognition_days: int = 365, in_team_share: float = 0.7, seed: int = 20):
+        if hire_distribution not in HIRE_DISTRIBUTIONS:
+            raise ValueError(f"hire_distribution must be one of {', '.join(HIRE_DISTRIBUTIONS)}")
+        self.tenant_id = tenant_id
+        self.users = users
+        self.team_size = team_size
+        self.departments = departments
+        self.hire_years = hire_years
+        self.hire_distribution = hire_distribution
+        self.recognitions = recognitions
+        self.recognition_days = recognition_days
+        self.in_team_share = in_team_share
+        self.seed = seed
+
+    @property
+    def teams(self) -> int:
+        return math.ceil(self.users / self.team_size)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {field: getattr(self, field) for field in self.FIELDS}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "TenantSpec":
+        return cls(**{field: data[field] for field in cls.FIELDS if field in data})
+
+
+def team_of(spec: TenantSpec, i: int) -> int:
+    return i // spec.team_size
+
+
+def department_of(spec: TenantSpec, team: int) -> int:
+    return team % spec.departments
+
+
+def hire_date(spec: TenantSpec, rng: random.Random, today: date) -> date:
+    span = spec.hire_years * 365
+    if spec.hire_distribution == "recent":
+        # Exponential with a mean of a fifth of the span, folded back into it
+        days = int(rng.expovariate(5 / span)) % span
+    else:
+        days = rng.randrange(span)
+    return today - timedelta(days=days)
+
+
+def generate_users(spec: TenantSpec, today: Optional[date] = None) -> Iterator[Dict[str, Any]]:
+    today = today or date.today()
+    rng = random.Random(spec.seed)
+    for i in range(spec.users):
+        team = team_of(spec, i)
+        department = department_of(spec, team)
+        lead = team * spec.team_size
+        # The department's head leads its first team (the team numbered ``department``)
+        head = department * spec.team_size
+        if i != lead:
+            manager_id = f"u{lead}"
+        elif i != head:
+            manager_id = f"u{head}"
+        else:
+            manager_id = None
+        hired = hire_date(spec, rng, today)
+        location, timezone = rng.choice(LOCATIONS)
+        yield {
+            "user_id": f"u{i}",
+            "basic_info": {"name": f"User {i}", "email": f"user{i}@{spec.tenant_id}.example.com",
+                           "display_name": f"User {i}"},
+            "role_info": {"title": rng.choice(TITLES), "department": f"Department {department}",
+                          "team": f"Team {team}", "manager_id": manager_id, "role_level": rng.choice(ROLE_LEVELS)},
+            "employment_info": {"employee_id": f"EMP{i:07d}", "hire_date": hired.isoformat(),
+                                "tenure_years": round((today - hired).days / 365.25, 1),
+                                "location": location, "timezone": timezone},
+        }
+
+
+def random_peer(spec: TenantSpec, rng: random.Random, i: int) -> int:
+    """Another user, from the same team with probability ``in_team_share``."""
+    if rng.random() < spec.in_team_share:
+        start = team_of(spec, i) * spec.team_size
+        peer = start + rng.randrange(min(spec.team_size, spec.users - start))
+    else:
+        peer = rng.randrange(spec.users)
+    return peer if peer != i else (i + 1) % spec.users
+
+
+def generate_recognitions(spec: TenantSpec, now: Optional[datetime] = None) -> Iterator[Dict[str, Any]]:
+    """Ledger records, oldest first."""
+    now = now or datetime.now()
+    rng = random.Random(spec.seed + 1)
+    span = spec.recognition_days * 86400
+    offsets = sorted(rng.randrange(span) for _ in range(spec.recognitions))
+    for n, offset in enumerate(offsets):
+        sender = rng.randrange(spec.users)
+        recipient = random_peer(spec, rng, sender)
+        behavior_id, behavior_name = BEHAVIORS[n % len(BEHAVIORS)]
+        yield {
+            "recognition_id": f"{spec.tenant_id}-r{n}", "tenant_id": spec.tenant_id,
+            "sender_id": f"u{sender}", "sender_name": f"User {sender}",
+            "recipient_id": f"u{recipient}", "recipient_name": f"User {recipient}",
+            "program_id": "prog1", "program_name": "Peer Recognition Program",
+            "behavior_id": behavior_id, "behavior_name": behavior_name,
+            "points": rng.choice((25, 50, 75, 100)), "title": "Thank you",
+            "message": f"Thanks for the help on #{n}",
+            "created_at": (now - timedelta(seconds=span - offset)).isoformat(timespec="seconds"),
+            "status": "completed", "visibility": "public",
+        }
+
+
+def populate(store: Any, spec: TenantSpec, batch_size: int = 50_000) -> None:
+    """Load a generated tenant into a MockDataStore: roster first, then the ledger history."""
+    partition = store.directory.partition(spec.tenant_id)
+    for user in generate_users(spec):
+        partition.upsert(user)
+    batch = []
+    for record in generate_recognitions(spec):
+        batch.append(record)
+        if len(batch) == batch_size:
+            store.recognitions.append_many(batch)
+            batch = []
+    store.recognitions.append_many(batch)
+    store.catch_up(collect=False)
+
+
+def anniversary_details(rng: random.Random, n: int) -> Dict[str, Any]:
+    return {"milestone_years": rng.choice((1, 3, 5, 10, 15, 20)),
+            "anniversary_date": (date.today() + timedelta(days=rng.randrange(-30, 30))).isoformat(),
+            "recognition_message": f"Happy work anniversary! #{n}", "celebration_type": "team"}
+
+
+def plan_call(tool: str, spec: TenantSpec, rng: random.Random, n: int) -> Dict[str, Any]:
+    tenant_id = spec.tenant_id
+    user_id = f"u{rng.randrange(spec.users)}"
+    context = {"agent_type": "recognition"}
+    if tool == "get_recognitions":
+        arguments = {"user_id": user_id, "tenant_id": tenant_id, "context": context}
+        if rng.random() < 0.2:
+            arguments["limit"] = 100
+    elif tool == "lookup_team":
+        arguments = {"user_id": user_id, "tenant_id": tenant_id, "context": context}
+    elif tool == "get_group_recognition":
+        start = date.today() - timedelta(days=rng.randrange(0, 60))
+        arguments = {"user_id": user_id, "tenant_id": tenant_id, "context": {"milestone_criteria": {
+            "anniversary_years": [1, 5, 10, 15, 20],
+            "date_range": {"start_date": start.isoformat(),
+                           "end_date": (start + timedelta(days=rng.choice((7, 30, 90)))).isoformat()}}}}
+        if rng.random() < 0.3:
+            arguments["filters"] = {"group_by": ["team", "location"]}
+    elif tool == "post_recognition":
+        sender = rng.randrange(spec.users)
+        arguments = {"sender_id": f"u{sender}", "celebrant_id": f"u{random_peer(spec, rng, sender)}",
+                     "tenant_id": tenant_id, "anniversary_details": anniversary_details(rng, n), "context": context}
+    elif tool == "post_recognitions_batch":
+        arguments = {"sender_id": user_id, "tenant_id": tenant_id, "context": context, "recognitions": [
+            {"celebrant_id": f"u{rng.randrange(spec.users)}", **anniversary_details(rng, n)} for _ in range(20)]}
+    elif tool == "send_celebration_invite":
+        sender = rng.randrange(spec.users)
+        arguments = {
+            "sender_id": f"u{sender}", "celebrant_id": f"u{random_peer(spec, rng, sender)}", "tenant_id": tenant_id,
+            "celebration_details": {"milestone_years": 5, "celebration_date": date.today().isoformat(),
+                                    "celebration_type": "team", "celebration_id": f"cel{n}"},
+            "invite_criteria": {"invite_type": rng.choice(("team_only", "department", "cross_functional")),
+                                "max_invitees": 20},
+            "context": context,
+        }
+    elif tool == "get_notification_status":
+        # Empty: the drivers fill in notification ids returned by earlier calls
+        arguments = {"tenant_id": tenant_id, "notification_ids": []}
+    elif tool == "get_server_stats":
+        arguments = {}
+    else:
+        raise ValueError(f"unknown tool {tool!r}")
+    return {"tool": tool, "arguments": arguments}
+
+
+def plan_workload(specs: List[TenantSpec], calls: int, mix: Tuple[Tuple[str, float], ...] = DEFAULT_MIX,
+                  seed: int = 20) -> List[Dict[str, Any]]:
+    rng = random.Random(seed)
+    tools, weights = zip(*mix)
+    # Larger tenants get proportionally more traffic
+    tenant_weights = [spec.users for spec in specs]
+    return [plan_call(rng.choices(tools, weights)[0], rng.choices(specs, tenant_weights)[0], rng, n)
+            for n in range(calls)]
+
+
+def parse_mix(text: str) -> Tuple[Tuple[str, float], ...]:
+    """``"get_recognitions=3,lookup_team=1"`` -> mix tuple."""
+    mix = []
+    for item in text.split(","):
+        tool, _, weight = item.partition("=")
+        if tool.strip() not in TOOLS:
+            raise ValueError(f"unknown tool {tool.strip()!r}; expected one of {', '.join(TOOLS)}")
+        mix.append((tool.strip(), float(weight or 1)))
+    return tuple(mix)
+
+
+def write_jsonl(path: str, calls: List[Dict[str, Any]]) -> None:
+    with open(path, "w") as f:
+        for call in calls:
+            f.write(json.dumps(call, separators=(",", ":")) + "\n")
+
+
+def read_jsonl(path: str) -> List[Dict[str, Any]]:
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def build_dataset(directory: str, specs: List[TenantSpec]) -> None:
+    """Write ledger.db, store.snap and spec.json for ``specs`` into ``directory``."""
+    sys.path.insert(0, REPO_ROOT)
+    from mcp_schemas import MockDataStore
+    from store_backends import SQLiteWALBackend
+
+    os.makedirs(directory, exist_ok=True)
+    for name in ("ledger.db", "ledger.db-wal", "ledger.db-shm", "store.snap"):
+        if os.path.exists(os.path.join(directory, name)):
+            os.remove(os.path.join(directory, name))
+    store = MockDataStore(SQLiteWALBackend(os.path.join(directory, "ledger.db")))
+    for spec in specs:
+        populate(store, spec)
+    store.save_snapshot(os.path.join(directory, "store.snap"))
+    store.recognitions.close()
+    with open(os.path.join(directory, "spec.json"), "w") as f:
+        json.dump({"tenants": [spec.to_dict() for spec in specs]}, f, indent=2)
+
+
+def load_specs(directory: str) -> List[TenantSpec]:
+    with open(os.path.join(directory, "spec.json")) as f:
+        return [TenantSpec.from_dict(data) for data in json.load(f)["tenants"]]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--dir", required=True, help="dataset directory to (re)create")
+    parser.add_argument("--tenants", type=int, default=2)
+    parser.add_argument("--users", type=int, default=20_000, help="users per tenant")
+    parser.add_argument("--team-size", type=int, default=12)
+    parser.add_argument("--departments", type=int, default=20)
+    parser.add_argument("--hire-years", type=int, default=25)
+    parser.add_argument("--hire-distribution", choices=HIRE_DISTRIBUTIONS, default="uniform")
+    parser.add_argument("--recognitions", type=int, default=100_000, help="ledger history per tenant")
+    parser.add_argument("--recognition-days", type=int, default=365)
+    parser.add_argument("--calls", type=int, default=5_000, help="tool calls in workload.jsonl")
+    parser.add_argument("--mix", type=parse_mix, default=DEFAULT_MIX, help="e.g. get_recognitions=3,lookup_team=1")
+    parser.add_argument("--seed", type=int, default=20)
+    parser.add_argument("--workload-only", action="store_true", help="rewrite workload.jsonl from the existing spec.json")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    if args.workload_only:
+        specs = load_specs(args.dir)
+    else:
+        specs = [TenantSpec(f"bench{n}", users=args.users, team_size=args.team_size, departments=args.departments,
+                            hire_years=args.hire_years, hire_distribution=args.hire_distribution,
+                            recognitions=args.recognitions, recognition_days=args.recognition_days, seed=args.seed + n)
+                 for n in range(args.tenants)]
+        build_dataset(args.dir, specs)
+    write_jsonl(os.path.join(args.dir, "workload.jsonl"), plan_workload(specs, args.calls, args.mix, args.seed))
+    print(f"{args.dir}: {len(specs)} tenants, {sum(spec.users for spec in specs):,} users, "
+          f"{sum(spec.recognitions for spec in specs):,} recognitions, {args.calls:,} calls "
+          f"in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+Columnar milestone/department aggregation for group recognition cohorts
+Group-by columns are dictionary-encoded once and counted with a single
+bincount per grouping; NumPy is used when installed, with a pure-Python
+Counter fallback otherwise
+"""
+from collections import Counter
+from typing import List, Dict, Any, Sequence, Tuple, Union
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - exercised only without numpy
+    np = None
+
+GroupSpec = Union[str, Sequence[str]]
+
+
+def encode_column(values: Sequence[Any]) -> Tuple[List[int], List[Any]]:
+    """Dictionary-encode values into integer codes, labels in first-appearance order."""
+    lookup: Dict[Any, int] = {}
+    codes = [lookup.setdefault(value, len(lookup)) for value in values]
+    return codes, list(lookup)
+
+
+def group_name(spec: GroupSpec) -> str:
+    return spec if isinstance(spec, str) else "+".join(spec)
+
+
+def _group_fields(spec: GroupSpec) -> Tuple[str, ...]:
+    return (spec,) if isinstance(spec, str) else tuple(spec)
+
+
+class CohortAggregator:
+    """One-pass milestone distribution and per-group breakdowns over celebrant columns.
+
+    ``years_of_service`` is one int per celebrant; ``columns`` maps a dimension
+    name (department, location, role_level, ...) to one value per celebrant.
+    """
+
+    def __init__(self, years_of_service: Sequence[int], columns: Dict[str, Sequence[Any]], milestone_years: Sequence[int]):
+        self.milestone_years = list(dict.fromkeys(milestone_years))
+        self.milestone_keys = [f"{year}_years" for year in self.milestone_years]
+        self.size = len(years_of_service)
+        self._encoded = {name: encode_column(values) for name, values in columns.items()}
+        other = len(self.milestone_years)
+        # Years outside the configured milestones get the extra slot M, which
+        # counts towards celebrant_count but not milestone_breakdown
+        if np is not None:
+            years = np.asarray(years_of_service, dtype=np.int64)
+            # Sized by the years actually present, not by the milestones asked for
+            top = max(int(years.max()) if self.size else 0, 0)
+            lookup = np.full(top + 2, other, dtype=np.int64)
+            for slot, year in enumerate(self.milestone_years):
+                if 0 <= year <= top:
+                    lookup[year] = slot
+            self._milestone_codes = lookup[np.clip(years, 0, len(lookup) - 1)]
+            self._codes = {name: np.asarray(codes, dtype=np.int64) for name, (codes, _) in self._encoded.items()}
+        else:
+            slot = {year: i for i, year in enumerate(self.milestone_years)}
+            self._milestone_codes = [slot.get(year, other) for year in years_of_service]
+            self._codes = {name: codes for name, (codes, _) in self._encoded.items()}
+
+    def milestone_distribution(self) -> Dict[str, int]:
+        slots = len(self.milestone_years) + 1
+        if np is not None:
+            counts = np.bincount(self._milestone_codes, minlength=slots).tolist()
+        else:
+            tally = Counter(self._milestone_codes)
+            counts = [tally.get(i, 0) for i in range(slots)]
+        return dict(zip(self.milestone_keys, counts))
+
+    def breakdown(self, spec: GroupSpec) -> List[Dict[str, Any]]:
+        fields = _group_fields(spec)
+        labels = [self._encoded[field][1] for field in fields]
+        slots = len(self.milestone_years) + 1
+
+        # Mixed-radix combination of the per-field codes, then the milestone slot
+        group_code = None
+        radix = 1
+        for field, field_labels in zip(reversed(fields), reversed(labels)):
+            codes = self._codes[field]
+            if np is not None:
+                term = codes * radix
+                group_code = term if group_code is None else group_code + term
+            else:
+                group_code = [c * radix for c in codes] if group_code is None else [g + c * radix for g, c in zip(group_code, codes)]
+            radix *= len(field_labels)
+
+        if np is not None:
+            if len(fields) == 1:
+                # Single-field codes are already dense and in first-appearance order
+                combined = np.arange(radix, dtype=np.int64)
+                group_index = group_code
+                order = combined
+            else:
+                # Compact combined codes so wide composite groupings only allocate observed groups
+                combined, group_index = np.unique(group_code, return_inverse=True)
+                first_seen = np.full(len(combined), self.size, dtype=np.int64)
+                np.minimum.at(first_seen, group_index, np.arange(self.size, dtype=np.int64))
+                # Emit groups in first-appearance order, matching the row-by-row loop
+                order = np.argsort(first_seen, kind="stable")
+            groups = len(combined)
+            flat = np.bincount(group_index * slots + self._milestone_codes, minlength=groups * slots)
+            matrix = flat.reshape(groups, slots)
+            totals = matrix.sum(axis=1)
+            rows = [(int(combined[g]), matrix[g].tolist(), int(totals[g])) for g in order]
+        else:
+            tally = Counter(g * slots + m for g, m in zip(group_code, self._milestone_codes))
+            order = list(dict.fromkeys(group_code))
+            rows = []
+            for g in order:
+                counts = [tally.get(g * slots + m, 0) for m in range(slots)]
+                rows.append((g, counts, sum(counts)))
+
+        strides = []
+        stride = 1
+        for field_labels in reversed(labels):
+            strides.append(stride)
+            stride *= len(field_labels)
+        strides.reverse()
+
+        results = []
+        for g, counts, total in rows:
+            entry: Dict[str, Any] = {}
+            for field, field_labels, field_stride in zip(fields, labels, strides):
+                entry[field] = field_labels[g // field_stride]
+                g %= field_stride
+            entry["celebrant_count"] = total
+            entry["milestone_breakdown"] = dict(zip(self.milestone_keys, counts))
+            results.append(entry)
+        return results
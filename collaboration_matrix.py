@@ -0,0 +1,136 @@
+"""
+Sparse team-by-team recognition matrix
+Rows are dict-of-counters over dictionary-encoded team ids, updated by
+every posted recognition; it is saved as compact CSR arrays in the store
+snapshot so a restart does not need to replay the whole recognition history
+"""
+import heapq
+import threading
+from array import array
+from typing import List, Optional, Dict, Any, Callable, Set, Tuple
+
+
+class _TenantMatrix:
+    def __init__(self):
+        self.labels: List[str] = []
+        self.codes: Dict[str, int] = {}
+        self.rows: Dict[int, Dict[int, int]] = {}
+        self.columns: Dict[int, Dict[int, int]] = {}
+
+    def code(self, team: str) -> int:
+        code = self.codes.get(team)
+        if code is None:
+            code = self.codes[team] = len(self.labels)
+            self.labels.append(team)
+        return code
+
+    def add(self, from_team: str, to_team: str, count: int) -> None:
+        src, dst = self.code(from_team), self.code(to_team)
+        row = self.rows.setdefault(src, {})
+        row[dst] = row.get(dst, 0) + count
+        column = self.columns.setdefault(dst, {})
+        column[src] = column.get(src, 0) + count
+
+    def to_csr(self) -> Tuple[array, array, array]:
+        indptr, indices, data = array("q", [0]), array("q"), array("q")
+        for src in range(len(self.labels)):
+            row = self.rows.get(src, {})
+            for dst in sorted(row):
+                indices.append(dst)
+                data.append(row[dst])
+            indptr.append(len(indices))
+        return indptr, indices, data
+
+    @classmethod
+    def from_csr(cls, labels: List[str], indptr: array, indices: array, data: array) -> "_TenantMatrix":
+        matrix = cls()
+        for team in labels:
+            matrix.code(team)
+        columns = matrix.columns
+        for src in range(len(labels)):
+            start, end = indptr[src], indptr[src + 1]
+            if start == end:
+                continue
+            row = matrix.rows[src] = dict(zip(indices[start:end], data[start:end]))
+            for dst, count in row.items():
+                column = columns.get(dst)
+                if column is None:
+                    column = columns[dst] = {}
+                column[src] = count
+        return matrix
+
+
+class CollaborationMatrix:
+    """Per-tenant sparse counts of recognitions from one team to another.
+
+    Tenants in an attached store snapshot are decoded on first use.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._tenants: Dict[str, _TenantMatrix] = {}
+        # Ledger position already folded into the matrix, persisted with snapshots
+        self.ledger_seq = 0
+        self._snapshot: Optional[Any] = None
+        self._pending: Set[str] = set()
+
+    def attach_snapshot(self, snapshot: Any) -> None:
+        with self._lock:
+            self._snapshot = snapshot
+            self._pending = {name[len("collaboration/"):] for name in snapshot.names("collaboration/")}
+            self.ledger_seq = snapshot.ledger_seq
+
+    def _matrix(self, tenant_id: str) -> Optional[_TenantMatrix]:
+        if tenant_id in self._pending:
+            with self._lock:
+                if tenant_id in self._pending:
+                    labels, *blobs = self._snapshot.load(f"collaboration/{tenant_id}")
+                    indptr, indices, data = (array("q", blob) for blob in blobs)
+                    self._tenants[tenant_id] = _TenantMatrix.from_csr(labels, indptr, indices, data)
+                    self._pending.discard(tenant_id)
+        return self._tenants.get(tenant_id)
+
+    def add(self, tenant_id: str, from_team: str, to_team: str, count: int = 1) -> None:
+        self._matrix(tenant_id)
+        with self._lock:
+            matrix = self._tenants.get(tenant_id)
+            if matrix is None:
+                matrix = self._tenants[tenant_id] = _TenantMatrix()
+            matrix.add(from_team, to_team, count)
+
+    def _slice(self, tenant_id: str, team: str, outbound: bool) -> Dict[str, int]:
+        matrix = self._matrix(tenant_id)
+        if matrix is None or team not in matrix.codes:
+            return {}
+        source = matrix.rows if outbound else matrix.columns
+        with self._lock:
+            entries = list(source.get(matrix.codes[team], {}).items())
+        return {matrix.labels[code]: count for code, count in entries}
+
+    def row(self, tenant_id: str, team: str) -> Dict[str, int]:
+        """Interactions from ``team`` to every team it has recognized."""
+        return self._slice(tenant_id, team, outbound=True)
+
+    def column(self, tenant_id: str, team: str) -> Dict[str, int]:
+        """Interactions into ``team`` from every team that has recognized it."""
+        return self._slice(tenant_id, team, outbound=False)
+
+    def top_neighbors(self, tenant_id: str, team: str, n: int = 5, outbound: bool = True) -> List[Tuple[str, int]]:
+        entries = self._slice(tenant_id, team, outbound).items()
+        return heapq.nsmallest(n, entries, key=lambda item: (-item[1], item[0]))
+
+    def snapshot_sections(self, encode: Callable[[Any], bytes]) -> List[Tuple[str, Any]]:
+        """(section name, labels + CSR array bytes) per tenant; tenants never touched are copied from the old snapshot."""
+        with self._lock:
+            sections = []
+            for tenant_id, matrix in self._tenants.items():
+                indptr, indices, data = matrix.to_csr()
+                section = [list(matrix.labels), indptr.tobytes(), indices.tobytes(), data.tobytes()]
+                sections.append((f"collaboration/{tenant_id}", encode(section)))
+            sections += [(f"collaboration/{tenant_id}", self._snapshot.raw(f"collaboration/{tenant_id}"))
+                         for tenant_id in self._pending]
+        return sections
+
+    def nnz(self, tenant_id: str) -> int:
+        matrix = self._matrix(tenant_id)
+        return sum(len(row) for row in matrix.rows.values()) if matrix is not None else 0
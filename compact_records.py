@@ -0,0 +1,186 @@
+"""
+Compact in-memory user and recognition records
+Records are slotted objects instead of nested dicts, and strings repeated
+across many records (team, department, title, program and behavior names)
+are interned so all records share one copy. Both still read like the
+dicts they replace: the nested response shape is built on access, only
+when a record is serialized or a caller asks for a whole section
+"""
+import sys
+from collections.abc import Mapping
+from typing import Optional, Dict, Any, Iterator, Tuple
+
+# (section, fields) of a user record, in the order the tools return them
+USER_SCHEMA: Tuple[Tuple[str, Tuple[str, ...]], ...] = (
+    ("basic_info", ("name", "email", "display_name", "avatar_url")),
+    ("role_info", ("title", "department", "team", "manager_id", "direct_reports", "role_level")),
+    ("employment_info", ("employee_id", "hire_date", "tenure_years", "location", "timezone")),
+)
+USER_FIELDS = tuple(field for _, fields in USER_SCHEMA for field in fields)
+# Low-cardinality user fields whose strings are shared between records
+INTERNED_USER_FIELDS = frozenset({"title", "department", "team", "manager_id", "role_level", "location", "timezone"})
+
+_SECTIONS = {section: fields for section, fields in USER_SCHEMA}
+# Bit of each field in a record's presence mask
+_FIELD_BITS = {field: 1 << i for i, field in enumerate(USER_FIELDS)}
+_SECTION_BITS = {section: 1 << (len(USER_FIELDS) + i) for i, (section, _) in enumerate(USER_SCHEMA)}
+
+
+def _interned(value: Any) -> Any:
+    return sys.intern(value) if type(value) is str else value
+
+
+class UserRecord(Mapping):
+    """One user, stored flat; reads as ``{"user_id", "basic_info", "role_info", "employment_info"}``.
+
+    Fields are plain attributes (``record.team``, None when absent) for hot
+    paths. A presence mask remembers which keys the source dict had, so the
+    rebuilt sections have exactly its keys, and anything outside the schema
+    is kept in ``extra`` and merged back in.
+    """
+
+    __slots__ = ("user_id",) + USER_FIELDS + ("present", "extra")
+
+    def __init__(self, user_id: str):
+        self.user_id = user_id
+        for field in USER_FIELDS:
+            setattr(self, field, None)
+        self.present = 0
+        self.extra: Optional[Dict[str, Any]] = None
+
+    @classmethod
+    def from_dict(cls, user: Dict[str, Any]) -> "UserRecord":
+        record = cls(user["user_id"])
+        present, extra = 0, None
+        for key, value in user.items():
+            fields = _SECTIONS.get(key)
+            if fields is None or not isinstance(value, dict):
+                if key != "user_id":
+                    extra = extra or {}
+                    extra[key] = value
+                continue
+            present |= _SECTION_BITS[key]
+            unknown = None
+            for field, field_value in value.items():
+                if field not in fields:
+                    unknown = unknown or {}
+                    unknown[field] = field_value
+                    continue
+                if field in INTERNED_USER_FIELDS:
+                    field_value = _interned(field_value)
+                elif field == "direct_reports" and isinstance(field_value, list):
+                    field_value = tuple(field_value)
+                setattr(record, field, field_value)
+                present |= _FIELD_BITS[field]
+            if unknown:
+                extra = extra or {}
+                extra[key] = unknown
+        record.present, record.extra = present, extra
+        return record
+
+    def to_row(self) -> tuple:
+        """Flat tuple of plain values, for store snapshots."""
+        return (self.user_id,) + tuple(getattr(self, field) for field in USER_FIELDS) + (self.present, self.extra)
+
+    @classmethod
+    def from_row(cls, row: tuple) -> "UserRecord":
+        # Snapshot rows are marshal-decoded, which already shares repeated strings within a tenant
+        record = cls.__new__(cls)
+        record.user_id = row[0]
+        for field, value in zip(USER_FIELDS, row[1:]):
+            setattr(record, field, value)
+        record.present, record.extra = row[-2], row[-1]
+        return record
+
+    def section(self, name: str) -> Dict[str, Any]:
+        if not self.present & _SECTION_BITS[name]:
+            if self.extra is not None and name in self.extra:
+                return self.extra[name]
+            raise KeyError(name)
+        present = self.present
+        data = {}
+        for field in _SECTIONS[name]:
+            if present & _FIELD_BITS[field]:
+                value = getattr(self, field)
+                data[field] = list(value) if field == "direct_reports" and isinstance(value, tuple) else value
+        if self.extra is not None and name in self.extra:
+            data.update(self.extra[name])
+        return data
+
+    def __getitem__(self, key: str) -> Any:
+        if key == "user_id":
+            return self.user_id
+        if key in _SECTIONS:
+            return self.section(key)
+        if self.extra is not None and key in self.extra:
+            return self.extra[key]
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        yield "user_id"
+        for section, _ in USER_SCHEMA:
+            if self.present & _SECTION_BITS[section]:
+                yield section
+        if self.extra is not None:
+            for key in self.extra:
+                if key not in _SECTIONS or not self.present & _SECTION_BITS[key]:
+                    yield key
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """The nested dict this record was built from, for serialization."""
+        return {key: self[key] for key in self}
+
+    def __repr__(self) -> str:
+        return f"UserRecord({self.to_dict()!r})"
+
+
+# Ledger columns, in table order
+RECOGNITION_FIELDS = (
+    "recognition_id", "tenant_id", "sender_id", "sender_name", "recipient_id", "recipient_name",
+    "program_id", "program_name", "behavior_id", "behavior_name", "points", "title", "message",
+    "created_at", "status", "visibility",
+)
+INTERNED_RECOGNITION_FIELDS = frozenset({
+    "tenant_id", "program_id", "program_name", "behavior_id", "behavior_name", "title", "status", "visibility",
+})
+_RECOGNITION_FIELD_SET = frozenset(RECOGNITION_FIELDS)
+_INTERN_POSITIONS = tuple(i for i, field in enumerate(RECOGNITION_FIELDS) if field in INTERNED_RECOGNITION_FIELDS)
+
+
+class RecognitionRecord(Mapping):
+    """One ledger row (``seq`` plus RECOGNITION_FIELDS) that reads like the row dict."""
+
+    __slots__ = ("seq",) + RECOGNITION_FIELDS
+
+    @classmethod
+    def from_row(cls, row: Any) -> "RecognitionRecord":
+        """From a ``(seq, *RECOGNITION_FIELDS)`` sequence, e.g. a sqlite3 row."""
+        values = list(row)
+        for i in _INTERN_POSITIONS:
+            values[i + 1] = _interned(values[i + 1])
+        record = cls.__new__(cls)
+        record.seq = values[0]
+        for field, value in zip(RECOGNITION_FIELDS, values[1:]):
+            setattr(record, field, value)
+        return record
+
+    def __getitem__(self, key: str) -> Any:
+        if key == "seq" or key in _RECOGNITION_FIELD_SET:
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        yield "seq"
+        yield from RECOGNITION_FIELDS
+
+    def __len__(self) -> int:
+        return len(RECOGNITION_FIELDS) + 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {key: getattr(self, key) for key in self}
+
+    def __repr__(self) -> str:
+        return f"RecognitionRecord({self.to_dict()!r})"
@@ -0,0 +1,273 @@
+"""
+Per-tool latency, CPU, payload-size and error-code instrumentation
+Samples go into log-linear (HDR-style) histograms with bounded relative
+error and constant memory; the registry renders them as Prometheus
+summaries for /metrics and as a dict for the get_server_stats tool.
+Response sizes are taken from the text the MCP transport sends, so no
+response is serialized a second time just to be measured
+"""
+import contextvars
+import functools
+import inspect
+import threading
+import time
+from collections import Counter
+from typing import List, Optional, Dict, Any, Callable
+
+from fastmcp.server.middleware import Middleware
+
+# Quantiles reported for every histogram
+QUANTILES = (0.5, 0.9, 0.99, 0.999)
+
+
+class LogHistogram:
+    """Integer-valued histogram with 2**(significant_bits - 1) linear sub-buckets per power of two.
+
+    Values below 2**significant_bits are counted exactly; above that a
+    bucket spans at most 1/2**(significant_bits - 1) of its value, so with
+    the default 7 bits quantiles are within ~1.6%. Buckets are kept in a
+    sparse dict and the memory used is bounded by the recorded range.
+    """
+
+    def __init__(self, significant_bits: int = 7):
+        self.significant_bits = significant_bits
+        self._half = 1 << (significant_bits - 1)
+        self._buckets: Dict[int, int] = {}
+        self.count = 0
+        self.total = 0
+        self.min: Optional[int] = None
+        self.max: Optional[int] = None
+
+    def _index(self, value: int) -> int:
+        shift = value.bit_length() - self.significant_bits
+        if shift <= 0:
+            return value
+        return (shift << (self.significant_bits - 1)) + (value >> shift)
+
+    def _lower_bound(self, index: int) -> int:
+        if index < 2 * self._half:
+            return index
+        shift = (index >> (self.significant_bits - 1)) - 1
+        return (index - (shift << (self.significant_bits - 1))) << shift
+
+    def record(self, value: int) -> None:
+        value = max(0, int(value))
+        index = self._index(value)
+        self._buckets[index] = self._buckets.get(index, 0) + 1
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def quantile(self, q: float) -> int:
+        if not self.count:
+            return 0
+        rank = max(1, int(q * self.count + 0.5))
+        seen = 0
+        for index in sorted(self._buckets):
+            seen += self._buckets[index]
+            if seen >= rank:
+                # Midpoint of the bucket, clamped to what was actually recorded
+                low, high = self._lower_bound(index), self._lower_bound(index + 1)
+                return min(max((low + high - 1) // 2, self.min), self.max)
+        return self.max
+
+    def summary(self, scale: float = 1.0) -> Dict[str, float]:
+        return {
+            "count": self.count,
+            "mean": round(self.total / self.count * scale, 3) if self.count else 0,
+            "min": round((self.min or 0) * scale, 3),
+            "max": round((self.max or 0) * scale, 3),
+            **{f"p{str(q * 100).rstrip('0').rstrip('.')}": round(self.quantile(q) * scale, 3) for q in QUANTILES},
+        }
+
+
+class ToolStats:
+    __slots__ = ("calls", "errors", "wall_us", "cpu_us", "response_bytes")
+
+    def __init__(self):
+        self.calls = 0
+        self.errors: Counter = Counter()
+        self.wall_us = LogHistogram()
+        self.cpu_us = LogHistogram()
+        self.response_bytes = LogHistogram()
+
+
+class _Call:
+    """Accounting for one in-flight tool call; pool threads charge their CPU time here."""
+    __slots__ = ("started", "cpu")
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.cpu = 0.0
+
+
+_current_call: "contextvars.ContextVar[Optional[_Call]]" = contextvars.ContextVar("current_tool_call", default=None)
+
+
+def charge_cpu(seconds: float) -> None:
+    """Attribute CPU time spent on another thread to the tool call that requested the work."""
+    call = _current_call.get()
+    if call is not None:
+        call.cpu += seconds
+
+
+def elapsed_ms() -> Optional[float]:
+    """Wall time so far of the tool call running in this context, for processing_time fields."""
+    call = _current_call.get()
+    return round((time.perf_counter() - call.started) * 1000, 3) if call is not None else None
+
+
+class _StepTimed:
+    """Await a coroutine while summing the CPU time of each step it runs on the event loop thread."""
+
+    def __init__(self, coro, call: _Call):
+        self.coro = coro
+        self.call = call
+
+    def __await__(self):
+        coro, call = self.coro, self.call
+        send_value, error = None, None
+        while True:
+            start = time.thread_time()
+            try:
+                yielded = coro.throw(error) if error is not None else coro.send(send_value)
+            except StopIteration as stop:
+                return stop.value
+            finally:
+                call.cpu += time.thread_time() - start
+            try:
+                send_value, error = (yield yielded), None
+            except BaseException as e:  # cancellation and other throws go to the wrapped coroutine
+                send_value, error = None, e
+
+
+class ToolMetrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._tools: Dict[str, ToolStats] = {}
+        self.started_at = time.time()
+
+    def _stats(self, tool: str) -> ToolStats:
+        stats = self._tools.get(tool)
+        if stats is None:
+            stats = self._tools[tool] = ToolStats()
+        return stats
+
+    def observe(self, tool: str, wall_seconds: float, cpu_seconds: float, response: Any,
+                error_code: Optional[str] = None) -> None:
+        if error_code is None and isinstance(response, dict) and response.get("status") == "error":
+            error_code = (response.get("error") or {}).get("code", "UNKNOWN")
+        with self._lock:
+            stats = self._stats(tool)
+            stats.calls += 1
+            stats.wall_us.record(wall_seconds * 1_000_000)
+            stats.cpu_us.record(cpu_seconds * 1_000_000)
+            if error_code is not None:
+                stats.errors[error_code] += 1
+
+    def observe_size(self, tool: str, size: int) -> None:
+        with self._lock:
+            self._stats(tool).response_bytes.record(size)
+
+    def snapshot(self, tools: Optional[List[str]] = None) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                name: {
+                    "calls": stats.calls,
+                    "errors": dict(stats.errors),
+                    "wall_ms": stats.wall_us.summary(0.001),
+                    "cpu_ms": stats.cpu_us.summary(0.001),
+                    "response_bytes": stats.response_bytes.summary(),
+                }
+                for name, stats in self._tools.items()
+                if tools is None or name in tools
+            }
+
+    def prometheus(self, prefix: str = "mcp_tool") -> str:
+        lines = [
+            f"# HELP {prefix}_calls_total Tool calls handled.",
+            f"# TYPE {prefix}_calls_total counter",
+        ]
+        with self._lock:
+            tools = sorted(self._tools.items())
+            for name, stats in tools:
+                lines.append(f'{prefix}_calls_total{{tool="{name}"}} {stats.calls}')
+            lines += [f"# HELP {prefix}_errors_total Tool calls that returned an error, by error code.",
+                      f"# TYPE {prefix}_errors_total counter"]
+            for name, stats in tools:
+                for code, count in sorted(stats.errors.items()):
+                    lines.append(f'{prefix}_errors_total{{tool="{name}",code="{code}"}} {count}')
+            for metric, attr, scale, help_text in (
+                ("wall_seconds", "wall_us", 1e-6, "Tool call wall time."),
+                ("cpu_seconds", "cpu_us", 1e-6, "Tool call CPU time, including work offloaded to pools."),
+                ("response_bytes", "response_bytes", 1, "Tool response text sent over the MCP transport, in bytes."),
+            ):
+                lines += [f"# HELP {prefix}_{metric} {help_text}", f"# TYPE {prefix}_{metric} summary"]
+                for name, stats in tools:
+                    histogram: LogHistogram = getattr(stats, attr)
+                    for q in QUANTILES:
+                        lines.append(f'{prefix}_{metric}{{tool="{name}",quantile="{q}"}} {histogram.quantile(q) * scale:g}')
+                    lines.append(f'{prefix}_{metric}_sum{{tool="{name}"}} {histogram.total * scale:g}')
+                    lines.append(f'{prefix}_{metric}_count{{tool="{name}"}} {histogram.count}')
+        return "\n".join(lines) + "\n"
+
+
+def _utf8_length(text: str) -> int:
+    """Encoded size of ``text``; ASCII (most JSON) is one byte per character, so only the rest is encoded."""
+    return len(text) if text.isascii() else len(text.encode())
+
+
+class ResponseSizeMiddleware(Middleware):
+    """Record the size of each tool result's text content, already encoded by FastMCP for the transport."""
+
+    def __init__(self, metrics: ToolMetrics):
+        self.metrics = metrics
+
+    async def on_call_tool(self, context, call_next):
+        result = await call_next(context)
+        size = sum(_utf8_length(block.text) for block in result.content if getattr(block, "text", None) is not None)
+        self.metrics.observe_size(context.message.name, size)
+        return result
+
+
+def instrumented(metrics: ToolMetrics):
+    """Record wall time, CPU time and error code of every call to a tool; sizes come from ResponseSizeMiddleware."""
+    def decorator(fn: Callable):
+        tool = fn.__name__
+
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                call = _Call()
+                token = _current_call.set(call)
+                response, error_code = None, None
+                try:
+                    response = await _StepTimed(fn(*args, **kwargs), call)
+                    return response
+                except Exception:
+                    error_code = "UNHANDLED_EXCEPTION"
+                    raise
+                finally:
+                    _current_call.reset(token)
+                    metrics.observe(tool, time.perf_counter() - call.started, call.cpu, response, error_code)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            call = _Call()
+            token = _current_call.set(call)
+            cpu_start = time.thread_time()
+            response, error_code = None, None
+            try:
+                response = fn(*args, **kwargs)
+                return response
+            except Exception:
+                error_code = "UNHANDLED_EXCEPTION"
+                raise
+            finally:
+                call.cpu += time.thread_time() - cpu_start
+                _current_call.reset(token)
+                metrics.observe(tool, time.perf_counter() - call.started, call.cpu, response, error_code)
+        return wrapper
+    return decorator
@@ -0,0 +1,95 @@
+"""
+Invitee resolution for send_celebration_invite
+Candidates come from precomputed team/department/tenant membership views
+and are ranked deterministically: required attendees first, then by
+collaboration strength with the celebrant, then explicit optional
+attendees, team, department and the rest of the organisation in directory
+order. invite_type "org" draws from everyone reporting into ``org_root_id``
+(default: the sender) via the org hierarchy's tour intervals. With
+max_invitees set, only the top of that order is materialized.
+"""
+import heapq
+from itertools import chain
+from typing import List, Optional, Dict, Any, Iterable, Collection
+
+
+class InviteeResolution:
+    __slots__ = ("invitees", "required", "auto_suggested")
+
+    def __init__(self, invitees: List[str], required: Collection[str], auto_suggested: int):
+        self.invitees = invitees
+        self.required = required
+        self.auto_suggested = auto_suggested
+
+
+def resolve_invitees(
+    users: Any,
+    celebrant_id: str,
+    invite_criteria: Dict[str, Any],
+    collaboration_strength: Dict[str, int],
+    org_root_id: Optional[str] = None,
+) -> InviteeResolution:
+    """Ordered, de-duplicated invitee ids for a celebration, truncated at ``max_invitees``.
+
+    ``users`` is the tenant's user partition and ``collaboration_strength``
+    maps user ids to the number of recognitions exchanged with the celebrant.
+    """
+    role_info = users[celebrant_id]["role_info"]
+    invite_type = invite_criteria["invite_type"]
+    team = users.team_members_view(role_info.get("team"))
+    department = users.department_members_view(role_info.get("department"))
+
+    # Auto-suggested pool: a membership view to test against and the sequence to draw from
+    if invite_type == "team_only":
+        pool, sources = team, (team,)
+    elif invite_type == "department":
+        pool, sources = department, (team, department)
+    elif invite_type == "cross_functional":
+        pool, sources = users.users.keys(), (team, department, users.users.keys())
+    elif invite_type == "org" and org_root_id:
+        org = users.org.org_members(org_root_id)
+        pool, sources = set(org), (team, org)
+    else:
+        pool, sources = (), ()
+    auto_suggested = len(pool) - (1 if celebrant_id in pool else 0)
+
+    required = list(dict.fromkeys(invite_criteria.get("required_attendees", [])))
+    optional = list(dict.fromkeys(invite_criteria.get("optional_attendees", [])))
+    optional_set = set(optional)
+    limit: Optional[int] = invite_criteria.get("max_invitees") or None
+
+    selected: Dict[str, None] = {}
+
+    def take(candidates: Iterable[str]) -> bool:
+        """Add candidates in order; True once the limit is reached."""
+        for uid in candidates:
+            if limit is not None and len(selected) >= limit:
+                return True
+            if uid != celebrant_id and uid not in selected:
+                selected[uid] = None
+        return limit is not None and len(selected) >= limit
+
+    if take(required):
+        return InviteeResolution(list(selected), set(required), auto_suggested)
+
+    def proximity(uid: str) -> int:
+        if uid in optional_set:
+            return 0
+        if uid in team:
+            return 1
+        return 2 if uid in department else 3
+
+    # Collaborators are few, so rank them with a bounded heap instead of sorting the pool
+    collaborators = [
+        (-strength, proximity(uid), uid) for uid, strength in collaboration_strength.items()
+        if strength > 0 and uid not in selected and uid != celebrant_id and (uid in optional_set or uid in pool)
+    ]
+    if limit is not None:
+        ranked = heapq.nsmallest(limit - len(selected), collaborators)
+    else:
+        ranked = sorted(collaborators)
+    if take(uid for _, _, uid in ranked):
+        return InviteeResolution(list(selected), set(required), auto_suggested)
+
+    take(chain(optional, (uid for uid in chain(*sources) if uid in pool)))
+    return InviteeResolution(list(selected), set(required), auto_suggested)
@@ -3,10 +3,23 @@ Minimal Pydantic schemas and mock data for MCP tools
 Only includes models used by the 'yes' marked functions
 """
 from pydantic import BaseModel, Field
-from typing import List, Optional, Dict, Any, Union
+from typing import List, Optional, Dict, Any, Union, KeysView
 from datetime import datetime, date, timedelta
 from enum import Enum
+import atexit
+import calendar
+import os
+import threading
 import uuid
+from itertools import chain
+
+from store_backends import StoreBackend, backend_from_env
+from compact_records import UserRecord
+from store_snapshot import StoreSnapshot, write_snapshot, encode as encode_snapshot
+from team_analytics import TeamAnalyticsViews
+from collaboration_matrix import CollaborationMatrix
+from points_budget import PointsBudgetLedger
+from recognition_search import RecognitionSearchIndex, TenantSearchIndex
 
 # Enums
 class AgentType(str, Enum):
@@ -33,10 +46,26 @@ class ErrorDetail(BaseModel):
     message: str
     validation_errors: Optional[List[str]] = None
 
+# Opt-in fast path: tool responses are built as plain dicts without pydantic
+# validation or the deep copy model_dump() makes of the Dict[str, Any] fields,
+# so the payload is only encoded once, by the transport.
+FAST_RESPONSES = os.environ.get("MCP_FAST_RESPONSES", "0").lower() in ("1", "true", "yes")
+
 class BaseResponse(BaseModel):
     status: StatusType
     error: Optional[ErrorDetail] = None
 
+    @classmethod
+    def dump(cls, **fields: Any) -> Dict[str, Any]:
+        """Build the response dict a tool returns, validated unless FAST_RESPONSES is on."""
+        if not FAST_RESPONSES:
+            return cls(**fields).model_dump()
+        response = {}
+        for name, field in cls.model_fields.items():
+            value = fields.get(name, field.default)
+            response[name] = value.model_dump() if isinstance(value, BaseModel) else value
+        return response
+
 # Request Models (only for 'yes' functions)
 class GetRecognitionsRequest(BaseModel):
     user_id: str
@@ -80,6 +109,19 @@ class CelebrationInviteRequest(BaseModel):
     invite_criteria: Dict[str, Any]
     context: Dict[str, Any]
 
+class BatchPostRecognitionRequest(BaseModel):
+    sender_id: str
+    tenant_id: str
+    recognitions: List[Dict[str, Any]]
+    context: Dict[str, Any]
+
+class NotificationStatusRequest(BaseModel):
+    tenant_id: str
+    notification_ids: List[str]
+
+class ServerStatsRequest(BaseModel):
+    tools: Optional[List[str]] = None
+
 # Response Models (only for 'yes' functions)
 class RecognitionsResponse(BaseResponse):
     data: Optional[Dict[str, Any]] = None
@@ -106,10 +148,573 @@ class CelebrationInviteResponse(BaseResponse):
     data: Optional[Dict[str, Any]] = None
     metadata: Optional[Dict[str, Any]] = None
 
+class BatchPostRecognitionResponse(BaseResponse):
+    data: Optional[Dict[str, Any]] = None
+    metadata: Optional[Dict[str, Any]] = None
+
+class NotificationStatusResponse(BaseResponse):
+    data: Optional[Dict[str, Any]] = None
+    metadata: Optional[Dict[str, Any]] = None
+
+class ServerStatsResponse(BaseResponse):
+    data: Optional[Dict[str, Any]] = None
+    metadata: Optional[Dict[str, Any]] = None
+
+class SearchRecognitionsResponse(BaseResponse):
+    data: Optional[Dict[str, Any]] = None
+    metadata: Optional[Dict[str, Any]] = None
+
+class RosterIngestResponse(BaseResponse):
+    data: Optional[Dict[str, Any]] = None
+    metadata: Optional[Dict[str, Any]] = None
+
+class UpcomingMilestonesResponse(BaseResponse):
+    data: Optional[Dict[str, Any]] = None
+    metadata: Optional[Dict[str, Any]] = None
+
+# User Directory
+DEFAULT_TENANT_ID = "default"
+
+
+def anniversary_in_year(hire: date, year: int) -> date:
+    # Feb 29 hires celebrate on Feb 28 in non-leap years
+    try:
+        return hire.replace(year=year)
+    except ValueError:
+        return date(year, 2, 28)
+
+
+class AnniversaryIndex:
+    """Hire dates bucketed by (month, day) and then by hire year.
+
+    A cohort query walks the calendar days in the requested range and, for
+    each configured milestone, looks up the single bucket of people hired
+    exactly that many years before - the cost depends on the number of days
+    and milestones queried, not on the size of the tenant.
+    """
+
+    def __init__(self):
+        self._calendar: Dict[tuple, Dict[int, Dict[str, None]]] = {}
+        self._hire_dates: Dict[str, date] = {}
+
+    def __len__(self) -> int:
+        return len(self._hire_dates)
+
+    def upsert(self, user_id: str, hire_date: Optional[Union[str, date]]) -> None:
+        if isinstance(hire_date, str):
+            hire_date = date.fromisoformat(hire_date)
+        old = self._hire_dates.get(user_id)
+        if old == hire_date:
+            return
+        if old is not None:
+            self.delete(user_id)
+        if hire_date is None:
+            return
+        self._calendar.setdefault((hire_date.month, hire_date.day), {}).setdefault(hire_date.year, {})[user_id] = None
+        self._hire_dates[user_id] = hire_date
+
+    def delete(self, user_id: str) -> None:
+        hire_date = self._hire_dates.pop(user_id, None)
+        if hire_date is None:
+            return
+        day_key = (hire_date.month, hire_date.day)
+        by_year = self._calendar[day_key]
+        bucket = by_year[hire_date.year]
+        bucket.pop(user_id, None)
+        if not bucket:
+            del by_year[hire_date.year]
+            if not by_year:
+                del self._calendar[day_key]
+
+    def hire_date(self, user_id: str) -> Optional[date]:
+        return self._hire_dates.get(user_id)
+
+    def copy(self) -> "AnniversaryIndex":
+        """Independent copy whose buckets can be changed without touching this index's."""
+        index = AnniversaryIndex()
+        index._calendar = {day_key: {year: dict(bucket) for year, bucket in by_year.items()}
+                           for day_key, by_year in self._calendar.items()}
+        index._hire_dates = dict(self._hire_dates)
+        return index
+
+    def celebrants(self, start: date, end: date, milestone_years: List[int]) -> List[tuple]:
+        """Return (user_id, anniversary_date, years_of_service) for milestones in [start, end]."""
+        results = []
+        milestone_years = list(dict.fromkeys(milestone_years))
+        day = start
+        one_day = timedelta(days=1)
+        while day <= end:
+            day_keys = [(day.month, day.day)]
+            if day.month == 2 and day.day == 28 and not calendar.isleap(day.year):
+                day_keys.append((2, 29))
+            for day_key in day_keys:
+                by_year = self._calendar.get(day_key)
+                if not by_year:
+                    continue
+                for years in milestone_years:
+                    for user_id in by_year.get(day.year - years, ()):
+                        results.append((user_id, day, years))
+            day += one_day
+        return results
+
+
+class OrgHierarchy:
+    """Manager hierarchy of one tenant with Euler-tour intervals for subtree queries.
+
+    The manager -> direct reports map is the partition's own index, updated
+    in O(1) when someone moves. Entry/exit positions of a depth-first tour
+    make "is X in Y's org" an interval check and "everyone under Y" a
+    slice. A move only marks the tour stale: queries then walk the reports
+    index or the manager chain directly, and the O(N) tour rebuild happens
+    once that fallback work has added up to the size of the tenant, so
+    bursts of moves never pay for more than one rebuild. Manager ids that
+    are not users themselves act as roots.
+    """
+
+    def __init__(self, partition: "TenantUserPartition"):
+        self._partition = partition
+        self._lock = threading.Lock()
+        self._dirty = True
+        self._order: List[str] = []
+        self._enter: Dict[str, int] = {}
+        self._exit: Dict[str, int] = {}
+        self._stale_work = 0
+        # Bumped by every invalidation, so a rebuild that raced a move does not mark its tour current
+        self._version = 0
+
+    def invalidate(self) -> None:
+        self._version += 1
+        self._dirty = True
+        self._stale_work = 0
+
+    def _use_tour(self, work: int) -> bool:
+        """True when queries may use the tour, rebuilding it if stale queries have cost as much as a rebuild."""
+        if not self._dirty:
+            return True
+        self._stale_work += work
+        if self._stale_work < len(self._partition):
+            return False
+        self._ensure_tour()
+        return True
+
+    def manager_chain(self, user_id: str, max_depth: int = 64) -> List[str]:
+        """Manager ids from the direct manager upwards; O(depth), stops on cycles."""
+        users = self._partition.users
+        chain = []
+        seen = {user_id}
+        user = users.get(user_id)
+        manager_id = user.manager_id if user is not None else None
+        while manager_id and manager_id not in seen and len(chain) < max_depth:
+            chain.append(manager_id)
+            seen.add(manager_id)
+            manager = users.get(manager_id)
+            manager_id = manager.manager_id if manager is not None else None
+        return chain
+
+    def _ensure_tour(self) -> None:
+        if not self._dirty:
+            return
+        with self._lock:
+            if not self._dirty:
+                return
+            version = self._version
+            reports = self._partition.reports_index()
+            users = self._partition.users
+            order: List[str] = []
+            enter: Dict[str, int] = {}
+            exit_: Dict[str, int] = {}
+            external = [manager_id for manager_id in reports if manager_id not in users]
+            top_level = [uid for uid, user in users.items() if not user.manager_id]
+            # Anything left unvisited afterwards sits on a management cycle and is toured from itself
+            for root in chain(external, top_level, users):
+                if root in enter:
+                    continue
+                enter[root] = len(order)
+                order.append(root)
+                stack = [(root, iter(reports.get(root, ())))]
+                while stack:
+                    node, children = stack[-1]
+                    child = next(children, None)
+                    if child is None:
+                        exit_[node] = len(order)
+                        stack.pop()
+                    elif child not in enter:
+                        enter[child] = len(order)
+                        order.append(child)
+                        stack.append((child, iter(reports.get(child, ()))))
+            self._order, self._enter, self._exit = order, enter, exit_
+            if self._version == version:
+                self._dirty = False
+
+    def org_members(self, root_id: str) -> List[str]:
+        """Everyone who reports into ``root_id`` directly or indirectly, in tour order."""
+        if not self._use_tour(0):
+            members = self._walk(root_id)
+            if not self._use_tour(len(members)):
+                return members
+        start = self._enter.get(root_id)
+        if start is None:
+            return []
+        return self._order[start + 1:self._exit[root_id]]
+
+    def _walk(self, root_id: str) -> List[str]:
+        reports = self._partition.reports_index()
+        members: List[str] = []
+        seen = {root_id}
+        stack = [iter(reports.get(root_id, ()))]
+        while stack:
+            child = next(stack[-1], None)
+            if child is None:
+                stack.pop()
+            elif child not in seen:
+                seen.add(child)
+                members.append(child)
+                stack.append(iter(reports.get(child, ())))
+        return members
+
+    def in_org(self, root_id: str, user_id: str) -> bool:
+        if not self._use_tour(0):
+            chain_ids = self.manager_chain(user_id)
+            if not self._use_tour(len(chain_ids) + 1):
+                return root_id in chain_ids
+        root_start, position = self._enter.get(root_id), self._enter.get(user_id)
+        if root_start is None or position is None:
+            return False
+        return root_start < position < self._exit[root_id]
+
+
+class TenantQuotaExceeded(Exception):
+    """A write would take a tenant past one of its resource caps."""
+
+
+class TenantUserPartition:
+    """Users of a single tenant plus secondary indexes kept in sync on every write.
+
+    Index buckets are insertion-ordered dicts used as sets so membership
+    listings are deterministic and removal is O(1). A partition restored
+    from a snapshot starts with just its user records and files them into
+    the indexes the first time an index is used. Users are stored as
+    compact UserRecords, which read like the nested dicts they came from.
+    """
+
+    def __init__(self, tenant_id: str, max_users: Optional[int] = None):
+        self.tenant_id = tenant_id
+        self.max_users = max_users
+        self.users: Dict[str, UserRecord] = {}
+        self._by_team: Dict[str, Dict[str, None]] = {}
+        self._by_department: Dict[str, Dict[str, None]] = {}
+        self._by_manager: Dict[str, Dict[str, None]] = {}
+        # Index keys each user was filed under, so updates can unfile them
+        # even if the caller mutated the record in place.
+        self._index_keys: Dict[str, tuple] = {}
+        self._anniversaries = AnniversaryIndex()
+        self.org = OrgHierarchy(self)
+        self._indexed = True
+        self._index_lock = threading.Lock()
+        # Bumped on every write, for change detection by snapshotting
+        self.version = 0
+
+    @classmethod
+    def restored(cls, tenant_id: str, rows: List[tuple], max_users: Optional[int] = None) -> "TenantUserPartition":
+        """Partition over UserRecord snapshot rows; indexes are built on first use."""
+        partition = cls(tenant_id, max_users)
+        from_row = UserRecord.from_row
+        partition.users = {row[0]: from_row(row) for row in rows}
+        partition._indexed = False
+        return partition
+
+    def _ensure_indexes(self) -> None:
+        if self._indexed:
+            return
+        with self._index_lock:
+            if not self._indexed:
+                # Bulk fill: every user is new to the indexes, so there is nothing to unfile
+                indexes = (self._by_team, self._by_department, self._by_manager)
+                for user_id, user in list(self.users.items()):
+                    keys = self._index_keys[user_id] = self._keys_for(user)
+                    for index, key in zip(indexes, keys):
+                        self._file(index, key, user_id)
+                    self._anniversaries.upsert(user_id, user.hire_date)
+                self.org.invalidate()
+                self._indexed = True
+
+    @property
+    def indexed(self) -> bool:
+        return self._indexed
+
+    @property
+    def anniversaries(self) -> AnniversaryIndex:
+        self._ensure_indexes()
+        return self._anniversaries
+
+    def __len__(self) -> int:
+        return len(self.users)
+
+    def __contains__(self, user_id: str) -> bool:
+        return user_id in self.users
+
+    def __getitem__(self, user_id: str) -> UserRecord:
+        return self.users[user_id]
+
+    def get(self, user_id: str, default: Any = None) -> Any:
+        return self.users.get(user_id, default)
+
+    @staticmethod
+    def _keys_for(user: UserRecord) -> tuple:
+        return (user.team, user.department, user.manager_id)
+
+    @staticmethod
+    def _file(index: Dict[str, Dict[str, None]], key: Optional[str], user_id: str) -> None:
+        if key is not None:
+            index.setdefault(key, {})[user_id] = None
+
+    @staticmethod
+    def _unfile(index: Dict[str, Dict[str, None]], key: Optional[str], user_id: str) -> None:
+        bucket = index.get(key)
+        if bucket is not None:
+            bucket.pop(user_id, None)
+            if not bucket:
+                del index[key]
+
+    def upsert(self, user: Union[Dict[str, Any], UserRecord]) -> None:
+        if not isinstance(user, UserRecord):
+            user = UserRecord.from_dict(user)
+        if self.max_users is not None and len(self.users) >= self.max_users and user.user_id not in self.users:
+            raise TenantQuotaExceeded(f"tenant {self.tenant_id} is at its limit of {self.max_users} users")
+        self._ensure_indexes()
+        self.users[user.user_id] = user
+        self._index(user)
+        self.version += 1
+
+    def upsert_many(self, users: List[UserRecord]) -> int:
+        """Upsert a batch of records, checking the user cap once up front; returns how many were new.
+
+        Into a partition that is empty or not indexed yet (restored from a
+        snapshot) the records are only stored, and the indexes are built in
+        one pass the first time they are used, as after a snapshot restore.
+        """
+        new_ids = {user.user_id for user in users if user.user_id not in self.users}
+        if self.max_users is not None and len(self.users) + len(new_ids) > self.max_users:
+            raise TenantQuotaExceeded(
+                f"tenant {self.tenant_id} has {len(self.users)} users; {len(new_ids)} more would exceed "
+                f"its limit of {self.max_users}"
+            )
+        # Under the index lock so a concurrent first use cannot build the indexes halfway through the batch
+        with self._index_lock:
+            if not self._indexed or not self.users:
+                self._indexed = False
+                for user in users:
+                    self.users[user.user_id] = user
+                self.version += 1
+                return len(new_ids)
+        for user in users:
+            self.users[user.user_id] = user
+            self._index(user)
+        self.version += 1
+        return len(new_ids)
+
+    def delete_many(self, user_ids: List[str]) -> List[UserRecord]:
+        """Remove users by id; returns the records that existed."""
+        return [user for user in (self.delete(user_id) for user_id in user_ids) if user is not None]
+
+    def staged(self) -> "TenantUserPartition":
+        """A private copy for a bulk load to change off to the side, then ``adopt``.
+
+        Records are shared, as writes replace them rather than change them,
+        but every dict and index bucket is copied, so nothing that readers
+        of this partition may be iterating is touched by the load.
+        """
+        with self._index_lock:
+            copy = TenantUserPartition(self.tenant_id, self.max_users)
+            copy.users = dict(self.users)
+            copy._indexed = self._indexed
+            if self._indexed:
+                copy._by_team, copy._by_department, copy._by_manager = (
+                    {key: dict(bucket) for key, bucket in index.items()}
+                    for index in (self._by_team, self._by_department, self._by_manager)
+                )
+                copy._index_keys = dict(self._index_keys)
+                copy._anniversaries = self._anniversaries.copy()
+            copy.version = self.version
+        return copy
+
+    def adopt(self, staged: "TenantUserPartition") -> None:
+        """Replace the users and indexes with those of a partition from ``staged``.
+
+        Each map is swapped in whole, never edited, so a reader iterating
+        the old ones finishes over a consistent, if superseded, roster.
+        """
+        with self._index_lock:
+            self.users = staged.users
+            self._by_team, self._by_department, self._by_manager = (
+                staged._by_team, staged._by_department, staged._by_manager
+            )
+            self._index_keys = staged._index_keys
+            self._anniversaries = staged._anniversaries
+            self._indexed = staged._indexed
+            self.org.invalidate()
+            self.version = max(self.version, staged.version) + 1
+
+    def _index(self, user: UserRecord) -> None:
+        user_id = user.user_id
+        new_keys = self._keys_for(user)
+        old_keys = self._index_keys.get(user_id)
+        self._anniversaries.upsert(user_id, user.hire_date)
+        if old_keys == new_keys:
+            return
+        if old_keys is None or old_keys[2] != new_keys[2]:
+            self.org.invalidate()
+        indexes = (self._by_team, self._by_department, self._by_manager)
+        if old_keys is not None:
+            for index, old_key, new_key in zip(indexes, old_keys, new_keys):
+                if old_key != new_key:
+                    self._unfile(index, old_key, user_id)
+                    self._file(index, new_key, user_id)
+        else:
+            for index, key in zip(indexes, new_keys):
+                self._file(index, key, user_id)
+        self._index_keys[user_id] = new_keys
+
+    def delete(self, user_id: str) -> Optional[UserRecord]:
+        self._ensure_indexes()
+        user = self.users.pop(user_id, None)
+        if user is None:
+            return None
+        team, department, manager_id = self._index_keys.pop(user_id)
+        self.version += 1
+        self._anniversaries.delete(user_id)
+        self.org.invalidate()
+        self._unfile(self._by_team, team, user_id)
+        self._unfile(self._by_department, department, user_id)
+        self._unfile(self._by_manager, manager_id, user_id)
+        return user
+
+    def team_members(self, team: str) -> List[str]:
+        self._ensure_indexes()
+        return list(self._by_team.get(team, ()))
+
+    def department_members(self, department: str) -> List[str]:
+        self._ensure_indexes()
+        return list(self._by_department.get(department, ()))
+
+    def direct_reports(self, manager_id: str) -> List[str]:
+        return list(self.reports_index().get(manager_id, ()))
+
+    def reports_index(self) -> Dict[str, Dict[str, None]]:
+        """Manager id -> direct report ids, for the org hierarchy."""
+        self._ensure_indexes()
+        return self._by_manager
+
+    def team_members_view(self, team: str) -> KeysView:
+        """Read-only live view of a team's member ids: O(1) membership, no copy."""
+        self._ensure_indexes()
+        return self._by_team.get(team, {}).keys()
+
+    def department_members_view(self, department: str) -> KeysView:
+        self._ensure_indexes()
+        return self._by_department.get(department, {}).keys()
+
+    def teams(self) -> List[str]:
+        self._ensure_indexes()
+        return list(self._by_team)
+
+    def departments(self) -> List[str]:
+        self._ensure_indexes()
+        return list(self._by_department)
+
+
+class UserDirectory:
+    """Tenant-partitioned user directory; each tenant has its own indexes.
+
+    Tenants in an attached snapshot are decoded the first time they are
+    accessed. ``version`` changes with every write so snapshotting can
+    skip an unchanged directory. ``max_users_per_tenant`` caps each
+    tenant's roster, and with it the tenant's share of directory memory.
+    """
+
+    def __init__(self, max_users_per_tenant: Optional[int] = None):
+        self.max_users_per_tenant = max_users_per_tenant
+        self._partitions: Dict[str, TenantUserPartition] = {}
+        self._snapshot: Optional[StoreSnapshot] = None
+        self._load_lock = threading.Lock()
+
+    def attach_snapshot(self, snapshot: StoreSnapshot) -> None:
+        self._snapshot = snapshot
+
+    def _snapshot_tenant(self, tenant_id: str) -> Optional[TenantUserPartition]:
+        snapshot = self._snapshot
+        if snapshot is None or not snapshot.has(f"users/{tenant_id}"):
+            return None
+        with self._load_lock:
+            partition = self._partitions.get(tenant_id)
+            if partition is None:
+                users = snapshot.load(f"users/{tenant_id}")
+                partition = self._partitions[tenant_id] = TenantUserPartition.restored(
+                    tenant_id, users, self.max_users_per_tenant
+                )
+        return partition
+
+    def partition(self, tenant_id: str) -> TenantUserPartition:
+        partition = self._partitions.get(tenant_id) or self._snapshot_tenant(tenant_id)
+        if partition is None:
+            with self._load_lock:
+                partition = self._partitions.setdefault(
+                    tenant_id, TenantUserPartition(tenant_id, self.max_users_per_tenant)
+                )
+        return partition
+
+    def has_tenant(self, tenant_id: str) -> bool:
+        if self._partitions.get(tenant_id):
+            return True
+        return tenant_id not in self._partitions and self._snapshot_tenant(tenant_id) is not None
+
+    def tenants(self) -> List[str]:
+        restored = [name[len("users/"):] for name in self._snapshot.names("users/")] if self._snapshot else []
+        return list(dict.fromkeys(list(self._partitions) + restored))
+
+    def snapshot_sections(self) -> List[tuple]:
+        """(section name, encoded users) per tenant; tenants never loaded are copied from the old snapshot."""
+        sections = []
+        for tenant_id in self.tenants():
+            partition = self._partitions.get(tenant_id)
+            if partition is not None:
+                sections.append((f"users/{tenant_id}", encode_snapshot([user.to_row() for user in list(partition.users.values())])))
+            else:
+                sections.append((f"users/{tenant_id}", self._snapshot.raw(f"users/{tenant_id}")))
+        return sections
+
+    def get(self, tenant_id: str, user_id: str) -> Optional[UserRecord]:
+        partition = self._partitions.get(tenant_id) or self._snapshot_tenant(tenant_id)
+        return partition.get(user_id) if partition is not None else None
+
+    def upsert(self, tenant_id: str, user: Dict[str, Any]) -> None:
+        self.partition(tenant_id).upsert(user)
+
+    def delete(self, tenant_id: str, user_id: str) -> Optional[UserRecord]:
+        if not self.has_tenant(tenant_id):
+            return None
+        return self.partition(tenant_id).delete(user_id)
+
+    def tenant_sizes(self) -> Dict[str, int]:
+        """Users per loaded tenant; tenants still only in the snapshot are not counted."""
+        return {tenant_id: len(partition) for tenant_id, partition in list(self._partitions.items())}
+
+    @property
+    def version(self) -> tuple:
+        return tuple((tenant_id, partition.version) for tenant_id, partition in list(self._partitions.items()))
+
+
 # Mock Data Storage
 class MockDataStore:
-    def __init__(self):
-        self.users = {
+    def __init__(self, backend: Optional[StoreBackend] = None):
+        self.directory = UserDirectory(max_users_per_tenant=int(os.environ.get("TENANT_MAX_USERS", 0)) or None)
+        self.demo_fallback = os.environ.get("TENANT_DEMO_FALLBACK", "1").lower() in ("1", "true", "yes")
+        self.snapshot_path = os.environ.get("STORE_SNAPSHOT_PATH")
+        snapshot = self._open_snapshot()
+        if snapshot is not None:
+            # Tenants are decoded from the snapshot on first access instead of up front
+            self.directory.attach_snapshot(snapshot)
+        seed_users = {
             "user1": {
                 "user_id": "user1",
                 "basic_info": {
@@ -159,6 +764,8 @@ class MockDataStore:
                 }
             }
         }
+        for user in seed_users.values():
+            self.directory.upsert(DEFAULT_TENANT_ID, user)
         
         self.programs = {
             "prog1": {
@@ -225,11 +832,155 @@ class MockDataStore:
             }
         }
 
-        self.recognitions = []
-        self.budgets = {
-            "user1": {"allocated": 500, "spent": 150, "remaining": 350},
-            "user2": {"allocated": 500, "spent": 200, "remaining": 300}
-        }
+        self.backend = backend or backend_from_env()
+        self.recognitions = self.backend.open_ledger()
+        self.team_views = TeamAnalyticsViews()
+        # Built per tenant on its first search, then kept current by catch_up; never part of a snapshot
+        self.search = RecognitionSearchIndex(int(os.environ.get("SEARCH_SEGMENT_SIZE", 65_536)))
+        self._search_build_lock = threading.Lock()
+        # Serializes derived-state updates with snapshots so a snapshot's ledger_seq is exact
+        self._write_lock = threading.Lock()
+        self.collaboration = CollaborationMatrix()
+        # Ledger position folded into team_views and the collaboration matrix
+        self.applied_seq = 0
+        # Derived state in a store snapshot is only valid against a ledger that has reached its position
+        self.restored_from_snapshot = snapshot is not None and snapshot.ledger_seq <= self.recognitions.last_seq()
+        if self.restored_from_snapshot:
+            self.team_views.attach_snapshot(snapshot)
+            self.collaboration.attach_snapshot(snapshot)
+            self.applied_seq = snapshot.ledger_seq
+        self.catch_up(collect=False)
+        self._snapshot_lock = threading.Lock()
+        self._snapshot_state: Optional[tuple] = None
+        self._stop_snapshots = threading.Event()
+        self.snapshot_failures = 0
+        if self.snapshot_path:
+            atexit.register(self.save_snapshot)
+            interval = float(os.environ.get("STORE_SNAPSHOT_INTERVAL", 300))
+            if interval > 0:
+                self.start_snapshotting(interval)
+        # Points budgets are only enforced with POINTS_BUDGET_ENFORCE, by a single worker (reservations live in
+        # this process); a restart reloads spend from the ledger
+        self.budgets = PointsBudgetLedger(
+            self.programs,
+            shards=int(os.environ.get("POINTS_BUDGET_SHARDS", 64)),
+            stripes=int(os.environ.get("POINTS_BUDGET_STRIPES", 16)),
+            load_spent=lambda *args: self.recognitions.points_sent_since(*args),
+            enabled=os.environ.get("POINTS_BUDGET_ENFORCE", "0").lower() in ("1", "true", "yes"),
+        )
+
+    @property
+    def users(self) -> Dict[str, Dict[str, Any]]:
+        return self.directory.partition(DEFAULT_TENANT_ID).users
+
+    def record_recognitions(self, records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Write recognitions to the ledger and fold them into the team views and collaboration matrix.
+
+        Returns every ledger record applied, which on a shared backend can
+        include recognitions other workers wrote since the last catch-up.
+        """
+        self.recognitions.append_many(records)
+        return self.catch_up()
+
+    def catch_up(self, collect: bool = True) -> List[Dict[str, Any]]:
+        """Apply ledger records written since the last catch-up, by this or any other worker.
+
+        ``collect=False`` skips returning them, for the startup replay of a whole ledger.
+        """
+        if self.recognitions.last_seq() <= self.applied_seq:
+            return []
+        applied = []
+        with self._write_lock:
+            for record in self.recognitions.iter_since(self.applied_seq):
+                self._apply_to_views(record)
+                self.applied_seq = record["seq"]
+                if collect:
+                    applied.append(record)
+            self.collaboration.ledger_seq = max(self.collaboration.ledger_seq, self.applied_seq)
+        return applied
+
+    def _teams_for(self, record: Dict[str, Any]) -> tuple:
+        users = self.directory_for(record["tenant_id"])
+        sender, recipient = users.get(record["sender_id"]), users.get(record["recipient_id"])
+        return (sender.team if sender is not None else None, recipient.team if recipient is not None else None)
+
+    def _apply_to_views(self, record: Dict[str, Any]) -> None:
+        sender_team, recipient_team = self._teams_for(record)
+        self.team_views.apply(record, sender_team, recipient_team)
+        if sender_team is not None and recipient_team is not None:
+            self.collaboration.add(record["tenant_id"], sender_team, recipient_team)
+        self.search.apply(record)
+
+    def search_index(self, tenant_id: str) -> TenantSearchIndex:
+        """The tenant's search index, built from its ledger history on first use.
+
+        The bulk of the history is indexed without holding the write lock;
+        only records applied meanwhile are added under it, right before the
+        index is registered for catch_up to keep current.
+        """
+        index = self.search.get(tenant_id)
+        if index is not None:
+            return index
+        with self._search_build_lock:
+            index = self.search.get(tenant_id)
+            if index is None:
+                index = TenantSearchIndex(self.search.segment_size)
+                built_to = self.applied_seq
+                index.add_many(self.recognitions.iter_tenant(tenant_id, 0, built_to))
+                with self._write_lock:
+                    index.add_many(self.recognitions.iter_tenant(tenant_id, built_to, self.applied_seq))
+                    self.search.register(tenant_id, index)
+        return index
+
+    def _open_snapshot(self) -> Optional[StoreSnapshot]:
+        if not self.snapshot_path or not os.path.exists(self.snapshot_path):
+            return None
+        try:
+            return StoreSnapshot(self.snapshot_path)
+        except (OSError, ValueError):
+            # Unreadable or from another interpreter: rebuild from the ledger and overwrite it later
+            return None
+
+    def save_snapshot(self, path: Optional[str] = None) -> bool:
+        """Write users, team views and the collaboration matrix to a store snapshot; False if unchanged."""
+        path = path or self.snapshot_path
+        if not path:
+            return False
+        with self._snapshot_lock:
+            state = (self.applied_seq, self.directory.version)
+            if state == self._snapshot_state and os.path.exists(path):
+                return False
+            sections = self.directory.snapshot_sections()
+            # Views and matrix are captured together with the ledger position they reflect
+            with self._write_lock:
+                ledger_seq = self.applied_seq
+                sections += self.team_views.snapshot_sections(encode_snapshot)
+                sections += self.collaboration.snapshot_sections(encode_snapshot)
+            write_snapshot(path, ledger_seq, sections)
+            self._snapshot_state = state
+            return True
+
+    def start_snapshotting(self, interval: float) -> None:
+        """Save a snapshot every ``interval`` seconds from a daemon thread, skipping unchanged state."""
+        def run():
+            while not self._stop_snapshots.wait(interval):
+                try:
+                    self.save_snapshot()
+                except Exception:  # keep the thread alive; the next interval retries
+                    self.snapshot_failures += 1
+        threading.Thread(target=run, name="store-snapshot", daemon=True).start()
+
+    def stop_snapshotting(self) -> None:
+        self._stop_snapshots.set()
+
+    def directory_for(self, tenant_id: str) -> TenantUserPartition:
+        if self.directory.has_tenant(tenant_id):
+            return self.directory.partition(tenant_id)
+        # Tenants without a loaded roster are served from the seeded demo data, unless
+        # isolation is strict: then they see an empty (unregistered) directory of their own
+        if self.demo_fallback:
+            return self.directory.partition(DEFAULT_TENANT_ID)
+        return TenantUserPartition(tenant_id)
 
 # Global instance
 mock_store = MockDataStore()
@@ -0,0 +1,195 @@
+"""
+In-process asynchronous notification dispatch
+Tools await enqueueing notification jobs, not their delivery; a worker pool on a
+dedicated event loop fans each job out to the sink in per-channel batches,
+retrying failed batches with exponential backoff
+"""
+import asyncio
+import threading
+import uuid
+from collections import Counter, OrderedDict
+from datetime import datetime
+from typing import List, Optional, Dict, Any, Sequence
+
+# Recipients per sink call, by channel
+DEFAULT_BATCH_SIZES = {"in_app": 1000, "email": 500, "feed": 5000}
+
+
+class StubNotificationSink:
+    """Local sink that records deliveries; ``fail_first`` makes the first N calls raise, to exercise retries."""
+
+    def __init__(self, latency_seconds: float = 0.0, fail_first: int = 0):
+        self.latency_seconds = latency_seconds
+        self.fail_first = fail_first
+        self.calls = 0
+        self.delivered: Counter = Counter()
+
+    async def send(self, channel: str, recipients: Sequence[str], payload: Dict[str, Any]) -> None:
+        self.calls += 1
+        if self.latency_seconds:
+            await asyncio.sleep(self.latency_seconds)
+        if self.calls <= self.fail_first:
+            raise ConnectionError(f"stub sink failure on call {self.calls}")
+        self.delivered[channel] += len(recipients)
+
+
+class NotificationDispatcher:
+    def __init__(
+        self,
+        sink: Optional[Any] = None,
+        workers: int = 4,
+        max_queue: int = 10_000,
+        max_attempts: int = 3,
+        retry_base_delay: float = 0.05,
+        enqueue_timeout: float = 1.0,
+        batch_sizes: Optional[Dict[str, int]] = None,
+        history_limit: int = 100_000,
+    ):
+        self.sink = sink or StubNotificationSink()
+        self.workers = workers
+        self.max_queue = max_queue
+        self.max_attempts = max_attempts
+        self.retry_base_delay = retry_base_delay
+        self.enqueue_timeout = enqueue_timeout
+        self.batch_sizes = {**DEFAULT_BATCH_SIZES, **(batch_sizes or {})}
+        self.history_limit = history_limit
+        self._statuses: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._status_lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self.counters = Counter()
+
+    def start(self) -> None:
+        with self._start_lock:
+            if self._loop is not None:
+                return
+            ready = threading.Event()
+            thread = threading.Thread(target=self._run, args=(ready,), name="notification-dispatcher", daemon=True)
+            thread.start()
+            ready.wait()
+
+    def _run(self, ready: threading.Event) -> None:
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        for _ in range(self.workers):
+            loop.create_task(self._worker())
+        self._loop = loop
+        ready.set()
+        loop.run_forever()
+
+    async def submit(
+        self,
+        tenant_id: str,
+        notification_type: str,
+        channel: str,
+        recipients: Sequence[str],
+        payload: Dict[str, Any],
+    ) -> Dict[str, Any]:
+        """Enqueue a notification job and return its initial status without waiting for delivery.
+
+        Waits for at most ``enqueue_timeout`` when the queue is full, without
+        blocking the caller's event loop; the job is then reported as
+        rejected so callers see backpressure.
+        """
+        self.start()
+        notification_id = str(uuid.uuid4())
+        status = {
+            "notification_id": notification_id,
+            "tenant_id": tenant_id,
+            "type": notification_type,
+            "channel": channel,
+            "recipient_count": len(recipients),
+            "delivered": 0,
+            "failed": 0,
+            "attempts": 0,
+            "status": "queued",
+            "last_error": None,
+            "queued_at": datetime.now().isoformat(),
+            "completed_at": None,
+        }
+        self._remember(status)
+        if not recipients:
+            self._finish(status, "delivered")
+            return self.status(notification_id)
+
+        job = (notification_id, channel, list(recipients), payload)
+        future = asyncio.run_coroutine_threadsafe(self._queue.put(job), self._loop)
+        try:
+            # On timeout the wrapped future is cancelled, which cancels the put on the dispatcher loop
+            await asyncio.wait_for(asyncio.wrap_future(future), self.enqueue_timeout)
+            self.counters["enqueued"] += 1
+        except Exception as e:
+            with self._status_lock:
+                status["last_error"] = f"notification queue full: {type(e).__name__}"
+            self._finish(status, "rejected")
+        return self.status(notification_id)
+
+    def status(self, notification_id: str) -> Optional[Dict[str, Any]]:
+        with self._status_lock:
+            status = self._statuses.get(notification_id)
+            return dict(status) if status is not None else None
+
+    def queue_depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self.counters, "queue_depth": self.queue_depth(), "tracked": len(self._statuses)}
+
+    def _remember(self, status: Dict[str, Any]) -> None:
+        with self._status_lock:
+            self._statuses[status["notification_id"]] = status
+            while len(self._statuses) > self.history_limit:
+                self._statuses.popitem(last=False)
+
+    def _finish(self, status: Dict[str, Any], outcome: str) -> None:
+        with self._status_lock:
+            status["status"] = outcome
+            status["completed_at"] = datetime.now().isoformat()
+        self.counters[outcome] += 1
+
+    async def _worker(self) -> None:
+        while True:
+            job = await self._queue.get()
+            try:
+                await self._deliver(*job)
+            except Exception:  # keep the worker alive; the job status records the failure
+                self.counters["worker_errors"] += 1
+            finally:
+                self._queue.task_done()
+
+    async def _deliver(self, notification_id: str, channel: str, recipients: List[str], payload: Dict[str, Any]) -> None:
+        with self._status_lock:
+            status = self._statuses.get(notification_id)
+            if status is None:
+                return
+            status["status"] = "in_progress"
+        batch_size = self.batch_sizes.get(channel, 500)
+        for offset in range(0, len(recipients), batch_size):
+            batch = recipients[offset:offset + batch_size]
+            for attempt in range(1, self.max_attempts + 1):
+                with self._status_lock:
+                    status["attempts"] += 1
+                try:
+                    await self.sink.send(channel, batch, payload)
+                except Exception as e:
+                    with self._status_lock:
+                        status["last_error"] = str(e)
+                    if attempt == self.max_attempts:
+                        with self._status_lock:
+                            status["failed"] += len(batch)
+                        break
+                    self.counters["retries"] += 1
+                    await asyncio.sleep(self.retry_base_delay * 2 ** (attempt - 1))
+                else:
+                    with self._status_lock:
+                        status["delivered"] += len(batch)
+                    break
+        if not status["failed"]:
+            outcome = "delivered"
+        elif status["delivered"]:
+            outcome = "partially_failed"
+        else:
+            outcome = "failed"
+        self._finish(status, outcome)
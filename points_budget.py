@@ -0,0 +1,287 @@
+"""
+Points budgets enforced with reserve/commit
+A sender's points are checked against the program's individual_limit in
+accounts sharded over a fixed set of locks, so concurrent posters only
+contend when they hash to the same shard. A program's total_budget is split
+into stripes drawn down independently; stripes are only rebalanced, under
+every stripe lock, once one runs dry. Both reset when their period rolls over
+"""
+import threading
+from datetime import date, datetime, timedelta
+from typing import Optional, Dict, Any, Callable, List, Tuple
+
+# frequency_limit values with a reset; anything else never resets
+PERIODS = ("daily", "weekly", "monthly", "quarterly", "yearly")
+# Period of a program's total_budget unless its budget_config sets total_period
+DEFAULT_TOTAL_PERIOD = "yearly"
+
+
+def period_of(frequency: Optional[str], when: datetime) -> Tuple[str, str]:
+    """(period key, ISO start) of the ``frequency`` period containing ``when``."""
+    day = when.date()
+    if frequency == "daily":
+        start = day
+        key = day.isoformat()
+    elif frequency == "weekly":
+        start = day - timedelta(days=day.weekday())
+        year, week, _ = day.isocalendar()
+        key = f"{year}-W{week:02d}"
+    elif frequency == "monthly":
+        start = day.replace(day=1)
+        key = f"{day.year}-{day.month:02d}"
+    elif frequency == "quarterly":
+        quarter = (day.month - 1) // 3
+        start = date(day.year, 3 * quarter + 1, 1)
+        key = f"{day.year}-Q{quarter + 1}"
+    elif frequency == "yearly":
+        start = date(day.year, 1, 1)
+        key = str(day.year)
+    else:
+        return "all", ""
+    return key, start.isoformat()
+
+
+class BudgetExceeded(Exception):
+    """A reservation would overspend; ``code`` is INDIVIDUAL_LIMIT_EXCEEDED or PROGRAM_BUDGET_EXHAUSTED."""
+
+    def __init__(self, code: str, message: str):
+        super().__init__(message)
+        self.code = code
+
+
+class StripedBudget:
+    """A capped pool of points split over ``stripes`` independently locked counters.
+
+    ``take`` draws from one stripe under its own lock. Only when that
+    stripe is short does it lock every stripe, in order, to decide against
+    the exact remaining total and spread what is left evenly again, so the
+    stripes never sum to more than the cap.
+    """
+
+    def __init__(self, total: int, stripes: int = 16, spent: int = 0):
+        self.total = total
+        self._locks = [threading.Lock() for _ in range(stripes)]
+        self._remaining = self._split(max(0, total - spent), stripes)
+        self._committed = [0] * stripes
+        self._spent_before = spent
+        self.rebalances = 0
+
+    @staticmethod
+    def _split(points: int, stripes: int) -> List[int]:
+        share, extra = divmod(points, stripes)
+        return [share + (i < extra) for i in range(stripes)]
+
+    def take(self, points: int, hint: int) -> bool:
+        i = hint % len(self._locks)
+        with self._locks[i]:
+            if self._remaining[i] >= points:
+                self._remaining[i] -= points
+                return True
+        return self._take_rebalanced(points)
+
+    def _take_rebalanced(self, points: int) -> bool:
+        for lock in self._locks:
+            lock.acquire()
+        try:
+            self.rebalances += 1
+            available = sum(self._remaining)
+            if available < points:
+                return False
+            self._remaining = self._split(available - points, len(self._locks))
+            return True
+        finally:
+            for lock in self._locks:
+                lock.release()
+
+    def give_back(self, points: int, hint: int) -> None:
+        i = hint % len(self._locks)
+        with self._locks[i]:
+            self._remaining[i] += points
+
+    def commit(self, points: int, hint: int) -> None:
+        i = hint % len(self._locks)
+        with self._locks[i]:
+            self._committed[i] += points
+
+    def remaining(self) -> int:
+        # Unlocked sum: exact when idle, otherwise within the points in flight
+        return sum(self._remaining)
+
+    def spent(self) -> int:
+        return self._spent_before + sum(self._committed)
+
+
+class _Account:
+    __slots__ = ("period", "spent", "reserved")
+
+    def __init__(self, period: str, spent: int):
+        self.period = period
+        self.spent = spent
+        self.reserved = 0
+
+
+class Reservation:
+    """Points held against a sender's account and the program total until committed or released."""
+
+    __slots__ = ("points", "hint", "shard", "account", "budget")
+
+    def __init__(self, points: int, hint: int, shard: int, account: Optional[_Account],
+                 budget: Optional[StripedBudget]):
+        self.points = points
+        self.hint = hint
+        self.shard = shard
+        self.account = account
+        self.budget = budget
+
+
+class PointsBudgetLedger:
+    """Per-tenant points budgets for the programs' ``budget_config``.
+
+    ``reserve`` holds a recognition's points before it is written and
+    raises BudgetExceeded if they would overspend; ``commit`` makes them
+    spent once the write succeeded and ``release`` returns them if it did
+    not. ``load_spent(tenant_id, program_id, since, sender_id)`` seeds a
+    new period from points already in the recognition ledger (sender_id
+    None for the program total), so a restart does not reset budgets.
+    A disabled ledger reserves nothing.
+    """
+
+    def __init__(self, programs: Dict[str, Dict[str, Any]], shards: int = 64, stripes: int = 16,
+                 load_spent: Optional[Callable[[str, str, str, Optional[str]], int]] = None, enabled: bool = True):
+        self.programs = programs
+        self.stripes = stripes
+        self.load_spent = load_spent
+        self.enabled = enabled
+        self._locks = [threading.Lock() for _ in range(shards)]
+        self._accounts: List[Dict[Tuple[str, str, str], _Account]] = [{} for _ in range(shards)]
+        # (tenant_id, program_id) -> (period, budget)
+        self._totals: Dict[Tuple[str, str], Tuple[str, StripedBudget]] = {}
+        self._totals_lock = threading.Lock()
+
+    def _loaded(self, tenant_id: str, program_id: str, since: str, sender_id: Optional[str]) -> int:
+        return self.load_spent(tenant_id, program_id, since, sender_id) if self.load_spent and since else 0
+
+    def _account(self, key: Tuple[str, str, str], shard: int, period: str, since: str) -> _Account:
+        """The sender's account for ``period``, seeded outside the shard lock so its ledger query holds up nobody."""
+        account = self._accounts[shard].get(key)
+        if account is not None and account.period == period:
+            return account
+        fresh = _Account(period, self._loaded(key[0], key[1], since, key[2]))
+        with self._locks[shard]:
+            account = self._accounts[shard].get(key)
+            if account is None or account.period != period:
+                account = self._accounts[shard][key] = fresh
+            return account
+
+    def _program_budget(self, tenant_id: str, program_id: str, config: Dict[str, Any], now: datetime) -> StripedBudget:
+        period, since = period_of(config.get("total_period", DEFAULT_TOTAL_PERIOD), now)
+        current = self._totals.get((tenant_id, program_id))
+        if current is not None and current[0] == period:
+            return current[1]
+        # Seeded outside the lock, so other programs are not held up by this one's ledger query; when
+        # two callers race to seed the same period the first to install its budget wins
+        budget = StripedBudget(config["total_budget"], self.stripes, self._loaded(tenant_id, program_id, since, None))
+        with self._totals_lock:
+            current = self._totals.get((tenant_id, program_id))
+            if current is None or current[0] != period:
+                current = self._totals[(tenant_id, program_id)] = (period, budget)
+            return current[1]
+
+    def reserve(self, tenant_id: str, program_id: str, sender_id: str, points: int,
+                now: Optional[datetime] = None) -> Optional[Reservation]:
+        if points < 0:
+            raise ValueError(f"points must not be negative, got {points}")
+        config = self.programs.get(program_id, {}).get("budget_config")
+        if not self.enabled or not config or points == 0:
+            return None
+        now = now or datetime.now()
+        key = (tenant_id, program_id, sender_id)
+        hint = hash(key)
+        shard = hint % len(self._locks)
+        account = None
+        limit = config.get("individual_limit")
+        if limit is not None:
+            frequency = config.get("frequency_limit")
+            period, since = period_of(frequency, now)
+            account = self._account(key, shard, period, since)
+            with self._locks[shard]:
+                left = limit - account.spent - account.reserved
+                if points > left:
+                    raise BudgetExceeded(
+                        "INDIVIDUAL_LIMIT_EXCEEDED",
+                        f"{points} points exceed the {max(left, 0)} of {limit} left for {sender_id} "
+                        f"in {program_id} this {frequency or 'program'} period"
+                    )
+                account.reserved += points
+        budget = None
+        if config.get("total_budget") is not None:
+            budget = self._program_budget(tenant_id, program_id, config, now)
+            if not budget.take(points, hint):
+                if account is not None:
+                    with self._locks[shard]:
+                        account.reserved -= points
+                raise BudgetExceeded(
+                    "PROGRAM_BUDGET_EXHAUSTED",
+                    f"{program_id} has {budget.remaining()} of its {budget.total} points left for {tenant_id}"
+                )
+        return Reservation(points, hint, shard, account, budget)
+
+    def commit(self, reservation: Optional[Reservation]) -> None:
+        if reservation is None:
+            return
+        if reservation.account is not None:
+            with self._locks[reservation.shard]:
+                reservation.account.reserved -= reservation.points
+                reservation.account.spent += reservation.points
+        if reservation.budget is not None:
+            reservation.budget.commit(reservation.points, reservation.hint)
+
+    def release(self, reservation: Optional[Reservation]) -> None:
+        if reservation is None:
+            return
+        if reservation.account is not None:
+            with self._locks[reservation.shard]:
+                reservation.account.reserved -= reservation.points
+        if reservation.budget is not None:
+            reservation.budget.give_back(reservation.points, reservation.hint)
+
+    def balance(self, tenant_id: str, program_id: str, sender_id: str,
+                now: Optional[datetime] = None) -> Optional[Dict[str, Any]]:
+        """``{"allocated", "spent", "reserved", "remaining", "period"}`` for one sender, None without a limit."""
+        config = self.programs.get(program_id, {}).get("budget_config") or {}
+        limit = config.get("individual_limit")
+        if limit is None:
+            return None
+        key = (tenant_id, program_id, sender_id)
+        period, since = period_of(config.get("frequency_limit"), now or datetime.now())
+        shard = hash(key) % len(self._locks)
+        with self._locks[shard]:
+            account = self._accounts[shard].get(key)
+            if account is not None and account.period == period:
+                spent, reserved = account.spent, account.reserved
+            else:
+                account = None
+        if account is None:
+            spent, reserved = self._loaded(tenant_id, program_id, since, sender_id), 0
+        return {"allocated": limit, "spent": spent, "reserved": reserved,
+                "remaining": max(0, limit - spent - reserved), "period": period}
+
+    def stats(self) -> Dict[str, Any]:
+        programs = {}
+        for (tenant_id, program_id), (period, budget) in sorted(list(self._totals.items())):
+            remaining, spent = budget.remaining(), budget.spent()
+            programs[f"{tenant_id}/{program_id}"] = {
+                "period": period,
+                "total": budget.total,
+                "spent": spent,
+                "reserved": max(0, budget.total - remaining - spent),
+                "remaining": remaining,
+                "rebalances": budget.rebalances,
+            }
+        return {
+            "enabled": self.enabled,
+            "shards": len(self._locks),
+            "stripes": self.stripes,
+            "accounts": sum(len(accounts) for accounts in self._accounts),
+            "programs": programs,
+        }
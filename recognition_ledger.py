@@ -0,0 +1,471 @@
+"""
+Append-only recognition ledger backed by SQLite
+Keeps per-user running counters and monthly rollups next to the raw history
+so summaries and analytics never need a scan of a user's recognitions
+"""
+import base64
+import json
+import queue
+import sqlite3
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from datetime import date
+from typing import List, Optional, Dict, Any, Iterable, Iterator, Tuple
+
+from compact_records import RECOGNITION_FIELDS, RecognitionRecord
+
+RECORD_FIELDS = RECOGNITION_FIELDS
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS recognitions (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    recognition_id TEXT NOT NULL UNIQUE,
+    tenant_id TEXT NOT NULL,
+    sender_id TEXT NOT NULL,
+    sender_name TEXT,
+    recipient_id TEXT NOT NULL,
+    recipient_name TEXT,
+    program_id TEXT,
+    program_name TEXT,
+    behavior_id TEXT,
+    behavior_name TEXT,
+    points INTEGER NOT NULL DEFAULT 0,
+    title TEXT,
+    message TEXT,
+    created_at TEXT NOT NULL,
+    status TEXT,
+    visibility TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_recognitions_sender ON recognitions (tenant_id, sender_id, seq);
+CREATE INDEX IF NOT EXISTS idx_recognitions_recipient ON recognitions (tenant_id, recipient_id, seq);
+-- Cover points_sent_since, for a program's total and for one sender: a range scan over one period
+CREATE INDEX IF NOT EXISTS idx_recognitions_program ON recognitions (tenant_id, program_id, created_at, points);
+CREATE INDEX IF NOT EXISTS idx_recognitions_sender_program ON recognitions (tenant_id, sender_id, program_id, created_at, points);
+CREATE TABLE IF NOT EXISTS user_counters (
+    tenant_id TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    sent_count INTEGER NOT NULL DEFAULT 0,
+    received_count INTEGER NOT NULL DEFAULT 0,
+    points_sent INTEGER NOT NULL DEFAULT 0,
+    points_received INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (tenant_id, user_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS monthly_rollups (
+    tenant_id TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    month TEXT NOT NULL,
+    sent_count INTEGER NOT NULL DEFAULT 0,
+    received_count INTEGER NOT NULL DEFAULT 0,
+    points_sent INTEGER NOT NULL DEFAULT 0,
+    points_received INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (tenant_id, user_id, month)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS behavior_counts (
+    tenant_id TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    behavior_name TEXT NOT NULL,
+    count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (tenant_id, user_id, behavior_name)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS collaborator_counts (
+    tenant_id TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    collaborator_id TEXT NOT NULL,
+    count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (tenant_id, user_id, collaborator_id)
+) WITHOUT ROWID;
+"""
+
+UPSERT_COUNTERS = """
+INSERT INTO user_counters (tenant_id, user_id, sent_count, received_count, points_sent, points_received)
+VALUES (?, ?, ?, ?, ?, ?)
+ON CONFLICT (tenant_id, user_id) DO UPDATE SET
+    sent_count = sent_count + excluded.sent_count,
+    received_count = received_count + excluded.received_count,
+    points_sent = points_sent + excluded.points_sent,
+    points_received = points_received + excluded.points_received
+"""
+
+UPSERT_MONTHLY = """
+INSERT INTO monthly_rollups (tenant_id, user_id, month, sent_count, received_count, points_sent, points_received)
+VALUES (?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (tenant_id, user_id, month) DO UPDATE SET
+    sent_count = sent_count + excluded.sent_count,
+    received_count = received_count + excluded.received_count,
+    points_sent = points_sent + excluded.points_sent,
+    points_received = points_received + excluded.points_received
+"""
+
+UPSERT_BEHAVIOR = """
+INSERT INTO behavior_counts (tenant_id, user_id, behavior_name, count) VALUES (?, ?, ?, ?)
+ON CONFLICT (tenant_id, user_id, behavior_name) DO UPDATE SET count = count + excluded.count
+"""
+
+UPSERT_COLLABORATOR = """
+INSERT INTO collaborator_counts (tenant_id, user_id, collaborator_id, count) VALUES (?, ?, ?, ?)
+ON CONFLICT (tenant_id, user_id, collaborator_id) DO UPDATE SET count = count + excluded.count
+"""
+
+
+def trailing_months(months: int, today: Optional[date] = None) -> List[str]:
+    """Return the last ``months`` month keys (YYYY-MM), oldest first, ending with today's month."""
+    today = today or date.today()
+    year, month = today.year, today.month
+    keys = []
+    for _ in range(months):
+        keys.append(f"{year:04d}-{month:02d}")
+        month -= 1
+        if month == 0:
+            year, month = year - 1, 12
+    return keys[::-1]
+
+
+def encode_cursor(user_id: str, seq: int) -> str:
+    payload = json.dumps({"u": user_id, "s": seq}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, user_id: str) -> int:
+    """Return the keyset position in ``cursor``; raises ValueError if it is malformed or for another user."""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        seq = int(payload["s"])
+        owner = payload["u"]
+    except (ValueError, TypeError, KeyError) as e:
+        raise ValueError("Invalid pagination cursor") from e
+    if owner != user_id:
+        raise ValueError("Pagination cursor was issued for a different user")
+    return seq
+
+
+class RecognitionLedger:
+    """SQLite recognition history and rollups.
+
+    Writes go through one connection under a lock. File-backed ledgers
+    also keep a pool of up to ``read_connections`` reader connections:
+    WAL lets those run concurrently with each other and with the writer,
+    and sqlite3 releases the GIL while a query executes. An in-memory
+    database cannot be shared between connections, so there reads use the
+    writer connection under the same lock.
+    """
+
+    def __init__(self, path: str = ":memory:", read_connections: int = 4):
+        self.path = path
+        self._lock = threading.RLock()
+        self._conn = self._connect()
+        if path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self.read_connections = read_connections if path != ":memory:" else 0
+        self._readers: "queue.Queue[sqlite3.Connection]" = queue.Queue()
+        self._opened_readers = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    @contextmanager
+    def _reader(self) -> Iterator[sqlite3.Connection]:
+        if not self.read_connections:
+            with self._lock:
+                yield self._conn
+            return
+        try:
+            conn = self._readers.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                opened = self._opened_readers < self.read_connections
+                if opened:
+                    self._opened_readers += 1
+            conn = self._connect() if opened else self._readers.get()
+        try:
+            yield conn
+        finally:
+            self._readers.put(conn)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+            while True:
+                try:
+                    self._readers.get_nowait().close()
+                except queue.Empty:
+                    break
+
+    def append(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        return self.append_many([record])[0]
+
+    def append_many(self, records: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Append recognitions and fold them into the rollups in a single transaction."""
+        records = list(records)
+        rows = [tuple(r.get(field) for field in RECORD_FIELDS) for r in records]
+
+        counters: Dict[tuple, List[int]] = {}
+        monthly: Dict[tuple, List[int]] = {}
+        behaviors: Counter = Counter()
+        collaborators: Counter = Counter()
+        for r in records:
+            tenant_id, sender_id, recipient_id = r["tenant_id"], r["sender_id"], r["recipient_id"]
+            points = r.get("points") or 0
+            month = r["created_at"][:7]
+            for key, totals in (((tenant_id, sender_id), counters), ((tenant_id, sender_id, month), monthly)):
+                acc = totals.setdefault(key, [0, 0, 0, 0])
+                acc[0] += 1
+                acc[2] += points
+            for key, totals in (((tenant_id, recipient_id), counters), ((tenant_id, recipient_id, month), monthly)):
+                acc = totals.setdefault(key, [0, 0, 0, 0])
+                acc[1] += 1
+                acc[3] += points
+            if r.get("behavior_name"):
+                behaviors[(tenant_id, sender_id, r["behavior_name"])] += 1
+                behaviors[(tenant_id, recipient_id, r["behavior_name"])] += 1
+            collaborators[(tenant_id, sender_id, recipient_id)] += 1
+            collaborators[(tenant_id, recipient_id, sender_id)] += 1
+
+        placeholders = ", ".join("?" for _ in RECORD_FIELDS)
+        with self._lock:
+            conn = self._conn
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.executemany(
+                    f"INSERT INTO recognitions ({', '.join(RECORD_FIELDS)}) VALUES ({placeholders})", rows
+                )
+                conn.executemany(UPSERT_COUNTERS, [k + tuple(v) for k, v in counters.items()])
+                conn.executemany(UPSERT_MONTHLY, [k + tuple(v) for k, v in monthly.items()])
+                conn.executemany(UPSERT_BEHAVIOR, [k + (v,) for k, v in behaviors.items()])
+                conn.executemany(UPSERT_COLLABORATOR, [k + (v,) for k, v in collaborators.items()])
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        return records
+
+    def last_seq(self) -> int:
+        with self._reader() as conn:
+            row = conn.execute("SELECT MAX(seq) FROM recognitions").fetchone()
+        return row[0] or 0
+
+    def iter_since(self, after_seq: int, batch_size: int = 10_000) -> Iterator[RecognitionRecord]:
+        """Yield raw ledger rows with seq > ``after_seq`` in write order, for replaying derived state."""
+        columns = ", ".join(("seq",) + RECORD_FIELDS)
+        while True:
+            with self._reader() as conn:
+                rows = conn.execute(
+                    f"SELECT {columns} FROM recognitions WHERE seq > ? ORDER BY seq LIMIT ?",
+                    (after_seq, batch_size),
+                ).fetchall()
+            if not rows:
+                return
+            for row in rows:
+                yield RecognitionRecord.from_row(row)
+            after_seq = rows[-1]["seq"]
+
+    def iter_tenant(self, tenant_id: str, after_seq: int, upto_seq: int,
+                    batch_size: int = 10_000) -> Iterator[RecognitionRecord]:
+        """Yield one tenant's rows with ``after_seq`` < seq <= ``upto_seq`` in write order."""
+        columns = ", ".join(("seq",) + RECORD_FIELDS)
+        while after_seq < upto_seq:
+            with self._reader() as conn:
+                rows = conn.execute(
+                    f"SELECT {columns} FROM recognitions WHERE tenant_id = ? AND seq > ? AND seq <= ? "
+                    f"ORDER BY seq LIMIT ?",
+                    (tenant_id, after_seq, upto_seq, batch_size),
+                ).fetchall()
+            if not rows:
+                return
+            for row in rows:
+                yield RecognitionRecord.from_row(row)
+            after_seq = rows[-1]["seq"]
+
+    def records_by_seq(self, seqs: List[int]) -> Dict[int, Dict[str, Any]]:
+        """Rows keyed by seq for the given ledger positions; unknown ones are left out."""
+        if not seqs:
+            return {}
+        with self._reader() as conn:
+            rows = conn.execute(
+                f"SELECT seq, {', '.join(RECORD_FIELDS)} FROM recognitions "
+                f"WHERE seq IN ({', '.join('?' for _ in seqs)})",
+                list(seqs),
+            ).fetchall()
+        return {row["seq"]: dict(row) for row in rows}
+
+    def summary(self, tenant_id: str, user_id: str) -> Dict[str, int]:
+        with self._reader() as conn:
+            row = conn.execute(
+                "SELECT sent_count, received_count, points_sent, points_received FROM user_counters "
+                "WHERE tenant_id = ? AND user_id = ?",
+                (tenant_id, user_id),
+            ).fetchone()
+        if row is None:
+            return {"total_sent": 0, "total_received": 0, "points_sent": 0, "points_received": 0}
+        return {
+            "total_sent": row["sent_count"],
+            "total_received": row["received_count"],
+            "points_sent": row["points_sent"],
+            "points_received": row["points_received"],
+        }
+
+    def points_sent_since(self, tenant_id: str, program_id: str, since: str, sender_id: Optional[str] = None) -> int:
+        """Points of ``program_id`` recognitions created at or after ``since``, by one sender or in total."""
+        query = "SELECT COALESCE(SUM(points), 0) FROM recognitions WHERE tenant_id = ? AND program_id = ? AND created_at >= ?"
+        params: Tuple[Any, ...] = (tenant_id, program_id, since)
+        if sender_id is not None:
+            query += " AND sender_id = ?"
+            params += (sender_id,)
+        with self._reader() as conn:
+            return conn.execute(query, params).fetchone()[0]
+
+    def monthly_trends(self, tenant_id: str, user_id: str, months: List[str]) -> Dict[str, List[int]]:
+        with self._reader() as conn:
+            rows = conn.execute(
+                "SELECT month, sent_count, received_count FROM monthly_rollups "
+                "WHERE tenant_id = ? AND user_id = ? AND month BETWEEN ? AND ?",
+                (tenant_id, user_id, months[0], months[-1]),
+            ).fetchall()
+        by_month = {row["month"]: row for row in rows}
+        return {
+            "monthly_sent": [by_month[m]["sent_count"] if m in by_month else 0 for m in months],
+            "monthly_received": [by_month[m]["received_count"] if m in by_month else 0 for m in months],
+        }
+
+    def top_behaviors(self, tenant_id: str, user_id: str, limit: int = 5) -> List[Dict[str, Any]]:
+        with self._reader() as conn:
+            rows = conn.execute(
+                "SELECT behavior_name, count FROM behavior_counts WHERE tenant_id = ? AND user_id = ? "
+                "ORDER BY count DESC, behavior_name LIMIT ?",
+                (tenant_id, user_id, limit),
+            ).fetchall()
+        return [{"behavior_name": row["behavior_name"], "count": row["count"]} for row in rows]
+
+    def frequent_collaborators(self, tenant_id: str, user_id: str, limit: int = 5) -> List[Dict[str, Any]]:
+        with self._reader() as conn:
+            rows = conn.execute(
+                "SELECT collaborator_id, count FROM collaborator_counts WHERE tenant_id = ? AND user_id = ? "
+                "ORDER BY count DESC, collaborator_id LIMIT ?",
+                (tenant_id, user_id, limit),
+            ).fetchall()
+        return [{"user_id": row["collaborator_id"], "interaction_count": row["count"]} for row in rows]
+
+    def page(
+        self,
+        tenant_id: str,
+        user_id: str,
+        limit: int = 20,
+        before_seq: Optional[int] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+    ) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+        """Keyset page of recognitions sent or received by a user, newest first.
+
+        Returns the page and the seq to pass as ``before_seq`` for the next
+        page, or None when there are no more rows. ``since`` is inclusive and
+        ``until`` exclusive; both compare against the ISO ``created_at``.
+        """
+        conditions = ""
+        params: List[Any] = []
+        if before_seq is not None:
+            conditions += " AND seq < ?"
+            params.append(before_seq)
+        if since:
+            conditions += " AND created_at >= ?"
+            params.append(since)
+        if until:
+            conditions += " AND created_at < ?"
+            params.append(until)
+        columns = ", ".join(("seq",) + RECORD_FIELDS)
+        fetch = limit + 1
+        with self._reader() as conn:
+            rows = conn.execute(
+                f"SELECT * FROM ("
+                f"SELECT {columns} FROM recognitions WHERE tenant_id = ? AND sender_id = ?{conditions} "
+                f"ORDER BY seq DESC LIMIT ?) "
+                f"UNION "
+                f"SELECT * FROM ("
+                f"SELECT {columns} FROM recognitions WHERE tenant_id = ? AND recipient_id = ?{conditions} "
+                f"ORDER BY seq DESC LIMIT ?) "
+                f"ORDER BY seq DESC LIMIT ?",
+                [tenant_id, user_id, *params, fetch, tenant_id, user_id, *params, fetch, fetch],
+            ).fetchall()
+        next_seq = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_seq = rows[-1]["seq"]
+        return [self.to_response_record(dict(row), user_id) for row in rows], next_seq
+
+    def count(self, tenant_id: str, user_id: str, since: Optional[str] = None, until: Optional[str] = None) -> int:
+        """Recognitions sent or received by a user with ``created_at`` in [since, until), as ``page`` filters them."""
+        conditions = ""
+        params: List[Any] = []
+        if since:
+            conditions += " AND created_at >= ?"
+            params.append(since)
+        if until:
+            conditions += " AND created_at < ?"
+            params.append(until)
+        with self._reader() as conn:
+            return conn.execute(
+                f"SELECT COUNT(*) FROM ("
+                f"SELECT seq FROM recognitions WHERE tenant_id = ? AND sender_id = ?{conditions} "
+                f"UNION "
+                f"SELECT seq FROM recognitions WHERE tenant_id = ? AND recipient_id = ?{conditions})",
+                [tenant_id, user_id, *params, tenant_id, user_id, *params],
+            ).fetchone()[0]
+
+    def collaborator_counts(self, tenant_id: str, user_id: str) -> Dict[str, int]:
+        """Recognitions exchanged with each collaborator, in either direction."""
+        with self._reader() as conn:
+            rows = conn.execute(
+                "SELECT collaborator_id, count FROM collaborator_counts WHERE tenant_id = ? AND user_id = ?",
+                (tenant_id, user_id),
+            ).fetchall()
+        return {row["collaborator_id"]: row["count"] for row in rows}
+
+    def recent_received(self, tenant_id: str, user_id: str, limit: int = 3) -> List[Dict[str, Any]]:
+        columns = ", ".join(RECORD_FIELDS)
+        with self._reader() as conn:
+            rows = conn.execute(
+                f"SELECT {columns} FROM recognitions WHERE tenant_id = ? AND recipient_id = ? "
+                f"ORDER BY seq DESC LIMIT ?",
+                (tenant_id, user_id, limit),
+            ).fetchall()
+        return [self.to_response_record(dict(row), user_id) for row in rows]
+
+    def iter_history(
+        self,
+        tenant_id: str,
+        user_id: str,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        page_size: int = 500,
+    ) -> Iterator[Dict[str, Any]]:
+        """Yield a user's full history page by page, holding at most one page in memory."""
+        before_seq = None
+        while True:
+            records, before_seq = self.page(tenant_id, user_id, page_size, before_seq, since, until)
+            yield from records
+            if before_seq is None:
+                return
+
+    @staticmethod
+    def to_response_record(row: Dict[str, Any], viewer_id: str) -> Dict[str, Any]:
+        return {
+            "recognition_id": row["recognition_id"],
+            "type": "sent" if row["sender_id"] == viewer_id else "received",
+            "sender_id": row["sender_id"],
+            "sender_name": row["sender_name"],
+            "recipient_id": row["recipient_id"],
+            "recipient_name": row["recipient_name"],
+            "program_id": row["program_id"],
+            "program_name": row["program_name"],
+            "behavior_id": row["behavior_id"],
+            "behavior_name": row["behavior_name"],
+            "points": row["points"],
+            "title": row["title"],
+            "message": row["message"],
+            "date": row["created_at"],
+            "status": row["status"],
+            "visibility": row["visibility"],
+        }
@@ -0,0 +1,344 @@
+"""
+Full-text search over recognition titles, messages, behavior and program names
+Each tenant gets an inverted index, built from its ledger history on first
+search and then kept current from the write path like the team views.
+Documents go into a small mutable tail that is sealed into immutable
+segments once full: postings grouped by term plus one column per filter
+field, so a query reads only its own terms' postings and ranks them with
+BM25. NumPy is used when installed, with a pure-Python fallback otherwise
+"""
+import heapq
+import math
+import re
+import threading
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from datetime import datetime
+from typing import List, Optional, Dict, Any, Iterable, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - exercised only without numpy
+    np = None
+
+# Record fields whose text is indexed
+TEXT_FIELDS = ("title", "message", "behavior_name", "program_name")
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have i in is it its of on or our so that the their this to was we "
+    "were with you your".split()
+)
+TOKEN = re.compile(r"[^\W_]+")
+# BM25 parameters (the usual defaults)
+K1 = 1.2
+B = 0.75
+SEGMENT_SIZE = 65_536
+MAX_DOC_LENGTH = 65_535
+_EPOCH = datetime(1970, 1, 1)
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    if not text:
+        return []
+    return [token for token in TOKEN.findall(text.lower()) if token not in STOPWORDS]
+
+
+def to_seconds(value: str) -> int:
+    """Seconds since the epoch of an ISO date/datetime, read as wall-clock time."""
+    return int((datetime.fromisoformat(value).replace(tzinfo=None) - _EPOCH).total_seconds())
+
+
+class _Segment:
+    """Up to SEGMENT_SIZE documents: one column per filter field and postings by term.
+
+    The tail segment takes new documents, with postings in a per-term dict;
+    sealing groups them into one docs/tfs run per term, after which nothing
+    in the segment changes and it can be read without the index lock.
+    """
+
+    def __init__(self, base: int):
+        self.base = base
+        self.seqs = array("q")
+        self.lengths = array("H")
+        self.created = array("q")
+        self.senders = array("i")
+        self.recipients = array("i")
+        self.programs = array("i")
+        self.behaviors = array("i")
+        self.public = array("b")
+        self.open_postings: Optional[Dict[int, Tuple[array, array]]] = {}
+        self.terms = array("I")
+        self.offsets = array("I")
+        self.docs = array("I")
+        self.tfs = array("H")
+
+    def __len__(self) -> int:
+        return len(self.seqs)
+
+    def seal(self) -> None:
+        for term_id in sorted(self.open_postings):
+            docs, tfs = self.open_postings[term_id]
+            self.terms.append(term_id)
+            self.offsets.append(len(self.docs))
+            self.docs.extend(docs)
+            self.tfs.extend(tfs)
+        self.offsets.append(len(self.docs))
+        self.open_postings = None
+
+    def postings(self, term_id: int) -> Optional[Tuple[Any, Any]]:
+        """(docs, tfs) of a term; array slices when sealed, the live arrays in the tail."""
+        if self.open_postings is not None:
+            return self.open_postings.get(term_id)
+        i = bisect_left(self.terms, term_id)
+        if i == len(self.terms) or self.terms[i] != term_id:
+            return None
+        start, end = self.offsets[i], self.offsets[i + 1]
+        return self.docs[start:end], self.tfs[start:end]
+
+
+class SearchFilters:
+    """Encoded filters of one query; a code of -2 matches nothing (unknown user, program or behavior)."""
+
+    __slots__ = ("user", "direction", "program", "behavior", "since", "until", "viewer")
+
+    def __init__(self, user: Optional[int] = None, direction: str = "any", program: Optional[int] = None,
+                 behavior: Optional[int] = None, since: Optional[int] = None, until: Optional[int] = None,
+                 viewer: int = -2):
+        self.user = user
+        self.direction = direction
+        self.program = program
+        self.behavior = behavior
+        self.since = since
+        self.until = until
+        self.viewer = viewer
+
+
+class TenantSearchIndex:
+    """Inverted index over one tenant's recognitions.
+
+    ``add`` is called in ledger order; ``search`` may run concurrently
+    from other threads. Sealed segments are immutable and searched without
+    the lock; only the tail is read under it.
+    """
+
+    def __init__(self, segment_size: int = SEGMENT_SIZE):
+        self.segment_size = segment_size
+        self._lock = threading.Lock()
+        self._terms: Dict[str, int] = {}
+        self._df = array("I")
+        self._users: Dict[str, int] = {}
+        self._programs: Dict[str, int] = {}
+        self._behaviors: Dict[str, int] = {}
+        self._sealed: List[_Segment] = []
+        self._tail = _Segment(0)
+        self.documents = 0
+        self.total_length = 0
+        self.last_seq = 0
+
+    @staticmethod
+    def _code(lookup: Dict[str, int], value: Optional[str]) -> int:
+        if value is None:
+            return -1
+        code = lookup.get(value)
+        if code is None:
+            code = lookup[value] = len(lookup)
+        return code
+
+    def add(self, record: Dict[str, Any]) -> None:
+        tokens = tokenize(" ".join(record[field] for field in TEXT_FIELDS if record[field]))
+        with self._lock:
+            terms, df, tail = self._terms, self._df, self._tail
+            doc = len(tail)
+            for token, tf in Counter(tokens).items():
+                term_id = terms.get(token)
+                if term_id is None:
+                    term_id = terms[token] = len(df)
+                    df.append(0)
+                df[term_id] += 1
+                postings = tail.open_postings.get(term_id)
+                if postings is None:
+                    postings = tail.open_postings[term_id] = (array("I"), array("H"))
+                postings[0].append(doc)
+                postings[1].append(tf if tf < MAX_DOC_LENGTH else MAX_DOC_LENGTH)
+            tail.seqs.append(record["seq"])
+            tail.lengths.append(min(len(tokens), MAX_DOC_LENGTH))
+            tail.created.append(to_seconds(record["created_at"]))
+            tail.senders.append(self._code(self._users, record["sender_id"]))
+            tail.recipients.append(self._code(self._users, record["recipient_id"]))
+            tail.programs.append(self._code(self._programs, record["program_id"]))
+            tail.behaviors.append(self._code(self._behaviors, record["behavior_id"]))
+            tail.public.append(record["visibility"] in (None, "public"))
+            self.documents += 1
+            self.total_length += len(tokens)
+            self.last_seq = record["seq"]
+            if doc + 1 == self.segment_size:
+                tail.seal()
+                self._sealed.append(tail)
+                self._tail = _Segment(tail.base + doc + 1)
+
+    def add_many(self, records: Iterable[Dict[str, Any]]) -> None:
+        for record in records:
+            self.add(record)
+
+    def encode_filters(self, viewer_id: Optional[str] = None, user_id: Optional[str] = None, direction: str = "any",
+                       program_id: Optional[str] = None, behavior_id: Optional[str] = None,
+                       since: Optional[str] = None, until: Optional[str] = None) -> SearchFilters:
+        """``direction`` is received, sent or any; ``since`` is inclusive, ``until`` exclusive."""
+        if direction not in ("received", "sent", "any"):
+            raise ValueError("direction must be received, sent or any")
+        return SearchFilters(
+            user=self._users.get(user_id, -2) if user_id else None,
+            direction=direction,
+            program=self._programs.get(program_id, -2) if program_id else None,
+            behavior=self._behaviors.get(behavior_id, -2) if behavior_id else None,
+            since=to_seconds(since) if since else None,
+            until=to_seconds(until) if until else None,
+            viewer=self._users.get(viewer_id, -2) if viewer_id else -2,
+        )
+
+    def search(self, query: str, filters: Optional[SearchFilters] = None, limit: int = 10) -> Tuple[List[Tuple[float, int]], int]:
+        """Top ``limit`` (score, seq) pairs by BM25, best first, and how many documents matched."""
+        filters = filters or SearchFilters()
+        with self._lock:
+            term_ids = list(dict.fromkeys(self._terms[token] for token in tokenize(query) if token in self._terms))
+            if not term_ids or not self.documents:
+                return [], 0
+            n, avgdl = self.documents, self.total_length / self.documents
+            idfs = [math.log(1 + (n - self._df[t] + 0.5) / (self._df[t] + 0.5)) for t in term_ids]
+            sealed = list(self._sealed)
+            # The tail is still being appended to, so it is scored before letting go of the lock
+            hits, matched = self._score(self._tail, term_ids, idfs, avgdl, filters, limit)
+        for segment in sealed:
+            segment_hits, segment_matched = self._score(segment, term_ids, idfs, avgdl, filters, limit)
+            hits.extend(segment_hits)
+            matched += segment_matched
+        return heapq.nlargest(limit, hits), matched
+
+    def _score(self, segment: _Segment, term_ids: List[int], idfs: List[float], avgdl: float,
+               filters: SearchFilters, limit: int) -> Tuple[List[Tuple[float, int]], int]:
+        postings = [(segment.postings(t), idf) for t, idf in zip(term_ids, idfs)]
+        postings = [(p, idf) for p, idf in postings if p is not None and len(p[0])]
+        if not postings:
+            return [], 0
+        if np is None:
+            return self._score_python(segment, postings, avgdl, filters, limit)
+
+        lengths = np.frombuffer(segment.lengths, dtype=np.uint16)
+        doc_parts, score_parts = [], []
+        for (docs, tfs), idf in postings:
+            docs = np.frombuffer(docs, dtype=np.uint32)
+            tfs = np.frombuffer(tfs, dtype=np.uint16).astype(np.float64)
+            norm = K1 * (1 - B + B * lengths[docs] / avgdl)
+            doc_parts.append(docs)
+            score_parts.append(idf * tfs * (K1 + 1) / (tfs + norm))
+        if len(doc_parts) == 1:
+            docs, scores = doc_parts[0].copy(), score_parts[0]
+        else:
+            docs, inverse = np.unique(np.concatenate(doc_parts), return_inverse=True)
+            scores = np.bincount(inverse, weights=np.concatenate(score_parts))
+
+        keep = self._mask(segment, docs, filters)
+        if keep is not None:
+            docs, scores = docs[keep], scores[keep]
+        matched = len(docs)
+        if matched > limit:
+            top = np.argpartition(-scores, limit - 1)[:limit]
+            docs, scores = docs[top], scores[top]
+        seqs = np.frombuffer(segment.seqs, dtype=np.int64)[docs]
+        return list(zip(scores.tolist(), seqs.tolist())), matched
+
+    @staticmethod
+    def _mask(segment: _Segment, docs: Any, filters: SearchFilters) -> Any:
+        keep = None
+
+        def both(condition: Any) -> Any:
+            return condition if keep is None else keep & condition
+
+        senders = np.frombuffer(segment.senders, dtype=np.int32)[docs]
+        recipients = np.frombuffer(segment.recipients, dtype=np.int32)[docs]
+        public = np.frombuffer(segment.public, dtype=np.int8)[docs]
+        if not public.all():
+            keep = both((public != 0) | (senders == filters.viewer) | (recipients == filters.viewer))
+        if filters.user is not None:
+            if filters.direction == "sent":
+                keep = both(senders == filters.user)
+            elif filters.direction == "received":
+                keep = both(recipients == filters.user)
+            else:
+                keep = both((senders == filters.user) | (recipients == filters.user))
+        if filters.program is not None:
+            keep = both(np.frombuffer(segment.programs, dtype=np.int32)[docs] == filters.program)
+        if filters.behavior is not None:
+            keep = both(np.frombuffer(segment.behaviors, dtype=np.int32)[docs] == filters.behavior)
+        if filters.since is not None or filters.until is not None:
+            created = np.frombuffer(segment.created, dtype=np.int64)[docs]
+            if filters.since is not None:
+                keep = both(created >= filters.since)
+            if filters.until is not None:
+                keep = both(created < filters.until)
+        return keep
+
+    @staticmethod
+    def _visible(segment: _Segment, doc: int, filters: SearchFilters) -> bool:
+        sender, recipient = segment.senders[doc], segment.recipients[doc]
+        if not segment.public[doc] and filters.viewer not in (sender, recipient):
+            return False
+        if filters.user is not None:
+            if filters.direction == "sent" and sender != filters.user:
+                return False
+            if filters.direction == "received" and recipient != filters.user:
+                return False
+            if filters.direction == "any" and filters.user not in (sender, recipient):
+                return False
+        if filters.program is not None and segment.programs[doc] != filters.program:
+            return False
+        if filters.behavior is not None and segment.behaviors[doc] != filters.behavior:
+            return False
+        created = segment.created[doc]
+        if filters.since is not None and created < filters.since:
+            return False
+        return filters.until is None or created < filters.until
+
+    def _score_python(self, segment: _Segment, postings: List[Tuple[Tuple[Any, Any], float]], avgdl: float,
+                      filters: SearchFilters, limit: int) -> Tuple[List[Tuple[float, int]], int]:
+        scores: Dict[int, float] = {}
+        lengths = segment.lengths
+        for (docs, tfs), idf in postings:
+            for doc, tf in zip(docs, tfs):
+                norm = K1 * (1 - B + B * lengths[doc] / avgdl)
+                scores[doc] = scores.get(doc, 0.0) + idf * tf * (K1 + 1) / (tf + norm)
+        hits = [(score, segment.seqs[doc]) for doc, score in scores.items() if self._visible(segment, doc, filters)]
+        return heapq.nlargest(limit, hits), len(hits)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "documents": self.documents,
+                "terms": len(self._terms),
+                "segments": len(self._sealed) + 1,
+                "postings": sum(len(segment.docs) for segment in self._sealed)
+                            + sum(len(docs) for docs, _ in self._tail.open_postings.values()),
+                "last_seq": self.last_seq,
+            }
+
+
+class RecognitionSearchIndex:
+    """The per-tenant indexes that have been built; records for other tenants are skipped."""
+
+    def __init__(self, segment_size: int = SEGMENT_SIZE):
+        self.segment_size = segment_size
+        self._tenants: Dict[str, TenantSearchIndex] = {}
+
+    def get(self, tenant_id: str) -> Optional[TenantSearchIndex]:
+        return self._tenants.get(tenant_id)
+
+    def register(self, tenant_id: str, index: TenantSearchIndex) -> None:
+        self._tenants[tenant_id] = index
+
+    def apply(self, record: Dict[str, Any]) -> None:
+        index = self._tenants.get(record["tenant_id"])
+        if index is not None and record["seq"] > index.last_seq:
+            index.add(record)
+
+    def stats(self) -> Dict[str, Any]:
+        return {tenant_id: index.stats() for tenant_id, index in sorted(list(self._tenants.items()))}
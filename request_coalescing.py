@@ -0,0 +1,108 @@
+"""
+Single-flight coalescing of identical concurrent read-tool calls
+Calls are keyed like the response cache, on (tool, tenant_id, normalized
+args). The first caller starts the computation as a task; callers with the
+same key that arrive while it runs await that task instead of repeating
+the work, and all of them get its response. Writes forget a tenant's
+in-flight keys so calls made after them start fresh
+"""
+import asyncio
+import functools
+import inspect
+from collections import Counter
+from typing import Dict, Any, Awaitable, Callable
+
+from response_cache import ResponseCache
+
+
+class _Abandoned(Exception):
+    """Raised to waiters when the caller computing their response was cancelled."""
+
+
+class SingleFlight:
+    """In-flight calls by key on one event loop, with executed/coalesced counts per tool.
+
+    The first caller computes the response itself, so its tool metrics
+    include the work; later callers wait on a future it resolves. If that
+    caller is cancelled, one of the waiters takes over the computation.
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self._flights: Dict[tuple, "asyncio.Future"] = {}
+        self._waiters: Counter = Counter()
+        self.executed: Counter = Counter()
+        self.coalesced: Counter = Counter()
+        self.largest_flight = 0
+
+    async def run(self, key: tuple, compute: Callable[[], Awaitable[Any]]) -> Any:
+        tool = key[0]
+        while key in self._flights:
+            flight = self._flights[key]
+            self.coalesced[tool] += 1
+            self._waiters[flight] += 1
+            self.largest_flight = max(self.largest_flight, self._waiters[flight] + 1)
+            try:
+                # Shielded, so a waiter that is cancelled does not cancel the shared future
+                return await asyncio.shield(flight)
+            except _Abandoned:
+                self.coalesced[tool] -= 1
+
+        flight = asyncio.get_running_loop().create_future()
+        self._flights[key] = flight
+        self.executed[tool] += 1
+        try:
+            response = await compute()
+        except asyncio.CancelledError:
+            flight.set_exception(_Abandoned())
+            raise
+        except BaseException as e:
+            flight.set_exception(e)
+            raise
+        else:
+            flight.set_result(response)
+            return response
+        finally:
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+            self._waiters.pop(flight, None)
+            if flight.done() and not flight.cancelled():
+                flight.exception()  # retrieved here so a failure nobody waited for is not logged
+
+    def forget(self, tenant_id: str) -> int:
+        """Stop handing a tenant's in-flight computations to new callers; current waiters still get them."""
+        keys = [key for key in self._flights if key[1] == tenant_id]
+        for key in keys:
+            del self._flights[key]
+        return len(keys)
+
+    def stats(self) -> Dict[str, Any]:
+        calls = sum(self.executed.values()) + sum(self.coalesced.values())
+        return {
+            "enabled": self.enabled,
+            "executed": sum(self.executed.values()),
+            "coalesced": sum(self.coalesced.values()),
+            "coalesced_rate": round(sum(self.coalesced.values()) / calls, 4) if calls else 0.0,
+            "in_flight": len(self._flights),
+            "largest_flight": self.largest_flight,
+            "tools": {tool: {"executed": self.executed[tool], "coalesced": self.coalesced[tool]}
+                      for tool in sorted(set(self.executed) | set(self.coalesced))},
+        }
+
+
+def coalesced(flights: SingleFlight, tool: str):
+    """Share one in-flight computation between concurrent calls to an async tool with the same arguments."""
+    def decorator(fn):
+        signature = inspect.signature(fn)
+
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            if not flights.enabled:
+                return await fn(*args, **kwargs)
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            call_args = dict(bound.arguments)
+            key = ResponseCache.make_key(tool, call_args["tenant_id"], call_args)
+            return await flights.run(key, lambda: fn(*args, **kwargs))
+        return wrapper
+    return decorator
@@ -0,0 +1,218 @@
+"""
+TTL + LRU response cache for read tools with tag-based invalidation
+Entries are keyed on (tool, tenant_id, normalized args) and tagged with the
+tenant, users and teams they were built from, so writes can drop exactly
+the responses they affect. A response computed while an invalidation for
+its tenant landed is not stored. Optional per-tenant caps evict a tenant's
+own least recently used entries first, so one tenant cannot crowd out the rest
+"""
+import functools
+import inspect
+import json
+import threading
+import time
+from collections import Counter, OrderedDict
+from typing import Optional, Dict, Any, Callable, Iterable, Set, Tuple
+
+Tag = Tuple[str, ...]
+
+
+def tenant_tag(tenant_id: str) -> Tag:
+    return ("tenant", tenant_id)
+
+
+def user_tag(tenant_id: str, user_id: str) -> Tag:
+    return ("user", tenant_id, user_id)
+
+
+def team_tag(tenant_id: str, team: str) -> Tag:
+    return ("team", tenant_id, team)
+
+
+def roster_tag(tenant_id: str) -> Tag:
+    """Responses that depend on the tenant's roster as a whole, e.g. who falls in a hire-date cohort."""
+    return ("roster", tenant_id)
+
+
+class _Entry:
+    __slots__ = ("value", "expires_at", "size", "tags")
+
+    def __init__(self, value: Any, expires_at: float, size: int, tags: Set[Tag]):
+        self.value = value
+        self.expires_at = expires_at
+        self.size = size
+        self.tags = tags
+
+
+class ResponseCache:
+    def __init__(self, max_entries: int = 1024, max_bytes: int = 64 * 1024 * 1024, ttl_seconds: float = 30.0,
+                 tenant_max_entries: Optional[int] = None, tenant_max_bytes: Optional[int] = None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.tenant_max_entries = tenant_max_entries or max_entries
+        self.tenant_max_bytes = tenant_max_bytes or max_bytes
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[tuple, _Entry]" = OrderedDict()
+        self._by_tag: Dict[Tag, Set[tuple]] = {}
+        self._bytes = 0
+        # Per-tenant LRU order and size, for the per-tenant caps
+        self._by_tenant: Dict[str, "OrderedDict[tuple, None]"] = {}
+        self._tenant_bytes: Counter = Counter()
+        # Bumped by every invalidation touching a tenant (and, via the epoch, by clear), so a response
+        # computed across one can be recognized as possibly stale and not stored
+        self._generations: Counter = Counter()
+        self._epoch = 0
+        self.counters = {"hits": 0, "misses": 0, "evictions": 0, "tenant_evictions": 0, "expirations": 0,
+                         "invalidations": 0, "stale_puts": 0}
+
+    @staticmethod
+    def make_key(tool: str, tenant_id: str, args: Dict[str, Any]) -> tuple:
+        normalized = json.dumps(args, sort_keys=True, separators=(",", ":"), default=str)
+        return (tool, tenant_id, normalized)
+
+    def get(self, key: tuple) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.counters["misses"] += 1
+                return None
+            if entry.expires_at <= time.monotonic():
+                self._remove(key)
+                self.counters["expirations"] += 1
+                self.counters["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._by_tenant[key[1]].move_to_end(key)
+            self.counters["hits"] += 1
+            return entry.value
+
+    def generation(self, tenant_id: str) -> Tuple[int, int]:
+        """Token to pass to ``put`` for a response about to be computed from the tenant's current data."""
+        with self._lock:
+            return self._epoch, self._generations[tenant_id]
+
+    def put(self, key: tuple, value: Any, tags: Iterable[Tag], generation: Optional[Tuple[int, int]] = None) -> None:
+        """Store ``value``; skipped if ``generation`` shows the tenant was invalidated since it was taken."""
+        size = len(json.dumps(value, separators=(",", ":"), default=str))
+        if size > min(self.max_bytes, self.tenant_max_bytes):
+            return
+        tenant_id = key[1]
+        tags = set(tags) | {tenant_tag(tenant_id)}
+        with self._lock:
+            if generation is not None and generation != (self._epoch, self._generations[tenant_id]):
+                self.counters["stale_puts"] += 1
+                return
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = _Entry(value, time.monotonic() + self.ttl_seconds, size, tags)
+            self._bytes += size
+            self._by_tenant.setdefault(tenant_id, OrderedDict())[key] = None
+            self._tenant_bytes[tenant_id] += size
+            for tag in tags:
+                self._by_tag.setdefault(tag, set()).add(key)
+            tenant_keys = self._by_tenant[tenant_id]
+            while len(tenant_keys) > self.tenant_max_entries or self._tenant_bytes[tenant_id] > self.tenant_max_bytes:
+                self._remove(next(iter(tenant_keys)))
+                self.counters["tenant_evictions"] += 1
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.counters["evictions"] += 1
+
+    def invalidate(self, tags: Iterable[Tag]) -> int:
+        removed = 0
+        with self._lock:
+            for tag in tags:
+                self._generations[tag[1]] += 1
+                for key in list(self._by_tag.get(tag, ())):
+                    self._remove(key)
+                    removed += 1
+            self.counters["invalidations"] += removed
+        return removed
+
+    def invalidate_tenant(self, tenant_id: str) -> int:
+        return self.invalidate([tenant_tag(tenant_id)])
+
+    def clear(self) -> None:
+        with self._lock:
+            self._epoch += 1
+            self._entries.clear()
+            self._by_tag.clear()
+            self._by_tenant.clear()
+            self._tenant_bytes.clear()
+            self._bytes = 0
+
+    def _remove(self, key: tuple) -> None:
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+        tenant_id = key[1]
+        tenant_keys = self._by_tenant[tenant_id]
+        del tenant_keys[key]
+        self._tenant_bytes[tenant_id] -= entry.size
+        if not tenant_keys:
+            del self._by_tenant[tenant_id]
+            del self._tenant_bytes[tenant_id]
+        for tag in entry.tags:
+            keys = self._by_tag.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_tag[tag]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.counters["hits"] + self.counters["misses"]
+            return {
+                **self.counters,
+                "hit_rate": round(self.counters["hits"] / lookups, 4) if lookups else 0.0,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "tenant_max_entries": self.tenant_max_entries,
+                "tenant_max_bytes": self.tenant_max_bytes,
+                "ttl_seconds": self.ttl_seconds,
+            }
+
+    def tenant_usage(self) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            return {tenant_id: {"entries": len(keys), "bytes": self._tenant_bytes[tenant_id]}
+                    for tenant_id, keys in self._by_tenant.items()}
+
+
+def cached_tool(cache: ResponseCache, tool: str, tags_for: Callable[[Dict[str, Any], Dict[str, Any]], Iterable[Tag]]):
+    """Cache a read tool's successful responses; ``tags_for(args, response)`` names what they depend on."""
+    def decorator(fn):
+        signature = inspect.signature(fn)
+
+        def lookup(args, kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            call_args = dict(bound.arguments)
+            key = cache.make_key(tool, call_args["tenant_id"], call_args)
+            # Taken before computing, so an invalidation landing meanwhile keeps the result out of the cache
+            return call_args, key, cache.get(key), cache.generation(call_args["tenant_id"])
+
+        def store(call_args, key, generation, response):
+            if response.get("status") == "success":
+                cache.put(key, response, tags_for(call_args, response), generation)
+            return response
+
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                call_args, key, cached, generation = lookup(args, kwargs)
+                if cached is not None:
+                    return cached
+                return store(call_args, key, generation, await fn(*args, **kwargs))
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            call_args, key, cached, generation = lookup(args, kwargs)
+            if cached is not None:
+                return cached
+            return store(call_args, key, generation, fn(*args, **kwargs))
+        return wrapper
+    return decorator
@@ -0,0 +1,453 @@
+"""
+Streaming HR roster ingestion into the user directory
+Roster exports (CSV with a header row, or JSONL) are read record by record
+and validated and upserted in batches, so memory holds one batch however
+large the file. A full roster replaces the tenant's users: once the whole
+file is in, users missing from it are removed. A delta file carries only
+changed employees, merged field by field into their current records, plus
+rows with action=delete.
+Usage: python -m roster_ingest ROSTER --tenant-id ID [--delta] [--batch-size 5000] [--url http://host:port]
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from datetime import date
+from typing import TYPE_CHECKING, List, Optional, Dict, Any, Iterator, Tuple
+
+from compact_records import USER_SCHEMA, UserRecord
+
+if TYPE_CHECKING:
+    from mcp_schemas import TenantUserPartition
+
+FORMATS = ("csv", "jsonl")
+MODES = ("full", "delta")
+DEFAULT_BATCH_SIZE = 5_000
+# Invalid rows listed in a report; all of them are counted
+MAX_REPORTED_ERRORS = 100
+# Bytes read from a roster file at a time
+READ_CHUNK = 1 << 20
+# Separator of direct_reports ids in a CSV cell
+LIST_SEPARATOR = ";"
+# Longest CSV record (characters) that may run across lines inside quotes
+MAX_QUOTED_RECORD = 64 * 1024
+
+_SECTIONS = {section: fields for section, fields in USER_SCHEMA}
+_FIELD_SECTION = {field: section for section, fields in USER_SCHEMA for field in fields}
+
+
+class RosterError(ValueError):
+    """The roster as a whole cannot be read, e.g. an unknown CSV column."""
+
+
+def roster_format(name: Optional[str] = None, content_type: Optional[str] = None) -> str:
+    """csv or jsonl from a file name or an HTTP content type; CSV unless either says JSON."""
+    hint = f"{name or ''} {content_type or ''}".lower()
+    return "jsonl" if "json" in hint else "csv"
+
+
+class RecordSplitter:
+    """Splits roster text arriving in chunks of any size into whole records.
+
+    Records are lines, except that a CSV record continues onto the next
+    line while it has an unclosed quote. Quote parity is tracked line by
+    line, and a quoted record longer than MAX_QUOTED_RECORD raises
+    RosterError, so a stray quote cannot swallow the rest of the file.
+    Blank lines are dropped.
+    """
+
+    def __init__(self, fmt: str):
+        self.csv = fmt == "csv"
+        self._buffer = ""
+        # Lines of a CSV record with an unclosed quote, their size and the line it started on
+        self._open: List[str] = []
+        self._open_size = 0
+        self._open_line = 0
+        self._line = 0
+
+    def feed(self, text: str) -> List[str]:
+        lines = (self._buffer + text).split("\n")
+        self._buffer = lines.pop()
+        return self._records(lines)
+
+    def close(self) -> List[str]:
+        records = self._records([self._buffer])
+        record = "\n".join(self._open)
+        if record.strip():
+            records.append(record)
+        self._buffer = ""
+        self._open = []
+        self._open_size = 0
+        return records
+
+    def _records(self, lines: List[str]) -> List[str]:
+        records = []
+        for line in lines:
+            self._line += 1
+            if self.csv:
+                odd = line.count('"') % 2
+                if not self._open and odd:
+                    self._open_line = self._line
+                if self._open or odd:
+                    self._open.append(line)
+                    self._open_size += len(line) + 1
+                    if self._open_size > MAX_QUOTED_RECORD:
+                        raise RosterError(f"unclosed quote in the CSV record starting on line {self._open_line}")
+                    # An odd count opens the record on its first line and closes it on a later one
+                    if len(self._open) == 1 or not odd:
+                        continue
+                    line = "\n".join(self._open)
+                    self._open = []
+                    self._open_size = 0
+            if line.strip():
+                records.append(line)
+        return records
+
+
+def _column(name: str) -> Tuple[Optional[str], str]:
+    """(section, field) of a CSV column or flat JSON key: ``team``, ``role_info.team``, ``user_id``, ``action``."""
+    name = name.strip()
+    if name in ("user_id", "action"):
+        return None, name
+    section, _, field = name.rpartition(".")
+    if not section:
+        section = _FIELD_SECTION.get(field)
+    if section not in _SECTIONS or field not in _SECTIONS[section]:
+        raise RosterError(f"unknown roster column: {name}")
+    return section, field
+
+
+def _parse_value(field: str, value: str) -> Any:
+    if field == "direct_reports":
+        return [item.strip() for item in value.split(LIST_SEPARATOR) if item.strip()]
+    if field == "tenure_years":
+        try:
+            number = float(value)
+        except ValueError:
+            return value  # reported by validate
+        return int(number) if number.is_integer() else number
+    return value
+
+
+def validate(user: Dict[str, Any], existing: bool) -> List[str]:
+    """Schema problems of one nested user dict; a new user needs at least basic_info.name."""
+    problems = []
+    user_id = user.get("user_id")
+    if not isinstance(user_id, str) or not user_id.strip():
+        return ["user_id is required"]
+    for section, values in user.items():
+        if section == "user_id":
+            continue
+        if section not in _SECTIONS:
+            problems.append(f"unknown field {section}")
+            continue
+        if not isinstance(values, dict):
+            problems.append(f"{section} must be an object")
+            continue
+        problems.extend(f"unknown field {section}.{field}" for field in values if field not in _SECTIONS[section])
+    if problems:
+        return problems
+    basic, role, employment = (user.get(section, {}) for section, _ in USER_SCHEMA)
+    if not existing and not basic.get("name"):
+        problems.append("basic_info.name is required for a new user")
+    email = basic.get("email")
+    if email is not None and (not isinstance(email, str) or "@" not in email):
+        problems.append(f"basic_info.email is not an email address: {email!r}")
+    if role.get("manager_id") == user_id:
+        problems.append("role_info.manager_id is the user's own id")
+    reports = role.get("direct_reports")
+    if reports is not None and (not isinstance(reports, list) or not all(isinstance(r, str) for r in reports)):
+        problems.append("role_info.direct_reports must be a list of user ids")
+    hire_date = employment.get("hire_date")
+    if hire_date is not None:
+        try:
+            date.fromisoformat(hire_date)
+        except (TypeError, ValueError):
+            problems.append(f"employment_info.hire_date is not an ISO date: {hire_date!r}")
+    tenure = employment.get("tenure_years")
+    if tenure is not None and (isinstance(tenure, bool) or not isinstance(tenure, (int, float)) or tenure < 0):
+        problems.append(f"employment_info.tenure_years must be a non-negative number: {tenure!r}")
+    return problems
+
+
+class RosterIngestor:
+    """Validates and applies one roster file to a tenant partition, a batch of records at a time.
+
+    ``feed`` takes whole records (CSV lines, the header first, or JSONL
+    lines) and returns the ids and teams it changed so callers can drop
+    cached responses; ``finish`` prunes a full roster and returns the
+    report. Batches are applied as they come to a staged copy of the
+    partition, which ``finish`` swaps in whole: readers never iterate
+    maps the load is changing, and a failure part way through leaves the
+    tenant as it was. Rows are not checked
+    against each other (e.g. that managers exist), as a delta may
+    reference users loaded earlier.
+    """
+
+    def __init__(self, partition: "TenantUserPartition", fmt: str = "csv", mode: str = "full",
+                 max_errors: int = MAX_REPORTED_ERRORS):
+        if fmt not in FORMATS:
+            raise RosterError(f"format must be one of {', '.join(FORMATS)}")
+        if mode not in MODES:
+            raise RosterError(f"mode must be one of {', '.join(MODES)}")
+        self.partition = partition
+        # Copied on the first batch, so the copy is made on the thread applying the load
+        self._staged: Optional["TenantUserPartition"] = None
+        self.format = fmt
+        self.mode = mode
+        self.max_errors = max_errors
+        self._columns: Optional[List[Tuple[Optional[str], str]]] = None
+        # Ids in a full roster, to remove everyone else at the end
+        self._seen: Optional[set] = set() if mode == "full" else None
+        self.records = 0
+        self.created = 0
+        self.updated = 0
+        self.deleted = 0
+        self.invalid = 0
+        self.batches = 0
+        self.errors: List[Dict[str, Any]] = []
+        self.prune_skipped: Optional[str] = None
+        self.started = time.perf_counter()
+        self.elapsed: Optional[float] = None
+
+    def _rows(self, records: List[str]) -> Iterator[Tuple[int, Any]]:
+        """(record number, row) pairs; rows are ``{column: value}`` dicts, or an error string."""
+        if self.format == "jsonl":
+            for record in records:
+                self.records += 1
+                try:
+                    row = json.loads(record)
+                except ValueError as e:
+                    yield self.records, f"not valid JSON: {e}"
+                    continue
+                yield self.records, row if isinstance(row, dict) else "not a JSON object"
+            return
+        reader = csv.reader(records)
+        while True:
+            try:
+                fields = next(reader)
+            except StopIteration:
+                return
+            except csv.Error as e:
+                # The reader carries on with the next record
+                self.records += 1
+                if self._columns is None:
+                    raise RosterError(f"roster header is not valid CSV: {e}")
+                yield self.records, f"not valid CSV: {e}"
+                continue
+            self.records += 1
+            if self._columns is None:
+                self._columns = [_column(name) for name in fields]
+                if (None, "user_id") not in self._columns:
+                    raise RosterError("roster header has no user_id column")
+                continue
+            if len(fields) != len(self._columns):
+                yield self.records, f"{len(fields)} fields where the header has {len(self._columns)}"
+                continue
+            yield self.records, {column: value for column, value in zip(self._columns, fields) if value != ""}
+
+    def _nest(self, row: Dict[Any, Any]) -> Tuple[str, Dict[str, Any]]:
+        """(action, nested user dict) of a parsed CSV row or a JSON object, flat or nested."""
+        action, user = "upsert", {}
+        for key, value in row.items():
+            if self.format == "jsonl":
+                if key in _SECTIONS or key == "user_id" or not isinstance(key, str):
+                    user[key] = value
+                    continue
+                if key == "action":
+                    action = value
+                    continue
+                section, field = _column(key)
+            else:
+                section, field = key
+                if section is None:
+                    if field == "action":
+                        action = value.strip().lower()
+                    else:
+                        user[field] = value.strip()
+                    continue
+                value = _parse_value(field, value)
+            user.setdefault(section, {})[field] = value
+        return action, user
+
+    def _stage(self) -> "TenantUserPartition":
+        if self._staged is None:
+            self._staged = self.partition.staged()
+        return self._staged
+
+    def _error(self, number: int, user_id: Any, problems: List[str]) -> None:
+        self.invalid += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({"record": number, "user_id": user_id, "errors": problems})
+
+    def feed(self, records: List[str]) -> Tuple[List[str], List[str]]:
+        """Validate and apply a batch of records; returns (changed user ids, teams they left or joined)."""
+        partition = self._stage()
+        upserts: Dict[str, UserRecord] = {}
+        deletes: Dict[str, None] = {}
+        for number, row in self._rows(records):
+            if isinstance(row, str):
+                self._error(number, None, [row])
+                continue
+            try:
+                action, user = self._nest(row)
+            except RosterError as e:
+                self._error(number, row.get("user_id"), [str(e)])
+                continue
+            user_id = user.get("user_id")
+            if action not in ("upsert", "delete") or (action == "delete" and self.mode == "full"):
+                self._error(number, user_id, [f"unsupported action {action!r} in a {self.mode} roster"])
+                continue
+            if action == "delete":
+                if not isinstance(user_id, str) or not user_id:
+                    self._error(number, user_id, ["user_id is required"])
+                    continue
+                upserts.pop(user_id, None)
+                deletes[user_id] = None
+                continue
+            current = (upserts.get(user_id) or partition.get(user_id)) if isinstance(user_id, str) else None
+            merge = self.mode == "delta" and current is not None
+            problems = validate(user, merge)
+            if problems:
+                self._error(number, user_id, problems)
+                continue
+            if merge:
+                merged = current.to_dict()
+                for section, values in user.items():
+                    if section != "user_id":
+                        merged[section] = {**merged.get(section, {}), **values}
+                user = merged
+            upserts[user_id] = UserRecord.from_dict(user)
+            deletes.pop(user_id, None)
+            if self._seen is not None:
+                self._seen.add(user_id)
+
+        teams: Dict[str, None] = {}
+        for record in upserts.values():
+            old = partition.get(record.user_id)
+            teams.update({team: None for team in (old.team if old is not None else None, record.team) if team})
+        created = partition.upsert_many(list(upserts.values()))
+        removed = partition.delete_many(list(deletes))
+        teams.update({user.team: None for user in removed if user.team})
+        self.created += created
+        self.updated += len(upserts) - created
+        self.deleted += len(removed)
+        self.batches += 1
+        return list(upserts) + [user.user_id for user in removed], list(teams)
+
+    def finish(self) -> Dict[str, Any]:
+        """Remove users missing from a full roster, unless it had invalid rows, swap the result in and report."""
+        staged = self._stage()
+        if self._seen is not None:
+            if self.invalid:
+                self.prune_skipped = f"{self.invalid} invalid rows; users missing from the roster were kept"
+            else:
+                missing = [user_id for user_id in staged.users if user_id not in self._seen]
+                self.deleted += len(staged.delete_many(missing))
+            self._seen = None
+        self.partition.adopt(staged)
+        self._staged = None
+        self.elapsed = time.perf_counter() - self.started
+        return self.report()
+
+    def report(self) -> Dict[str, Any]:
+        elapsed = self.elapsed if self.elapsed is not None else time.perf_counter() - self.started
+        rows = self.records - (1 if self._columns is not None else 0)
+        report = {
+            "tenant_id": self.partition.tenant_id,
+            "format": self.format,
+            "mode": self.mode,
+            "rows": rows,
+            "created": self.created,
+            "updated": self.updated,
+            "deleted": self.deleted,
+            "invalid": self.invalid,
+            "batches": self.batches,
+            "users": len(self.partition),
+            "elapsed_seconds": round(elapsed, 3),
+            "rows_per_second": round(rows / elapsed) if elapsed > 0 else None,
+            "errors": self.errors,
+        }
+        if self.prune_skipped:
+            report["prune_skipped"] = self.prune_skipped
+        return report
+
+
+def ingest_file(partition: "TenantUserPartition", path: str, fmt: Optional[str] = None, mode: str = "full",
+                batch_size: int = DEFAULT_BATCH_SIZE) -> Dict[str, Any]:
+    """Load a roster file into ``partition`` and return the ingestion report."""
+    fmt = fmt or roster_format(path)
+    ingestor = RosterIngestor(partition, fmt, mode)
+    splitter = RecordSplitter(fmt)
+    batch: List[str] = []
+    with open(path, encoding="utf-8-sig", newline="") as roster:
+        while True:
+            chunk = roster.read(READ_CHUNK)
+            batch.extend(splitter.feed(chunk) if chunk else splitter.close())
+            while len(batch) >= batch_size or (batch and not chunk):
+                ingestor.feed(batch[:batch_size])
+                del batch[:batch_size]
+            if not chunk:
+                return ingestor.finish()
+
+
+def post_file(url: str, tenant_id: str, path: str, fmt: str, mode: str, batch_size: int) -> Dict[str, Any]:
+    """Stream a roster file to a running server's POST /roster/{tenant_id} in chunks."""
+    import http.client
+    from urllib.parse import urlsplit, quote
+
+    parts = urlsplit(url)
+    connection_type = http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+    connection = connection_type(parts.netloc, timeout=3600)
+
+    def chunks():
+        with open(path, "rb") as roster:
+            while True:
+                chunk = roster.read(READ_CHUNK)
+                if not chunk:
+                    return
+                yield chunk
+
+    connection.request(
+        "POST", f"{parts.path.rstrip('/')}/roster/{quote(tenant_id)}?mode={mode}&batch_size={batch_size}",
+        body=chunks(), encode_chunked=True,
+        headers={"Content-Type": "application/x-ndjson" if fmt == "jsonl" else "text/csv"},
+    )
+    response = connection.getresponse()
+    return json.loads(response.read())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("roster", help="CSV or JSONL roster export")
+    parser.add_argument("--tenant-id", required=True)
+    parser.add_argument("--format", choices=FORMATS, help="default: from the file name, CSV unless .json/.jsonl")
+    parser.add_argument("--delta", action="store_true", help="only changed employees; keep everyone else")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--url", help="stream to a running server instead of loading into STORE_SNAPSHOT_PATH")
+    args = parser.parse_args()
+    fmt = args.format or roster_format(args.roster)
+    mode = "delta" if args.delta else "full"
+
+    if args.url:
+        report = post_file(args.url, args.tenant_id, args.roster, fmt, mode, args.batch_size)
+    else:
+        if not os.environ.get("STORE_SNAPSHOT_PATH"):
+            parser.error("set STORE_SNAPSHOT_PATH to load into a store snapshot, or pass --url")
+        os.environ.setdefault("STORE_SNAPSHOT_INTERVAL", "0")
+        from mcp_schemas import mock_store
+
+        try:
+            report = ingest_file(mock_store.directory.partition(args.tenant_id), args.roster, fmt, mode,
+                                 args.batch_size)
+        except RosterError as e:
+            sys.exit(f"invalid roster: {e}")
+        mock_store.save_snapshot()
+    json.dump(report, sys.stdout, indent=2)
+    print()
+
+
+if __name__ == "__main__":
+    main()
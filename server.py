@@ -1,9 +1,16 @@
+import asyncio
+import codecs
+import functools
+import json
 import os
 import re
+import time
 import uuid
 from datetime import datetime, date, timedelta
 from typing import Optional, List, Dict, Any
 from fastmcp import FastMCP
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response, StreamingResponse
 from mcp_schemas import (
     mock_store, 
     StatusType, 
@@ -13,209 +20,614 @@ from mcp_schemas import (
     TeamResponse,
     GroupRecognitionResponse,
     PostRecognitionResponse,
-    CelebrationInviteResponse
+    CelebrationInviteResponse,
+    BatchPostRecognitionResponse,
+    NotificationStatusResponse,
+    ServerStatsResponse,
+    SearchRecognitionsResponse,
+    RosterIngestResponse,
+    UpcomingMilestonesResponse,
+    TenantQuotaExceeded
 )
+from recognition_ledger import trailing_months, encode_cursor, decode_cursor
+from cohort_aggregation import CohortAggregator, group_name
+from response_cache import ResponseCache, cached_tool, user_tag, team_tag, roster_tag
+from request_coalescing import SingleFlight, coalesced
+from notifications import NotificationDispatcher
+from invitee_resolution import resolve_invitees
+from async_store import AsyncRecognitionStore
+from instrumentation import ToolMetrics, ResponseSizeMiddleware, instrumented, elapsed_ms
+from tenant_quotas import TenantRateLimiter, rate_limited
+from points_budget import BudgetExceeded
+from recognition_search import tokenize
+from upcoming_milestones import UpcomingMilestones, GROUP_BY as MILESTONE_GROUP_BY
+from roster_ingest import RosterIngestor, RecordSplitter, RosterError, roster_format, DEFAULT_BATCH_SIZE
 
 mcp = FastMCP("Service_Anniversary MCP Server")
 
+# Number of months reported in get_recognitions trends
+TREND_MONTHS = 5
+# get_recognitions page sizes
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+# Rows fetched per ledger query when streaming a full history
+STREAM_PAGE_SIZE = 500
+# Rate-limit tokens charged for streaming a full history
+STREAM_COST = 5
+# Rate-limit tokens charged for a roster upload, and its largest batch
+ROSTER_COST = 10
+MAX_ROSTER_BATCH = 50_000
+# Celebrant attributes get_group_recognition can group by (UserRecord fields)
+GROUP_BY_FIELDS = ("department", "team", "role_level", "title", "location")
+# Service milestones (years) celebrated unless a request configures its own
+MILESTONE_YEARS = [5, 10, 15, 20, 25]
+# Longest service milestone a request may ask for
+MAX_MILESTONE_YEARS = 100
+# Longest get_group_recognition date range; the cohort lookup steps through it a day at a time
+MAX_COHORT_DAYS = 366
+# get_upcoming_milestones window and the celebrants it returns before pointing at the stream
+DEFAULT_MILESTONE_DAYS = 30
+MAX_MILESTONE_DAYS = 366
+MAX_MILESTONE_RESULTS = 1000
+# Uvicorn worker processes sharing the port; only the store's ledger is shared between them
+SERVER_WORKERS = int(os.environ.get("SERVER_WORKERS") or 1)
+# search_recognitions filters
+SEARCH_FILTERS = frozenset({"user_id", "direction", "program_id", "behavior_id", "since", "until"})
 
-@mcp.tool(description="Show recognition history and points received/sent. Args: user_id (str), tenant_id (str), context (Dict[str, Any]), target_user_id (Optional[str]). Returns: Dict[str, Any] - RecognitionsResponse with status, data (summary, recognitions, analytics) and metadata.")
-def get_recognitions(user_id: str,
+# post_recognitions_batch limits and per-item required anniversary_details fields
+MAX_BATCH_SIZE = 1000
+ANNIVERSARY_REQUIRED_FIELDS = ("milestone_years", "anniversary_date", "recognition_message", "celebration_type")
+# send_celebration_invite required celebration_details fields
+CELEBRATION_REQUIRED_FIELDS = ("celebration_id", "milestone_years", "celebration_date", "celebration_type")
+
+response_cache = ResponseCache(
+    max_entries=int(os.environ.get("RESPONSE_CACHE_MAX_ENTRIES", 1024)),
+    max_bytes=int(os.environ.get("RESPONSE_CACHE_MAX_BYTES", 64 * 1024 * 1024)),
+    ttl_seconds=float(os.environ.get("RESPONSE_CACHE_TTL_SECONDS", 30)),
+    tenant_max_entries=int(os.environ.get("RESPONSE_CACHE_TENANT_MAX_ENTRIES", 0)) or None,
+    tenant_max_bytes=int(os.environ.get("RESPONSE_CACHE_TENANT_MAX_BYTES", 0)) or None,
+)
+
+# Identical concurrent read-tool calls share one computation; REQUEST_COALESCING=0 turns this off
+request_flights = SingleFlight(enabled=os.environ.get("REQUEST_COALESCING", "1") != "0")
+
+# Tenants with a roster upload running, which take one upload at a time
+roster_uploads = set()
+
+# Per-tenant token buckets in front of the tools; a rate of 0 (the default) disables limiting
+tenant_limiter = TenantRateLimiter(
+    rate=float(os.environ.get("TENANT_RATE_LIMIT", 0)),
+    burst=float(os.environ["TENANT_RATE_BURST"]) if "TENANT_RATE_BURST" in os.environ else None,
+)
+
+
+tool_metrics = ToolMetrics()
+mcp.add_middleware(ResponseSizeMiddleware(tool_metrics))
+
+async_store = AsyncRecognitionStore(
+    mock_store,
+    analytics_workers=int(os.environ.get("ANALYTICS_WORKERS", 4)),
+    analytics_max_per_tenant=int(os.environ.get("ANALYTICS_MAX_PER_TENANT", 0)) or None,
+)
+
+notification_dispatcher = NotificationDispatcher(
+    workers=int(os.environ.get("NOTIFICATION_WORKERS", 4)),
+    max_queue=int(os.environ.get("NOTIFICATION_QUEUE_SIZE", 10_000)),
+)
+
+
+async def dispatch_anniversary_notifications(
+    tenant_id: str,
+    celebrant_id: str,
+    celebrant: Dict[str, Any],
+    payload: Dict[str, Any],
+    include_public: bool = True,
+) -> List[Dict[str, Any]]:
+    """Enqueue team, manager and (optionally) tenant-wide notifications for an anniversary."""
+    users = mock_store.directory_for(tenant_id)
+    role_info = celebrant["role_info"]
+    manager_id = role_info.get("manager_id")
+    plan = [
+        ("team_notification", "in_app", [uid for uid in users.team_members(role_info.get("team")) if uid != celebrant_id]),
+        ("manager_alert", "email", [manager_id] if manager_id else []),
+    ]
+    if include_public:
+        plan.append(("public_announcement", "feed", [uid for uid in users.users if uid != celebrant_id]))
+    notifications = []
+    for notification_type, channel, recipients in plan:
+        status = await notification_dispatcher.submit(tenant_id, notification_type, channel, recipients, payload)
+        notifications.append({
+            "type": notification_type,
+            "notification_id": status["notification_id"],
+            "recipient_count": status["recipient_count"],
+            "status": status["status"]
+        })
+    return notifications
+
+
+def invalidate_cached_responses(tenant_id: str, user_ids: List[str]) -> None:
+    """Drop cached reads for the given users and their teams after a write."""
+    users = mock_store.directory_for(tenant_id)
+    tags = []
+    for uid in user_ids:
+        tags.append(user_tag(tenant_id, uid))
+        team = users.get(uid, {}).get("role_info", {}).get("team")
+        if team is not None:
+            tags.append(team_tag(tenant_id, team))
+    response_cache.invalidate(tags)
+    request_flights.forget(tenant_id)
+
+
+def invalidate_recorded(records: List[Dict[str, Any]]) -> None:
+    """Drop cached reads touched by ledger records, whichever worker wrote them."""
+    by_tenant: Dict[str, Dict[str, None]] = {}
+    for record in records:
+        by_tenant.setdefault(record["tenant_id"], {}).update({record["sender_id"]: None, record["recipient_id"]: None})
+    for tenant_id, user_ids in by_tenant.items():
+        invalidate_cached_responses(tenant_id, list(user_ids))
+
+
+def reserve_each(tenant_id: str, sender_id: str, records: List[Dict[str, Any]]) -> List[Any]:
+    """Reserve each record's points; a BudgetExceeded stands in for any the budgets refuse."""
+    outcomes: List[Any] = []
+    try:
+        for record in records:
+            try:
+                outcomes.append(mock_store.budgets.reserve(tenant_id, record["program_id"], sender_id, record["points"]))
+            except BudgetExceeded as e:
+                outcomes.append(e)
+    except BaseException:
+        release_each(outcomes)
+        raise
+    return outcomes
+
+
+def release_each(outcomes: List[Any]) -> None:
+    for outcome in outcomes:
+        if not isinstance(outcome, BudgetExceeded):
+            mock_store.budgets.release(outcome)
+
+
+async def reserve_points(tenant_id: str, sender_id: str, records: List[Dict[str, Any]]) -> List[Any]:
+    """reserve_each on the store's read pool, since a new period seeds its spend from a ledger query.
+
+    Points reserved for a caller cancelled while waiting are released once the reservation finishes.
+    """
+    if not mock_store.budgets.enabled:
+        return [None] * len(records)
+    task = asyncio.ensure_future(async_store.read(reserve_each, tenant_id, sender_id, records))
+    try:
+        return await asyncio.shield(task)
+    except asyncio.CancelledError:
+        task.add_done_callback(lambda done: done.cancelled() or done.exception() or release_each(done.result()))
+        raise
+
+
+def synced(fn):
+    """Catch up with recognitions other workers wrote to a shared store before serving a read."""
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        if mock_store.backend.shared:
+            invalidate_recorded(await async_store.catch_up())
+        return await fn(*args, **kwargs)
+    return wrapper
+
+
+@mcp.tool(description="Show recognition history and points received/sent. Args: user_id (str), tenant_id (str), context (Dict[str, Any]), target_user_id (Optional[str]), cursor (Optional[str]) - opaque next_cursor from a previous page, limit (int) - page size up to 100, since (Optional[str]) - inclusive ISO date/datetime, until (Optional[str]) - exclusive ISO date/datetime, INVALID_DATE if either does not parse. Returns: Dict[str, Any] - RecognitionsResponse with status, data (summary, recognitions, analytics) and metadata with total_records (recognitions in the since/until window, lifetime without one) and page_info.next_cursor. Full histories can be streamed as NDJSON from GET /recognitions/stream.")
+@instrumented(tool_metrics)
+@rate_limited(tenant_limiter, RecognitionsResponse)
+@synced
+@coalesced(request_flights, "get_recognitions")
+@cached_tool(response_cache, "get_recognitions",
+             lambda args, response: [user_tag(args["tenant_id"], response["data"]["user_id"])])
+async def get_recognitions(user_id: str,
     tenant_id: str,
     context: Dict[str, Any],
     target_user_id: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
 ) -> Dict[str, Any]:
     try:
         target_id = target_user_id or user_id
+        users = mock_store.directory_for(tenant_id)
 
-        # Generate mock recognition data
-        recognitions = [
-            {
-                "recognition_id": str(uuid.uuid4()),
-                "type": "sent",
-                "sender_id": target_id,
-                "sender_name": mock_store.users[target_id]["basic_info"]["name"] if target_id in mock_store.users else "Unknown",
-                "recipient_id": "user2",
-                "recipient_name": "Mike Chen",
-                "program_id": "prog1",
-                "program_name": "Peer Recognition Program",
-                "behavior_id": "collab1",
-                "behavior_name": "Exceptional Collaboration",
-                "points": 50,
-                "title": "Great teamwork!",
-                "message": "Thanks for helping with the project deadline",
-                "date": (datetime.now() - timedelta(days=2)).isoformat(),
-                "status": "completed",
-                "visibility": "public"
-            },
+        try:
+            before_seq = decode_cursor(cursor, target_id) if cursor else None
+        except ValueError as e:
+            response = RecognitionsResponse.dump(
+                status=StatusType.error,
+                error=ErrorDetail(code="INVALID_CURSOR", message=str(e))
+            )
+            return response
+        try:
+            since = iso_bound(since) if since else None
+            until = iso_bound(until) if until else None
+        except (TypeError, ValueError) as e:
+            response = RecognitionsResponse.dump(
+                status=StatusType.error,
+                error=ErrorDetail(code="INVALID_DATE", message=f"since and until must be ISO dates or datetimes: {e}")
+            )
+            return response
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+
+        # Summary and analytics come from the ledger's running counters and rollups, queried concurrently
+        summary, trends, (recognitions, next_seq), top_behaviors, collaborators = await asyncio.gather(
+            async_store.summary(tenant_id, target_id),
+            async_store.monthly_trends(tenant_id, target_id, trailing_months(TREND_MONTHS)),
+            async_store.page(tenant_id, target_id, limit, before_seq, since, until),
+            async_store.top_behaviors(tenant_id, target_id),
+            async_store.frequent_collaborators(tenant_id, target_id),
+        )
+        summary["recognition_count_period"] = sum(trends["monthly_sent"]) + sum(trends["monthly_received"])
+        frequent_collaborators = [
             {
-                "recognition_id": str(uuid.uuid4()),
-                "type": "received",
-                "sender_id": "user2", 
-                "sender_name": "Mike Chen",
-                "recipient_id": target_id,
-                "recipient_name": mock_store.users[target_id]["basic_info"]["name"] if target_id in mock_store.users else "Unknown",
-                "program_id": "prog1",
-                "program_name": "Peer Recognition Program",
-                "behavior_id": "innov1",
-                "behavior_name": "Innovation Excellence",
-                "points": 75,
-                "title": "Innovative solution!",
-                "message": "Your creative approach saved the day",
-                "date": (datetime.now() - timedelta(days=5)).isoformat(),
-                "status": "completed",
-                "visibility": "public"
+                "user_id": collaborator["user_id"],
+                "name": users.get(collaborator["user_id"], {}).get("basic_info", {}).get("name", "Unknown"),
+                "interaction_count": collaborator["interaction_count"]
             }
+            for collaborator in collaborators
         ]
+        # Lifetime counters unless the page is windowed, when only the window's recognitions are counted
+        if since or until:
+            total_records = await async_store.count(tenant_id, target_id, since, until)
+        else:
+            total_records = summary["total_sent"] + summary["total_received"]
 
-        response = RecognitionsResponse(
+        response = RecognitionsResponse.dump(
             status=StatusType.success,
             data={
                 "user_id": target_id,
-                "summary": {
-                    "total_sent": 3,
-                    "total_received": 2,
-                    "points_sent": 150,
-                    "points_received": 125,
-                    "recognition_count_period": 5
-                },
+                "summary": summary,
                 "recognitions": recognitions,
                 "analytics": {
-                    "trends": {
-                        "monthly_sent": [2, 3, 1, 4, 2],
-                        "monthly_received": [1, 2, 2, 3, 1]
-                    },
-                    "top_behaviors": [
-                        {
-                            "behavior_name": "Exceptional Collaboration",
-                            "count": 8
-                        },
-                        {
-                            "behavior_name": "Innovation Excellence", 
-                            "count": 5
-                        }
-                    ],
-                    "frequent_collaborators": [
-                        {
-                            "user_id": "user2",
-                            "name": "Mike Chen",
-                            "interaction_count": 5
-                        }
-                    ]
+                    "trends": trends,
+                    "top_behaviors": top_behaviors,
+                    "frequent_collaborators": frequent_collaborators
                 }
             },
             metadata={
-                "total_records": len(recognitions),
+                "total_records": total_records,
                 "page_info": {
-                    "current_page": 1,
-                    "total_pages": 1,
-                    "has_next": False
+                    "page_size": limit,
+                    "returned": len(recognitions),
+                    "has_next": next_seq is not None,
+                    "next_cursor": encode_cursor(target_id, next_seq) if next_seq is not None else None
                 }
             }
         )
-        return response.model_dump()
+        return response
     except Exception as e:
-        response = RecognitionsResponse(
+        response = RecognitionsResponse.dump(
             status=StatusType.error,
             error=ErrorDetail(code="RECOGNITIONS_ERROR", message=str(e))
         )
-        return response.model_dump()
+        return response
+
+def iso_bound(value: str) -> str:
+    """An ISO date/datetime bound normalized to compare with the ledger's local ``created_at`` strings."""
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone().replace(tzinfo=None)
+    return parsed.isoformat()
+
+def anniversary_validation_errors(anniversary_details: Dict[str, Any]) -> List[str]:
+    """Problems with the anniversary_details of post_recognition or a post_recognitions_batch item."""
+    errors = [f"missing {field}" for field in ANNIVERSARY_REQUIRED_FIELDS if field not in anniversary_details]
+    # Budgets, ledger sums and the top-K analytics all assume points only ever add up
+    points = anniversary_details.get("points")
+    if "points" in anniversary_details and (not isinstance(points, int) or isinstance(points, bool) or points <= 0):
+        errors.append("points must be a positive integer")
+    return errors
+
+def anniversary_record(
+    recognition_id: str,
+    tenant_id: str,
+    sender: Dict[str, Any],
+    sender_id: str,
+    celebrant: Dict[str, Any],
+    celebrant_id: str,
+    anniversary_details: Dict[str, Any],
+    created_date: str,
+) -> Dict[str, Any]:
+    """Ledger record for an anniversary recognition from post_recognition or post_recognitions_batch."""
+    program_id = anniversary_details.get("program_id", "prog2")
+    program = mock_store.programs.get(program_id, {})
+    return {
+        "recognition_id": recognition_id,
+        "tenant_id": tenant_id,
+        "sender_id": sender_id,
+        "sender_name": sender.get("basic_info", {}).get("name", "Unknown"),
+        "recipient_id": celebrant_id,
+        "recipient_name": celebrant["basic_info"]["name"],
+        "program_id": program_id,
+        "program_name": program.get("name"),
+        "behavior_id": anniversary_details.get("behavior_id"),
+        "behavior_name": anniversary_details.get("behavior_name"),
+        "points": anniversary_details.get("points", program.get("point_values", {}).get("default_points", 0)),
+        "title": f"{anniversary_details['milestone_years']} Year Service Anniversary",
+        "message": anniversary_details["recognition_message"],
+        "created_at": created_date,
+        "status": "completed",
+        "visibility": "public"
+    }
+
+@mcp.custom_route("/recognitions/stream", methods=["GET"])
+async def stream_recognitions(request: Request) -> Response:
+    """Stream a user's recognition history as NDJSON, newest first.
+
+    Query params: tenant_id, user_id, optional since (inclusive) and until (exclusive).
+    Records are read from the ledger one keyset page at a time, so memory
+    use and time to first byte do not depend on the length of the history.
+    """
+    params = request.query_params
+    tenant_id = params.get("tenant_id")
+    user_id = params.get("user_id")
+    if not tenant_id or not user_id:
+        response = RecognitionsResponse.dump(
+            status=StatusType.error,
+            error=ErrorDetail(code="INVALID_REQUEST", message="tenant_id and user_id are required")
+        )
+        return JSONResponse(response, status_code=400)
+    retry_after = tenant_limiter.acquire(tenant_id, STREAM_COST)
+    if retry_after:
+        response = RecognitionsResponse.dump(
+            status=StatusType.error,
+            error=ErrorDetail(code="RATE_LIMITED", message=f"Too many requests for tenant {tenant_id}")
+        )
+        return JSONResponse(response, status_code=429, headers={"Retry-After": str(max(1, round(retry_after)))})
+
+    def ndjson():
+        for record in mock_store.recognitions.iter_history(
+            tenant_id, user_id, params.get("since"), params.get("until"), STREAM_PAGE_SIZE
+        ):
+            yield json.dumps(record) + "\n"
+
+    return StreamingResponse(ndjson(), media_type="application/x-ndjson")
+
+@mcp.custom_route("/roster/{tenant_id}", methods=["POST"])
+async def ingest_roster(request: Request) -> Response:
+    """Load a CSV or JSONL roster export, streamed as the request body, into a tenant's directory.
+
+    Query params: mode (full, the default, or delta), batch_size, format
+    (default from the Content-Type, CSV unless it says JSON). The body is
+    split into records as it arrives and each batch is validated and
+    applied on the store's writer thread before more is read, so memory
+    holds one batch. Batches go to a staged copy of the tenant that is
+    swapped in once the whole roster is applied, so concurrent reads see
+    the old or the new roster, never part of one, and a rejected upload
+    changes nothing; one upload per tenant runs at a time. Cached
+    responses of the changed users and teams are then dropped. Returns the
+    ingestion report. Each worker has its own directory, so with
+    SERVER_WORKERS > 1 uploads are refused (409) and rosters are loaded
+    into the store snapshot with ``python -m roster_ingest`` instead.
+    """
+    tenant_id = request.path_params["tenant_id"]
+    params = request.query_params
+    if SERVER_WORKERS > 1:
+        response = RosterIngestResponse.dump(
+            status=StatusType.error,
+            error=ErrorDetail(code="ROSTER_UPLOAD_UNAVAILABLE",
+                              message="Rosters are held per worker; load them with python -m roster_ingest "
+                                      "and restart the workers")
+        )
+        return JSONResponse(response, status_code=409)
+    try:
+        fmt = params.get("format") or roster_format(content_type=request.headers.get("content-type"))
+        batch_size = max(1, min(int(params.get("batch_size", DEFAULT_BATCH_SIZE)), MAX_ROSTER_BATCH))
+        ingestor = RosterIngestor(mock_store.directory.partition(tenant_id), fmt, params.get("mode", "full"))
+    except ValueError as e:
+        response = RosterIngestResponse.dump(
+            status=StatusType.error,
+            error=ErrorDetail(code="INVALID_REQUEST", message=str(e))
+        )
+        return JSONResponse(response, status_code=400)
+    retry_after = tenant_limiter.acquire(tenant_id, ROSTER_COST)
+    if retry_after:
+        response = RosterIngestResponse.dump(
+            status=StatusType.error,
+            error=ErrorDetail(code="RATE_LIMITED", message=f"Too many requests for tenant {tenant_id}")
+        )
+        return JSONResponse(response, status_code=429, headers={"Retry-After": str(max(1, round(retry_after)))})
+
+    if tenant_id in roster_uploads:
+        response = RosterIngestResponse.dump(
+            status=StatusType.error,
+            error=ErrorDetail(code="ROSTER_UPLOAD_IN_PROGRESS",
+                              message=f"Another roster upload for tenant {tenant_id} is still running")
+        )
+        return JSONResponse(response, status_code=409)
+
+    # Until the staged roster is swapped in the tenant may be served the demo directory
+    served_demo = not mock_store.directory.has_tenant(tenant_id)
+    changed_tags = []
+
+    async def apply(batch: List[str]) -> None:
+        user_ids, teams = await async_store.write(ingestor.feed, batch)
+        changed_tags.extend([user_tag(tenant_id, uid) for uid in user_ids] +
+                            [team_tag(tenant_id, team) for team in teams])
+
+    splitter = RecordSplitter(fmt)
+    decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+    batch: List[str] = []
+    roster_uploads.add(tenant_id)
+    try:
+        async for chunk in request.stream():
+            batch.extend(splitter.feed(decoder.decode(chunk)))
+            while len(batch) >= batch_size:
+                await apply(batch[:batch_size])
+                del batch[:batch_size]
+        batch.extend(splitter.feed(decoder.decode(b"", final=True)) + splitter.close())
+        if batch:
+            await apply(batch)
+        report = await async_store.write(ingestor.finish)
+    except (RosterError, TenantQuotaExceeded) as e:
+        quota = isinstance(e, TenantQuotaExceeded)
+        response = RosterIngestResponse.dump(
+            status=StatusType.error,
+            error=ErrorDetail(code="TENANT_QUOTA_EXCEEDED" if quota else "INVALID_ROSTER", message=str(e)),
+            data=ingestor.report()
+        )
+        return JSONResponse(response, status_code=409 if quota else 400)
+    finally:
+        roster_uploads.discard(tenant_id)
+
+    if served_demo or ingestor.mode == "full":
+        response_cache.invalidate_tenant(tenant_id)
+    else:
+        # Any roster change can move someone into or out of a hire-date cohort
+        response_cache.invalidate(changed_tags + [roster_tag(tenant_id)])
+    request_flights.forget(tenant_id)
+
+    response = RosterIngestResponse.dump(
+        status=StatusType.warning if report["invalid"] else StatusType.success,
+        data=report,
+        metadata={"query_date": datetime.now().isoformat()}
+    )
+    return JSONResponse(response)
+
+@mcp.custom_route("/milestones/upcoming", methods=["GET"])
+async def stream_upcoming_milestones(request: Request) -> Response:
+    """Stream the full upcoming-milestones report as NDJSON, one group per line after a summary line.
+
+    Query params: tenant_id, optional days, group_by, milestone_years
+    (comma-separated) and as_of, as for get_upcoming_milestones. The report
+    is computed in one pass; groups are encoded as they are sent.
+    """
+    params = request.query_params
+    tenant_id = params.get("tenant_id")
+    try:
+        if not tenant_id:
+            raise ValueError("tenant_id is required")
+        milestone_years = [year for year in params.get("milestone_years", "").split(",") if year.strip()]
+        days, years, group_by, start = milestone_request(
+            params.get("days", DEFAULT_MILESTONE_DAYS), milestone_years, params.get("group_by", "manager"),
+            params.get("as_of")
+        )
+    except ValueError as e:
+        response = UpcomingMilestonesResponse.dump(
+            status=StatusType.error,
+            error=ErrorDetail(code="INVALID_REQUEST", message=str(e))
+        )
+        return JSONResponse(response, status_code=400)
+    retry_after = tenant_limiter.acquire(tenant_id, STREAM_COST)
+    if retry_after:
+        response = UpcomingMilestonesResponse.dump(
+            status=StatusType.error,
+            error=ErrorDetail(code="RATE_LIMITED", message=f"Too many requests for tenant {tenant_id}")
+        )
+        return JSONResponse(response, status_code=429, headers={"Retry-After": str(max(1, round(retry_after)))})
+
+    users = mock_store.directory_for(tenant_id)
+    upcoming = await async_store.analytics(tenant_id, UpcomingMilestones, users, start, days, years, group_by)
+
+    def ndjson():
+        yield json.dumps({"window": {"start_date": start.isoformat(), "end_date": upcoming.end.isoformat(), "days": days},
+                          "milestone_years": upcoming.milestone_years, "group_by": group_by,
+                          "summary": upcoming.summary()}) + "\n"
+        for group in upcoming.groups():
+            yield json.dumps(group) + "\n"
+
+    return StreamingResponse(ndjson(), media_type="application/x-ndjson")
+
+@mcp.custom_route("/cache/stats", methods=["GET"])
+async def cache_stats(request: Request) -> Response:
+    return JSONResponse(response_cache.stats())
 
-@mcp.tool(description="Provide team-level analytics and information. Args: user_id (str), tenant_id (str), context (Dict[str, Any]), filters (Optional[Dict[str, Any]]). Returns: Dict[str, Any] - TeamResponse with status, team info, team members, collaboration analytics, and recognition metrics.")
-def lookup_team(
+@mcp.custom_route("/metrics", methods=["GET"])
+async def metrics(request: Request) -> Response:
+    """Prometheus text exposition of per-tool metrics plus cache and notification gauges."""
+    cache = response_cache.stats()
+    notifications = notification_dispatcher.stats()
+    flights = request_flights.stats()
+    lines = [tool_metrics.prometheus()]
+    for name, value, help_text in (
+        ("mcp_response_cache_hits_total", cache["hits"], "Response cache hits."),
+        ("mcp_response_cache_misses_total", cache["misses"], "Response cache misses."),
+        ("mcp_response_cache_entries", cache["entries"], "Responses currently cached."),
+        ("mcp_coalesced_calls_total", flights["coalesced"], "Read-tool calls served by another identical in-flight call."),
+        ("mcp_coalescing_executed_calls_total", flights["executed"], "Read-tool calls that ran their own computation."),
+        ("mcp_notification_queue_depth", notifications["queue_depth"], "Notification jobs waiting for a worker."),
+        ("mcp_analytics_queue_depth", sum(async_store.scheduler.stats()["queued"].values()),
+         "Analytics jobs waiting for a worker, across tenants."),
+    ):
+        metric_type = "counter" if name.endswith("_total") else "gauge"
+        lines.append(f"# HELP {name} {help_text}\n# TYPE {name} {metric_type}\n{name} {value}\n")
+    return Response("".join(lines), media_type="text/plain; version=0.0.4")
+
+def team_data(users: Any, tenant_id: str, user_id: str, user: Dict[str, Any]) -> Dict[str, Any]:
+    """Build lookup_team's data block; CPU-bound for large teams, so it runs on the analytics pool."""
+    team_name = user["role_info"]["team"]
+    department = user["role_info"]["department"]
+    
+    team_views = mock_store.team_views
+
+    # Find team members; per-member stats come from the team's materialized view
+    team_members = []
+    for uid in users.team_members(team_name):
+        user_data = users[uid]
+        team_members.append({
+            "user_id": uid,
+            "name": user_data.name,
+            "role": user_data.title,
+            "hire_date": user_data.hire_date,
+            "recognition_stats": team_views.member_stats(tenant_id, team_name, uid)
+        })
+
+    team_analytics = team_views.snapshot(tenant_id, team_name, len(team_members))
+    team_analytics["collaboration_matrix"] = [
+        {"from_team": team_name, "to_team": to_team, "interaction_count": count}
+        for to_team, count in mock_store.collaboration.top_neighbors(tenant_id, team_name)
+    ]
+    for entry in team_analytics["top_recognizers"] + team_analytics["top_recipients"]:
+        entry["name"] = users.get(entry["user_id"], {}).get("basic_info", {}).get("name", "Unknown")
+
+    return {
+        "team_info": {
+            "team_id": f"team_{team_name.lower().replace(' ', '_')}",
+            "team_name": team_name,
+            "department": department,
+            "manager_id": user["role_info"]["manager_id"],
+            "manager_name": users.get(user["role_info"]["manager_id"], {}).get("basic_info", {}).get("name", "Unknown"),
+            "management_chain": [
+                {"user_id": manager_id, "name": users.get(manager_id, {}).get("basic_info", {}).get("name", "Unknown")}
+                for manager_id in users.org.manager_chain(user_id)
+            ],
+            "member_count": len(team_members)
+        },
+        "team_members": team_members,
+        "team_analytics": team_analytics
+    }
+
+@mcp.tool(description="Provide team-level analytics and information. Args: user_id (str), tenant_id (str), context (Dict[str, Any]), filters (Optional[Dict[str, Any]]). Returns: Dict[str, Any] - TeamResponse with status, team info (manager and management chain), team members, collaboration analytics, and recognition metrics.")
+@instrumented(tool_metrics)
+@rate_limited(tenant_limiter, TeamResponse, cost=2)
+@synced
+@coalesced(request_flights, "lookup_team")
+@cached_tool(response_cache, "lookup_team",
+             lambda args, response: [user_tag(args["tenant_id"], args["user_id"]),
+                                     team_tag(args["tenant_id"], response["data"]["team_info"]["team_name"])])
+async def lookup_team(
     user_id: str,
     tenant_id: str,
     context: Dict[str, Any],
     filters: Optional[Dict[str, Any]] = None,
 ) -> Dict[str, Any]:
     try:
-        user = mock_store.users.get(user_id)
+        users = mock_store.directory_for(tenant_id)
+        user = users.get(user_id)
         if not user:
-            response = TeamResponse(
+            response = TeamResponse.dump(
                 status=StatusType.error,
                 error=ErrorDetail(code="USER_NOT_FOUND", message="User not found")
             )
-            return response.model_dump()
+            return response
         
-        team_name = user["role_info"]["team"]
-        department = user["role_info"]["department"]
-        
-        # Find team members
-        team_members = []
-        for uid, user_data in mock_store.users.items():
-            if user_data["role_info"]["team"] == team_name:
-                team_members.append({
-                    "user_id": uid,
-                    "name": user_data["basic_info"]["name"],
-                    "role": user_data["role_info"]["title"],
-                    "hire_date": user_data["employment_info"]["hire_date"],
-                    "recognition_stats": {
-                        "points_sent": 150,
-                        "points_received": 125,
-                        "recognitions_sent": 3,
-                        "recognitions_received": 2
-                    }
-                })
-
-        data = {
-            "team_info": {
-                "team_id": f"team_{team_name.lower().replace(' ', '_')}",
-                "team_name": team_name,
-                "department": department,
-                "manager_id": user["role_info"]["manager_id"],
-                "manager_name": "John Smith",
-                "member_count": len(team_members)
-            },
-            "team_members": team_members,
-            "team_analytics": {
-                "recognition_summary": {
-                    "total_recognitions": 25,
-                    "total_points_exchanged": 1250,
-                    "average_recognition_value": 50,
-                    "participation_rate": 0.85
-                },
-                "trending_behaviors": [
-                    {
-                        "behavior_name": "Exceptional Collaboration",
-                        "frequency": 12,
-                        "total_points": 600
-                    },
-                    {
-                        "behavior_name": "Innovation Excellence",
-                        "frequency": 8,
-                        "total_points": 600
-                    }
-                ],
-                "collaboration_matrix": [
-                    {
-                        "from_team": team_name,
-                        "to_team": "Growth Team",
-                        "interaction_count": 8
-                    },
-                    {
-                        "from_team": team_name,
-                        "to_team": "Design Team", 
-                        "interaction_count": 5
-                    }
-                ],
-                "top_recognizers": [
-                    {
-                        "user_id": "user1",
-                        "name": "Sarah Johnson",
-                        "recognition_count": 8
-                    }
-                ],
-                "top_recipients": [
-                    {
-                        "user_id": "user2",
-                        "name": "Mike Chen",
-                        "points_received": 275
-                    }
-                ]
-            }
-        }
+        # Member rows and analytics are CPU work that scales with team size
+        data = await async_store.analytics(tenant_id, team_data, users, tenant_id, user_id, user)
         
-        response = TeamResponse(
+        response = TeamResponse.dump(
             status=StatusType.success,
             data=data,
             metadata={
@@ -223,121 +635,172 @@ def lookup_team(
                 "data_freshness": "real_time"
             }
         )
-        return response.model_dump()
+        return response
     except Exception as e:
-        response = TeamResponse(
+        response = TeamResponse.dump(
             status=StatusType.error,
             error=ErrorDetail(code="TEAM_LOOKUP_ERROR", message=str(e))
         )
-        return response.model_dump()
+        return response
 
-@mcp.tool(description="Aggregate recognitions for milestone cohorts and anniversary groups. Args: user_id (str), tenant_id (str), context (Dict[str, Any]), filters (Optional[Dict[str, Any]]). Returns: Dict[str, Any] - GroupRecognitionResponse with group summary, celebrants list, and department breakdown.")
-def get_group_recognition(
-    user_id: str,
+def group_recognition_data(
+    users: Any,
     tenant_id: str,
-    context: Dict[str, Any],
-    filters: Optional[Dict[str, Any]] = None,
+    cohort: List[tuple],
+    anniversary_years: List[int],
+    group_by: List[Any],
+    group_fields: List[str],
+    start_date: str,
+    end_date: str,
 ) -> Dict[str, Any]:
-    try:
-        milestone_criteria = context.get("milestone_criteria", {})
-        anniversary_years = milestone_criteria.get("anniversary_years", [5, 10, 15, 20, 25])
-        
-        # Generate mock celebrants
-        celebrants = []
-        milestone_distribution = {f"{year}_years": 0 for year in anniversary_years}
-        
-        # Mock celebrants data
-        mock_celebrants = [
-            {
-                "user_id": "cel1",
-                "name": "Alice Cooper",
-                "title": "Senior Developer",
-                "department": "Engineering",
-                "hire_date": "2014-09-15",
-                "anniversary_date": "2024-09-15",
-                "years_of_service": 10,
-                "milestone_type": "10_year"
-            },
-            {
-                "user_id": "cel2", 
-                "name": "Bob Wilson",
-                "title": "Product Manager",
-                "department": "Product",
-                "hire_date": "2019-03-01",
-                "anniversary_date": "2024-03-01",
-                "years_of_service": 5,
-                "milestone_type": "5_year"
-            }
-        ]
-        
-        for celebrant in mock_celebrants:
-            milestone_key = f"{celebrant['years_of_service']}_years"
-            if milestone_key in milestone_distribution:
-                milestone_distribution[milestone_key] += 1
-            
-            celebrant["recognition_history"] = {
-                "total_recognitions_received": 15,
-                "total_points_received": 750,
+    """Build get_group_recognition's data block for a cohort; runs on the analytics pool."""
+    ledger = mock_store.recognitions
+    celebrants = []
+    years_column = []
+    columns = {field: [] for field in dict.fromkeys(["department"] + group_fields)}
+    for celebrant_id, anniversary_date, years_of_service in cohort:
+        user_data = users[celebrant_id]
+        manager_id = user_data.manager_id
+        years_column.append(years_of_service)
+        for field, column in columns.items():
+            column.append(getattr(user_data, field))
+        summary = ledger.summary(tenant_id, celebrant_id)
+        celebrants.append({
+            "user_id": celebrant_id,
+            "name": user_data.name,
+            "title": user_data.title,
+            "department": user_data.department,
+            "hire_date": user_data.hire_date,
+            "anniversary_date": anniversary_date.isoformat(),
+            "years_of_service": years_of_service,
+            "milestone_type": f"{years_of_service}_year",
+            "recognition_history": {
+                "total_recognitions_received": summary["total_received"],
+                "total_points_received": summary["points_received"],
                 "recent_recognitions": [
                     {
-                        "recognition_id": str(uuid.uuid4()),
-                        "sender_name": "Team Lead",
-                        "points": 75,
-                        "date": (datetime.now() - timedelta(days=3)).isoformat(),
-                        "message": "Congratulations on your milestone!"
+                        "recognition_id": recognition["recognition_id"],
+                        "sender_name": recognition["sender_name"],
+                        "points": recognition["points"],
+                        "date": recognition["date"],
+                        "message": recognition["message"]
                     }
+                    for recognition in ledger.recent_received(tenant_id, celebrant_id)
                 ]
+            },
+            "manager_info": {
+                "manager_id": manager_id,
+                "manager_name": users.get(manager_id, {}).get("basic_info", {}).get("name", "Unknown")
             }
-            celebrant["manager_info"] = {
-                "manager_id": "mgr1",
-                "manager_name": "Jane Manager"
+        })
+
+    # Milestone and per-group breakdowns in one grouped pass over the columns
+    aggregator = CohortAggregator(years_column, columns, anniversary_years)
+    milestone_distribution = aggregator.milestone_distribution()
+
+    return {
+        "group_summary": {
+            "total_celebrants": len(celebrants),
+            "milestone_distribution": milestone_distribution,
+            "period": {
+                "start_date": start_date,
+                "end_date": end_date
             }
-            celebrants.append(celebrant)
-
-        # Department breakdown
-        dept_breakdown = {}
-        for celebrant in celebrants:
-            dept = celebrant["department"]
-            if dept not in dept_breakdown:
-                dept_breakdown[dept] = {
-                    "department": dept,
-                    "celebrant_count": 0,
-                    "milestone_breakdown": {f"{year}_years": 0 for year in anniversary_years}
-                }
-            dept_breakdown[dept]["celebrant_count"] += 1
-            milestone_key = f"{celebrant['years_of_service']}_years"
-            if milestone_key in dept_breakdown[dept]["milestone_breakdown"]:
-                dept_breakdown[dept]["milestone_breakdown"][milestone_key] += 1
+        },
+        "celebrants": celebrants,
+        "department_breakdown": aggregator.breakdown("department"),
+        "additional_breakdowns": {
+            group_name(spec): aggregator.breakdown(spec) for spec in group_by
+        }
+    }
+
+@mcp.tool(description="Aggregate recognitions for milestone cohorts and anniversary groups. Args: user_id (str), tenant_id (str), context (Dict[str, Any]) - milestone_criteria.anniversary_years (1 to 100, default 5, 10, 15, 20, 25) and date_range (start_date, end_date, at most 366 days), filters (Optional[Dict[str, Any]]) - group_by: list of department, team, role_level, title, location or lists of them for combined groupings; org_root_id (str) or my_org (bool) to limit celebrants to one org subtree. Returns: Dict[str, Any] - GroupRecognitionResponse with group summary, celebrants list, department breakdown and any additional breakdowns.")
+@instrumented(tool_metrics)
+@rate_limited(tenant_limiter, GroupRecognitionResponse, cost=5)
+@synced
+@coalesced(request_flights, "get_group_recognition")
+@cached_tool(response_cache, "get_group_recognition",
+             lambda args, response: [roster_tag(args["tenant_id"])] +
+                                    [user_tag(args["tenant_id"], celebrant["user_id"])
+                                     for celebrant in response["data"]["celebrants"]])
+async def get_group_recognition(
+    user_id: str,
+    tenant_id: str,
+    context: Dict[str, Any],
+    filters: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    try:
+        milestone_criteria = context.get("milestone_criteria", {})
+        try:
+            anniversary_years = milestone_years_request(milestone_criteria.get("anniversary_years"))
+        except (TypeError, ValueError) as e:
+            response = GroupRecognitionResponse.dump(
+                status=StatusType.error,
+                error=ErrorDetail(code="INVALID_MILESTONE_YEARS", message=str(e))
+            )
+            return response
+        date_range = milestone_criteria.get("date_range", {})
+        start_date = date_range.get("start_date", "2024-01-01")
+        end_date = date_range.get("end_date", "2024-12-31")
+        try:
+            start, end = date.fromisoformat(start_date[:10]), date.fromisoformat(end_date[:10])
+            if (end - start).days >= MAX_COHORT_DAYS:
+                raise ValueError(f"date_range may span at most {MAX_COHORT_DAYS} days")
+        except (TypeError, ValueError) as e:
+            response = GroupRecognitionResponse.dump(
+                status=StatusType.error,
+                error=ErrorDetail(code="INVALID_DATE_RANGE", message=str(e))
+            )
+            return response
+        users = mock_store.directory_for(tenant_id)
+
+        group_by = (filters or {}).get("group_by", [])
+        org_root_id = (filters or {}).get("org_root_id") or (user_id if (filters or {}).get("my_org") else None)
+        group_fields = [field for spec in group_by for field in ([spec] if isinstance(spec, str) else spec)]
+        unknown = [field for field in group_fields if field not in GROUP_BY_FIELDS]
+        if unknown:
+            response = GroupRecognitionResponse.dump(
+                status=StatusType.error,
+                error=ErrorDetail(
+                    code="INVALID_GROUP_BY",
+                    message=f"Unsupported group_by fields: {', '.join(unknown)}",
+                    validation_errors=[f"Supported fields: {', '.join(GROUP_BY_FIELDS)}"]
+                )
+            )
+            return response
+
+        # Range lookup over the calendar index rather than a scan of every user
+        cohort = users.anniversaries.celebrants(start, end, anniversary_years)
+        if org_root_id:
+            # Interval checks against the org tour instead of walking each celebrant's chain
+            cohort = [entry for entry in cohort
+                      if entry[0] == org_root_id or users.org.in_org(org_root_id, entry[0])]
+        # Celebrant rows and breakdowns are CPU work that scales with the cohort
+        data = await async_store.analytics(
+            tenant_id, group_recognition_data, users, tenant_id, cohort, anniversary_years, group_by, group_fields,
+            start_date, end_date
+        )
 
-        response = GroupRecognitionResponse(
+        response = GroupRecognitionResponse.dump(
             status=StatusType.success,
-            data={
-                "group_summary": {
-                    "total_celebrants": len(celebrants),
-                    "milestone_distribution": milestone_distribution,
-                    "period": {
-                        "start_date": milestone_criteria.get("date_range", {}).get("start_date", "2024-01-01"),
-                        "end_date": milestone_criteria.get("date_range", {}).get("end_date", "2024-12-31")
-                    }
-                },
-                "celebrants": celebrants,
-                "department_breakdown": list(dept_breakdown.values())
-            },
+            data=data,
             metadata={
                 "query_date": datetime.now().isoformat(),
                 "data_source": "hr_system"
             }
         )
-        return response.model_dump()
+        return response
     except Exception as e:
-        response = GroupRecognitionResponse(
+        response = GroupRecognitionResponse.dump(
             status=StatusType.error,
             error=ErrorDetail(code="GROUP_RECOGNITION_ERROR", message=str(e))
         )
-        return response.model_dump()
+        return response
 
-@mcp.tool(description="Create anniversary recognition entries and milestone celebrations. Args: sender_id (str), celebrant_id (str), tenant_id (str), anniversary_details (Dict[str, Any]), context (Dict[str, Any]), additional_data (Optional[Dict[str, Any]]). Returns: Dict[str, Any] - PostRecognitionResponse with recognition ID, celebration details, and notification status.")
-def post_recognition(
+@mcp.tool(description="Create anniversary recognition entries and milestone celebrations. Args: sender_id (str), celebrant_id (str), tenant_id (str), anniversary_details (Dict[str, Any]), context (Dict[str, Any]), additional_data (Optional[Dict[str, Any]]). Returns: Dict[str, Any] - PostRecognitionResponse with recognition ID, celebration details, and notification status. Fails with INVALID_RECOGNITION, before anything is recorded, when anniversary_details lacks milestone_years, anniversary_date, recognition_message or celebration_type, or has points that are not a positive integer. With points budgets enforced, fails with INDIVIDUAL_LIMIT_EXCEEDED or PROGRAM_BUDGET_EXHAUSTED when the points would exceed the sender's limit or the program's total for the period.")
+@instrumented(tool_metrics)
+@rate_limited(tenant_limiter, PostRecognitionResponse)
+async def post_recognition(
     sender_id: str,
     celebrant_id: str,
     tenant_id: str,
@@ -346,21 +809,51 @@ def post_recognition(
     additional_data: Optional[Dict[str, Any]] = None,
 ) -> Dict[str, Any]:
     try:
+        # Everything the record and the response read is checked before anything is written
+        validation_errors = anniversary_validation_errors(anniversary_details)
+        if validation_errors:
+            response = PostRecognitionResponse.dump(
+                status=StatusType.error,
+                error=ErrorDetail(
+                    code="INVALID_RECOGNITION",
+                    message="Recognition failed validation",
+                    validation_errors=validation_errors
+                )
+            )
+            return response
+
         anniversary_recognition_id = str(uuid.uuid4())
         celebration_id = str(uuid.uuid4())
         
-        celebrant = mock_store.users.get(celebrant_id)
+        users = mock_store.directory_for(tenant_id)
+        celebrant = users.get(celebrant_id)
         if not celebrant:
-            response = PostRecognitionResponse(
+            response = PostRecognitionResponse.dump(
                 status=StatusType.error,
                 error=ErrorDetail(code="CELEBRANT_NOT_FOUND", message="Celebrant not found")
             )
-            return response.model_dump()
+            return response
         
         milestone_years = anniversary_details["milestone_years"]
         celebrant_name = celebrant["basic_info"]["name"]
+        created_date = datetime.now().isoformat()
 
-        response = PostRecognitionResponse(
+        record = anniversary_record(
+            anniversary_recognition_id, tenant_id, users.get(sender_id, {}), sender_id, celebrant, celebrant_id,
+            anniversary_details, created_date
+        )
+        reservation, = await reserve_points(tenant_id, sender_id, [record])
+        if isinstance(reservation, BudgetExceeded):
+            raise reservation
+        try:
+            applied = await async_store.record_recognitions([record])
+        except BaseException:
+            mock_store.budgets.release(reservation)
+            raise
+        mock_store.budgets.commit(reservation)
+        invalidate_recorded(applied)
+
+        response = PostRecognitionResponse.dump(
             status=StatusType.success,
             data={
                 "anniversary_recognition_id": anniversary_recognition_id,
@@ -370,30 +863,21 @@ def post_recognition(
                     "milestone_years": milestone_years,
                     "anniversary_date": anniversary_details["anniversary_date"],
                     "recognition_message": anniversary_details["recognition_message"],
-                    "created_date": datetime.now().isoformat()
+                    "created_date": created_date
                 },
                 "celebration_details": {
                     "celebration_type": anniversary_details["celebration_type"],
                     "visibility": "public",
                     "expected_participants": 25
                 },
-                "notifications_initiated": [
-                    {
-                        "type": "team_notification",
-                        "recipient_count": 12,
-                        "status": "queued"
-                    },
-                    {
-                        "type": "manager_alert",
-                        "recipient_count": 1,
-                        "status": "sent"
-                    },
-                    {
-                        "type": "public_announcement",
-                        "recipient_count": 150,
-                        "status": "scheduled"
+                "notifications_initiated": await dispatch_anniversary_notifications(
+                    tenant_id, celebrant_id, celebrant, {
+                        "anniversary_recognition_id": anniversary_recognition_id,
+                        "celebrant_name": celebrant_name,
+                        "milestone_years": milestone_years,
+                        "recognition_message": anniversary_details["recognition_message"]
                     }
-                ],
+                ),
                 "next_steps": [
                     {
                         "action": "schedule_celebration_event",
@@ -407,20 +891,171 @@ def post_recognition(
                 ]
             },
             metadata={
-                "processing_time": 250,
+                "processing_time": elapsed_ms(),
                 "celebration_tracking_id": str(uuid.uuid4())
             }
         )
-        return response.model_dump()
+        return response
+    except BudgetExceeded as e:
+        response = PostRecognitionResponse.dump(
+            status=StatusType.error,
+            error=ErrorDetail(code=e.code, message=str(e))
+        )
+        return response
     except Exception as e:
-        response = PostRecognitionResponse(
+        response = PostRecognitionResponse.dump(
             status=StatusType.error,
             error=ErrorDetail(code="POST_RECOGNITION_ERROR", message=str(e))
         )
-        return response.model_dump()
+        return response
+
+@mcp.tool(description="Create many anniversary recognitions in one call, e.g. for month-start HR automation. Args: sender_id (str), tenant_id (str), recognitions (List[Dict[str, Any]]) - each item has celebrant_id plus the anniversary_details fields (milestone_years, anniversary_date, recognition_message, celebration_type, optional points (positive integer)/program_id/behavior_id/behavior_name), at most 1000 items, context (Dict[str, Any]). Returns: Dict[str, Any] - BatchPostRecognitionResponse with per-item results; status is warning when only some items were created, e.g. when points budgets are enforced and some items would exceed them.")
+@instrumented(tool_metrics)
+@rate_limited(tenant_limiter, BatchPostRecognitionResponse, cost=10)
+async def post_recognitions_batch(
+    sender_id: str,
+    tenant_id: str,
+    recognitions: List[Dict[str, Any]],
+    context: Dict[str, Any],
+) -> Dict[str, Any]:
+    try:
+        if len(recognitions) > MAX_BATCH_SIZE:
+            response = BatchPostRecognitionResponse.dump(
+                status=StatusType.error,
+                error=ErrorDetail(
+                    code="BATCH_TOO_LARGE",
+                    message=f"At most {MAX_BATCH_SIZE} recognitions can be posted per batch"
+                )
+            )
+            return response
+
+        users = mock_store.directory_for(tenant_id)
+        sender = users.get(sender_id, {})
+        created_date = datetime.now().isoformat()
+
+        # Validate every item first, then write all valid ones in a single transaction
+        results = []
+        records = []
+        for index, item in enumerate(recognitions):
+            celebrant_id = item.get("celebrant_id")
+            validation_errors = anniversary_validation_errors(item)
+            celebrant = users.get(celebrant_id) if celebrant_id else None
+            if not celebrant_id:
+                validation_errors.append("missing celebrant_id")
+            elif not celebrant:
+                validation_errors.append("celebrant not found")
+            if validation_errors:
+                results.append({
+                    "index": index,
+                    "celebrant_id": celebrant_id,
+                    "status": "failed",
+                    "error": ErrorDetail(
+                        code="INVALID_RECOGNITION",
+                        message="Recognition failed validation",
+                        validation_errors=validation_errors
+                    ).model_dump()
+                })
+                continue
+            recognition_id = str(uuid.uuid4())
+            records.append(anniversary_record(
+                recognition_id, tenant_id, sender, sender_id, celebrant, celebrant_id, item, created_date
+            ))
+            results.append({
+                "index": index,
+                "celebrant_id": celebrant_id,
+                "status": "created",
+                "anniversary_recognition_id": recognition_id,
+                "celebrant_name": celebrant["basic_info"]["name"],
+                "milestone_years": item["milestone_years"],
+                "anniversary_date": item["anniversary_date"]
+            })
+
+        # Hold each valid item's points; items that would overspend fail like invalid ones
+        outcomes = await reserve_points(tenant_id, sender_id, records)
+        reservations = [outcome for outcome in outcomes if not isinstance(outcome, BudgetExceeded)]
+        created = [result for result in results if result["status"] == "created"]
+        affordable = []
+        for result, record, outcome in zip(created, records, outcomes):
+            if isinstance(outcome, BudgetExceeded):
+                results[result["index"]] = {
+                    "index": result["index"],
+                    "celebrant_id": result["celebrant_id"],
+                    "status": "failed",
+                    "error": ErrorDetail(code=outcome.code, message=str(outcome)).model_dump()
+                }
+            else:
+                affordable.append(record)
+        records = affordable
+
+        notifications = []
+        if records:
+            try:
+                applied = await async_store.record_recognitions(records)
+            except BaseException:
+                for reservation in reservations:
+                    mock_store.budgets.release(reservation)
+                raise
+            for reservation in reservations:
+                mock_store.budgets.commit(reservation)
+            invalidate_recorded(applied)
+            # Team and manager notifications per celebrant, one tenant-wide digest for the batch
+            for result in results:
+                if result["status"] == "created":
+                    result["notifications_initiated"] = await dispatch_anniversary_notifications(
+                        tenant_id, result["celebrant_id"], users[result["celebrant_id"]], {
+                            "anniversary_recognition_id": result["anniversary_recognition_id"],
+                            "celebrant_name": result["celebrant_name"],
+                            "milestone_years": result["milestone_years"]
+                        },
+                        include_public=False
+                    )
+            digest = await notification_dispatcher.submit(
+                tenant_id, "public_announcement", "feed", list(users.users),
+                {"celebrants": [record["recipient_name"] for record in records]}
+            )
+            notifications.append({
+                "type": "public_announcement",
+                "notification_id": digest["notification_id"],
+                "recipient_count": digest["recipient_count"],
+                "status": digest["status"]
+            })
+
+        failed = len(results) - len(records)
+        if not records and failed:
+            status = StatusType.error
+            error = ErrorDetail(code="BATCH_VALIDATION_ERROR", message="No recognitions in the batch were valid")
+        else:
+            status = StatusType.warning if failed else StatusType.success
+            error = None
+        response = BatchPostRecognitionResponse.dump(
+            status=status,
+            error=error,
+            data={
+                "batch_id": str(uuid.uuid4()),
+                "summary": {
+                    "submitted": len(recognitions),
+                    "created": len(records),
+                    "failed": failed
+                },
+                "results": results,
+                "notifications_initiated": notifications
+            },
+            metadata={
+                "created_date": created_date
+            }
+        )
+        return response
+    except Exception as e:
+        response = BatchPostRecognitionResponse.dump(
+            status=StatusType.error,
+            error=ErrorDetail(code="BATCH_POST_RECOGNITION_ERROR", message=str(e))
+        )
+        return response
 
-@mcp.tool(description="Trigger invites to colleagues for anniversary celebration events. Args: sender_id (str), celebrant_id (str), tenant_id (str), celebration_details (Dict[str, Any]), invite_criteria (Dict[str, Any]), context (Dict[str, Any]). Returns: Dict[str, Any] - CelebrationInviteResponse with invite ID, celebration details, invitee list, and RSVP tracking.")
-def send_celebration_invite(
+@mcp.tool(description="Trigger invites to colleagues for anniversary celebration events. Args: sender_id (str), celebrant_id (str), tenant_id (str), celebration_details (Dict[str, Any]), invite_criteria (Dict[str, Any]) - invite_type team_only, department, cross_functional or org (everyone under org_root_id, default the sender), context (Dict[str, Any]). Returns: Dict[str, Any] - CelebrationInviteResponse with invite ID, celebration details, invitee list, and RSVP tracking. Fails with INVALID_CELEBRATION, before any invite is sent, when celebration_details lacks celebration_id, milestone_years, celebration_date or celebration_type or the date is not ISO.")
+@instrumented(tool_metrics)
+@rate_limited(tenant_limiter, CelebrationInviteResponse, cost=2)
+async def send_celebration_invite(
     sender_id: str,
     celebrant_id: str,
     tenant_id: str,
@@ -429,75 +1064,98 @@ def send_celebration_invite(
     context: Dict[str, Any],
 ) -> Dict[str, Any]:
     try:
-        celebrant = mock_store.users.get(celebrant_id)
+        users = mock_store.directory_for(tenant_id)
+        celebrant = users.get(celebrant_id)
         if not celebrant:
-            response = CelebrationInviteResponse(
+            response = CelebrationInviteResponse.dump(
                 status=StatusType.error,
                 error=ErrorDetail(code="CELEBRANT_NOT_FOUND", message="Celebrant not found")
             )
-            return response.model_dump()
-        
-        # celebration_details and invite_criteria are passed directly
-        
-        # Determine invitees based on criteria
-        suggested_invitees = []
-        invite_type = invite_criteria["invite_type"]
+            return response
         
-        if invite_type in ["team_only", "department", "cross_functional"]:
-            for user_id, user_data in mock_store.users.items():
-                if user_id != celebrant_id:  # Don't invite celebrant
-                    if (invite_type == "team_only" and 
-                        user_data["role_info"]["team"] == celebrant["role_info"]["team"]):
-                        suggested_invitees.append(user_id)
-                    elif (invite_type == "department" and 
-                          user_data["role_info"]["department"] == celebrant["role_info"]["department"]):
-                        suggested_invitees.append(user_id)
-                    elif invite_type == "cross_functional":
-                        suggested_invitees.append(user_id)
-        
-        # Add required attendees
-        all_invitees = list(set(suggested_invitees + invite_criteria.get("required_attendees", []) + 
-                                invite_criteria.get("optional_attendees", [])))
-        
-        # Limit based on max_invitees if specified
-        max_invitees = invite_criteria.get("max_invitees")
-        if max_invitees and len(all_invitees) > max_invitees:
-            all_invitees = all_invitees[:max_invitees]
+        # Everything the invite and the response read is checked before any invite is sent
+        validation_errors = [f"missing {field}" for field in CELEBRATION_REQUIRED_FIELDS
+                             if field not in celebration_details]
+        celebration_date = None
+        if "celebration_date" in celebration_details:
+            try:
+                celebration_date = datetime.fromisoformat(str(celebration_details["celebration_date"]))
+            except ValueError:
+                validation_errors.append("celebration_date must be an ISO date or datetime")
+        if validation_errors:
+            response = CelebrationInviteResponse.dump(
+                status=StatusType.error,
+                error=ErrorDetail(
+                    code="INVALID_CELEBRATION",
+                    message="Celebration details failed validation",
+                    validation_errors=validation_errors
+                )
+            )
+            return response
+        celebrant_name = celebrant["basic_info"]["name"]
+        details = {
+            "celebration_id": celebration_details["celebration_id"],
+            "celebrant_name": celebrant_name,
+            "milestone_years": celebration_details["milestone_years"],
+            "celebration_date": celebration_details["celebration_date"],
+            "celebration_type": celebration_details["celebration_type"],
+            "venue": celebration_details.get("venue", "Virtual Meeting Room"),
+            "duration": celebration_details.get("duration", 60)
+        }
+
+        # Resolve invitees from membership views, ranked by required status and collaboration strength
+        collaboration_strength = await async_store.collaborator_counts(tenant_id, celebrant_id)
+        resolution = await async_store.analytics(
+            tenant_id, resolve_invitees, users, celebrant_id, invite_criteria, collaboration_strength,
+            org_root_id=invite_criteria.get("org_root_id", sender_id)
+        )
+        all_invitees = resolution.invitees
+        required_attendees = resolution.required
+
+        celebration_invite_id = str(uuid.uuid4())
+        invitee_details = [
+            {
+                "user_id": invitee_id,
+                "name": users.get(invitee_id, {}).get("basic_info", {}).get("name", "Unknown"),
+                "invite_type": "required" if invitee_id in required_attendees else "optional",
+                "notification_status": None,
+                "response_status": "pending"
+            }
+            for invitee_id in all_invitees
+        ]
+        rsvp_tracking = {
+            "rsvp_deadline": (celebration_date - timedelta(days=2)).isoformat(),
+            "response_url": f"https://company.com/celebrations/{details['celebration_id']}/rsvp"
+        }
 
-        response = CelebrationInviteResponse(
+        # Sent last, once the rest of the response is known to build
+        invite_notification = await notification_dispatcher.submit(
+            tenant_id, "celebration_invite", "email", all_invitees, {
+                "celebration_invite_id": celebration_invite_id,
+                "celebration_id": details["celebration_id"],
+                "celebrant_name": celebrant_name,
+                "celebration_date": details["celebration_date"]
+            }
+        )
+        for invitee in invitee_details:
+            invitee["notification_status"] = invite_notification["status"]
+
+        response = CelebrationInviteResponse.dump(
             status=StatusType.success,
             data={
-                "celebration_invite_id": str(uuid.uuid4()),
-                "celebration_details": {
-                    "celebration_id": celebration_details["celebration_id"],
-                    "celebrant_name": celebrant["basic_info"]["name"],
-                    "milestone_years": celebration_details["milestone_years"],
-                    "celebration_date": celebration_details["celebration_date"],
-                    "celebration_type": celebration_details["celebration_type"],
-                    "venue": celebration_details.get("venue", "Virtual Meeting Room"),
-                    "duration": celebration_details.get("duration", 60)
-                },
+                "celebration_invite_id": celebration_invite_id,
+                "celebration_details": details,
                 "invite_summary": {
                     "total_invites_sent": len(all_invitees),
                     "required_attendees": len(invite_criteria.get("required_attendees", [])),
                     "optional_attendees": len(invite_criteria.get("optional_attendees", [])),
-                    "auto_suggested": len(suggested_invitees)
+                    "auto_suggested": resolution.auto_suggested,
+                    "notification_id": invite_notification["notification_id"],
+                    "notification_status": invite_notification["status"]
                 },
-                "invitee_details": [
-                    {
-                        "user_id": invitee_id,
-                        "name": mock_store.users.get(invitee_id, {}).get("basic_info", {}).get("name", "Unknown"),
-                        "invite_type": "required" if invitee_id in invite_criteria.get("required_attendees", []) else "optional",
-                        "notification_status": "sent",
-                        "response_status": "pending"
-                    }
-                    for invitee_id in all_invitees
-                ],
-                "celebration_message_preview": f"Please join us in celebrating {celebrant['basic_info']['name']}'s {celebration_details['milestone_years']} year anniversary with our company!",
-                "rsvp_tracking": {
-                    "rsvp_deadline": (datetime.fromisoformat(celebration_details["celebration_date"]) - timedelta(days=2)).isoformat(),
-                    "response_url": f"https://company.com/celebrations/{celebration_details['celebration_id']}/rsvp"
-                }
+                "invitee_details": invitee_details,
+                "celebration_message_preview": f"Please join us in celebrating {celebrant_name}'s {details['milestone_years']} year anniversary with our company!",
+                "rsvp_tracking": rsvp_tracking
             },
             metadata={
                 "invite_sent_timestamp": datetime.now().isoformat(),
@@ -505,13 +1163,272 @@ def send_celebration_invite(
                 "follow_up_scheduled": (datetime.now() + timedelta(days=3)).isoformat()
             }
         )
-        return response.model_dump()
+        invalidate_cached_responses(tenant_id, [sender_id, celebrant_id])
+        return response
     except Exception as e:
-        response = CelebrationInviteResponse(
+        response = CelebrationInviteResponse.dump(
             status=StatusType.error,
             error=ErrorDetail(code="CELEBRATION_INVITE_ERROR", message=str(e))
         )
-        return response.model_dump()
+        return response
+
+@mcp.tool(description="Poll delivery status of notifications queued by post_recognition, post_recognitions_batch or send_celebration_invite. Args: tenant_id (str), notification_ids (List[str]). Returns: Dict[str, Any] - NotificationStatusResponse with per-notification status (queued, in_progress, delivered, partially_failed, failed, rejected), delivered/failed recipient counts and attempts. Status is tracked by the worker that queued the notification, so with SERVER_WORKERS > 1 this returns NOTIFICATION_STATUS_UNAVAILABLE.")
+@instrumented(tool_metrics)
+@rate_limited(tenant_limiter, NotificationStatusResponse)
+async def get_notification_status(
+    tenant_id: str,
+    notification_ids: List[str],
+) -> Dict[str, Any]:
+    if SERVER_WORKERS > 1:
+        return NotificationStatusResponse.dump(
+            status=StatusType.error,
+            error=ErrorDetail(code="NOTIFICATION_STATUS_UNAVAILABLE",
+                              message="Notification status is held by the worker that queued it")
+        )
+    try:
+        notifications = []
+        not_found = []
+        for notification_id in notification_ids:
+            status = notification_dispatcher.status(notification_id)
+            if status is None or status["tenant_id"] != tenant_id:
+                not_found.append(notification_id)
+            else:
+                notifications.append(status)
+        response = NotificationStatusResponse.dump(
+            status=StatusType.success,
+            data={
+                "notifications": notifications,
+                "not_found": not_found
+            },
+            metadata={
+                "queue_depth": notification_dispatcher.queue_depth(),
+                "query_date": datetime.now().isoformat()
+            }
+        )
+        return response
+    except Exception as e:
+        response = NotificationStatusResponse.dump(
+            status=StatusType.error,
+            error=ErrorDetail(code="NOTIFICATION_STATUS_ERROR", message=str(e))
+        )
+        return response
+
+def search_data(tenant_id: str, user_id: str, query: str, filters: Dict[str, Any], limit: int) -> Dict[str, Any]:
+    index = mock_store.search_index(tenant_id)
+    encoded = index.encode_filters(
+        viewer_id=user_id,
+        user_id=filters.get("user_id"),
+        direction=filters.get("direction", "any"),
+        program_id=filters.get("program_id"),
+        behavior_id=filters.get("behavior_id"),
+        since=filters.get("since"),
+        until=filters.get("until"),
+    )
+    hits, total_matches = index.search(query, encoded, limit)
+    rows = mock_store.recognitions.records_by_seq([seq for _, seq in hits])
+    results = [
+        dict(mock_store.recognitions.to_response_record(rows[seq], user_id), score=round(score, 4))
+        for score, seq in hits if seq in rows
+    ]
+    return {"results": results, "total_matches": total_matches, "index": index.stats()}
+
+@mcp.tool(description="Full-text search over recognition titles, messages, behavior and program names, ranked by BM25 relevance. Args: user_id (str), tenant_id (str), query (str), context (Dict[str, Any]), filters (Optional[Dict[str, Any]]) - user_id (str) with direction received, sent or any (default), program_id (str), behavior_id (str), since (str) - inclusive ISO date/datetime, until (str) - exclusive ISO date/datetime; limit (int) - top hits to return, up to 100. Non-public recognitions only match for their sender or recipient. Returns: Dict[str, Any] - SearchRecognitionsResponse with data (results with score, total_matches) and metadata with index size.")
+@instrumented(tool_metrics)
+@rate_limited(tenant_limiter, SearchRecognitionsResponse, cost=2)
+@synced
+@coalesced(request_flights, "search_recognitions")
+async def search_recognitions(
+    user_id: str,
+    tenant_id: str,
+    query: str,
+    context: Dict[str, Any],
+    filters: Optional[Dict[str, Any]] = None,
+    limit: int = 10,
+) -> Dict[str, Any]:
+    try:
+        if not tokenize(query):
+            response = SearchRecognitionsResponse.dump(
+                status=StatusType.error,
+                error=ErrorDetail(code="INVALID_QUERY", message="Query has no searchable terms")
+            )
+            return response
+        filters = filters or {}
+        unknown = sorted(set(filters) - SEARCH_FILTERS)
+        if unknown:
+            response = SearchRecognitionsResponse.dump(
+                status=StatusType.error,
+                error=ErrorDetail(
+                    code="INVALID_FILTERS",
+                    message=f"Unsupported filters: {', '.join(unknown)}",
+                    validation_errors=[f"Supported filters: {', '.join(sorted(SEARCH_FILTERS))}"]
+                )
+            )
+            return response
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+
+        # The first search of a tenant builds its index from the ledger, so it runs with the analytics work
+        try:
+            data = await async_store.analytics(tenant_id, search_data, tenant_id, user_id, query, filters, limit)
+        except ValueError as e:
+            response = SearchRecognitionsResponse.dump(
+                status=StatusType.error,
+                error=ErrorDetail(code="INVALID_FILTERS", message=str(e))
+            )
+            return response
+        index = data.pop("index")
+
+        response = SearchRecognitionsResponse.dump(
+            status=StatusType.success,
+            data={"query": query, **data},
+            metadata={
+                "returned": len(data["results"]),
+                "limit": limit,
+                "indexed_documents": index["documents"],
+                "index_seq": index["last_seq"],
+                "query_date": datetime.now().isoformat()
+            }
+        )
+        return response
+    except Exception as e:
+        response = SearchRecognitionsResponse.dump(
+            status=StatusType.error,
+            error=ErrorDetail(code="SEARCH_ERROR", message=str(e))
+        )
+        return response
+
+def milestone_years_request(milestone_years: Any) -> List[int]:
+    """Validated service milestones (years) for a request, the defaults if none are given."""
+    if not milestone_years:
+        return MILESTONE_YEARS
+    if isinstance(milestone_years, (str, bytes)) or any(isinstance(year, bool) for year in milestone_years):
+        raise ValueError("milestone_years must be a list of integers")
+    years = [int(year) for year in milestone_years]
+    if any(not 1 <= year <= MAX_MILESTONE_YEARS for year in years):
+        raise ValueError(f"milestone_years must be between 1 and {MAX_MILESTONE_YEARS}")
+    return years
+
+def milestone_request(days: Any, milestone_years: Any, group_by: str, as_of: Optional[str]) -> tuple:
+    """Validated (days, milestone_years, group_by, as_of date) for an upcoming-milestones report."""
+    days = int(days)
+    if not 0 <= days <= MAX_MILESTONE_DAYS:
+        raise ValueError(f"days must be between 0 and {MAX_MILESTONE_DAYS}")
+    years = milestone_years_request(milestone_years)
+    if group_by not in MILESTONE_GROUP_BY:
+        raise ValueError(f"group_by must be one of {', '.join(MILESTONE_GROUP_BY)}")
+    return days, years, group_by, date.fromisoformat(as_of[:10]) if as_of else date.today()
+
+@mcp.tool(description="List everyone reaching a service milestone within the next N days, with tenure computed from hire dates, grouped by manager or department; replaces calling lookup_team for every team. Args: user_id (str), tenant_id (str), context (Dict[str, Any]) - milestone_criteria.anniversary_years sets the milestones (default 5, 10, 15, 20, 25), days (int) - window length up to 366, default 30, group_by (str) - manager (default) or department, milestone_years (Optional[List[int]]) - overrides the context milestones, as_of (Optional[str]) - ISO start date, default today. Returns: Dict[str, Any] - UpcomingMilestonesResponse with window, summary (celebrants, groups, by_milestone, headcount, average_tenure_years) and groups of celebrants with anniversary_date, days_until and tenure_years; at most 1000 celebrants, the full report streams as NDJSON from GET /milestones/upcoming.")
+@instrumented(tool_metrics)
+@rate_limited(tenant_limiter, UpcomingMilestonesResponse, cost=5)
+@synced
+@coalesced(request_flights, "get_upcoming_milestones")
+async def get_upcoming_milestones(
+    user_id: str,
+    tenant_id: str,
+    context: Dict[str, Any],
+    days: int = DEFAULT_MILESTONE_DAYS,
+    group_by: str = "manager",
+    milestone_years: Optional[List[int]] = None,
+    as_of: Optional[str] = None,
+) -> Dict[str, Any]:
+    try:
+        try:
+            days, years, group_by, start = milestone_request(
+                days, milestone_years or context.get("milestone_criteria", {}).get("anniversary_years"), group_by, as_of
+            )
+        except (TypeError, ValueError) as e:
+            response = UpcomingMilestonesResponse.dump(
+                status=StatusType.error,
+                error=ErrorDetail(code="INVALID_REQUEST", message=str(e))
+            )
+            return response
+        users = mock_store.directory_for(tenant_id)
+
+        def report():
+            upcoming = UpcomingMilestones(users, start, days, years, group_by)
+            return upcoming, list(upcoming.groups(MAX_MILESTONE_RESULTS))
+
+        # One vectorized pass over the tenant's hire dates, on the analytics pool
+        upcoming, groups = await async_store.analytics(tenant_id, report)
+        truncated = len(upcoming) > MAX_MILESTONE_RESULTS
+
+        response = UpcomingMilestonesResponse.dump(
+            status=StatusType.success,
+            data={
+                "window": {"start_date": start.isoformat(), "end_date": upcoming.end.isoformat(), "days": days},
+                "milestone_years": upcoming.milestone_years,
+                "group_by": group_by,
+                "summary": upcoming.summary(),
+                "groups": groups
+            },
+            metadata={
+                "returned": sum(group["count"] for group in groups),
+                "truncated": truncated,
+                "stream": (f"/milestones/upcoming?tenant_id={tenant_id}&days={days}&group_by={group_by}"
+                           f"&milestone_years={','.join(map(str, upcoming.milestone_years))}&as_of={start.isoformat()}"),
+                "query_date": datetime.now().isoformat()
+            }
+        )
+        return response
+    except Exception as e:
+        response = UpcomingMilestonesResponse.dump(
+            status=StatusType.error,
+            error=ErrorDetail(code="UPCOMING_MILESTONES_ERROR", message=str(e))
+        )
+        return response
+
+@mcp.tool(description="Report server-side tool metrics. Args: tools (Optional[List[str]]) - limit to these tool names. Returns: Dict[str, Any] - ServerStatsResponse with per-tool call counts, error-code counts, wall/CPU time quantiles in ms and response size quantiles in bytes, plus response cache, request coalescing (executed vs coalesced calls per tool) and notification queue stats and per-tenant rate limit, analytics queue, cache and roster usage, points budget totals per tenant program and search index sizes per tenant. The same metrics are exposed in Prometheus format at GET /metrics.")
+@instrumented(tool_metrics)
+async def get_server_stats(tools: Optional[List[str]] = None) -> Dict[str, Any]:
+    try:
+        response = ServerStatsResponse.dump(
+            status=StatusType.success,
+            data={
+                "tools": tool_metrics.snapshot(tools),
+                "response_cache": response_cache.stats(),
+                "request_coalescing": request_flights.stats(),
+                "notifications": notification_dispatcher.stats(),
+                "tenants": {
+                    "rate_limits": tenant_limiter.stats(),
+                    "analytics_scheduler": async_store.scheduler.stats(),
+                    "response_cache_usage": response_cache.tenant_usage(),
+                    "users": mock_store.directory.tenant_sizes(),
+                },
+                "points_budget": mock_store.budgets.stats(),
+                "search_indexes": mock_store.search.stats()
+            },
+            metadata={
+                "uptime_seconds": round(time.time() - tool_metrics.started_at, 1),
+                "query_date": datetime.now().isoformat()
+            }
+        )
+        return response
+    except Exception as e:
+        response = ServerStatsResponse.dump(
+            status=StatusType.error,
+            error=ErrorDetail(code="SERVER_STATS_ERROR", message=str(e))
+        )
+        return response
+
+def create_app():
+    """ASGI app for multi-worker serving; stateless MCP sessions let any worker answer any request."""
+    return mcp.http_app(transport="streamable-http", stateless_http=True)
+
 
 if __name__ == "__main__":
-    mcp.run(transport="streamable-http", host="0.0.0.0", port=8080)
+    port = int(os.environ.get("SERVER_PORT", 8080))
+    if "SERVER_WORKERS" in os.environ:
+        # Worker mode: uvicorn processes share the port and, through the store backend, the ledger.
+        # /roster and get_notification_status refuse requests there, since that state stays per worker
+        if SERVER_WORKERS > 1 and not mock_store.backend.shared:
+            raise SystemExit("SERVER_WORKERS > 1 needs a shared store: set STORE_BACKEND=sqlite and RECOGNITION_LEDGER_PATH")
+        # Reservations are held in each worker's memory, so N workers could each spend a program's whole budget
+        if SERVER_WORKERS > 1 and mock_store.budgets.enabled:
+            raise SystemExit("POINTS_BUDGET_ENFORCE needs a single worker: budgets are reserved in worker memory")
+        # Likewise each worker would refill its own token buckets, letting a tenant through N times over
+        if SERVER_WORKERS > 1 and (tenant_limiter.rate or tenant_limiter.overrides):
+            raise SystemExit("TENANT_RATE_LIMIT needs a single worker: token buckets are kept in worker memory")
+        import uvicorn
+        uvicorn.run("server:create_app", factory=True, host="0.0.0.0", port=port, workers=SERVER_WORKERS)
+    else:
+        mcp.run(transport="streamable-http", host="0.0.0.0", port=port)
@@ -0,0 +1,59 @@
+"""
+Storage backends for the recognition store
+The ledger is the store's source of truth and the team views, collaboration
+matrix and response cache are derived from it. "memory" keeps the ledger
+inside one process; "sqlite" puts it in a WAL-mode file that every server
+worker opens, so a write from any worker is visible to all of them
+"""
+import os
+from typing import Optional, Dict, Type
+
+from recognition_ledger import RecognitionLedger
+
+
+class StoreBackend:
+    """Where the recognition ledger lives and whether other processes write to it too."""
+
+    name = "base"
+    # True when other processes append to the same ledger, so derived state must catch up before reads
+    shared = False
+
+    def open_ledger(self) -> RecognitionLedger:
+        raise NotImplementedError
+
+
+class MemoryBackend(StoreBackend):
+    name = "memory"
+
+    def open_ledger(self) -> RecognitionLedger:
+        return RecognitionLedger(":memory:")
+
+
+class SQLiteWALBackend(StoreBackend):
+    name = "sqlite"
+    shared = True
+
+    def __init__(self, path: str):
+        if not path or path == ":memory:":
+            raise ValueError("the sqlite store backend needs a file path shared by all workers")
+        self.path = path
+
+    def open_ledger(self) -> RecognitionLedger:
+        return RecognitionLedger(self.path)
+
+
+STORE_BACKENDS: Dict[str, Type[StoreBackend]] = {
+    "memory": MemoryBackend,
+    "sqlite": SQLiteWALBackend,
+}
+
+
+def backend_from_env(name: Optional[str] = None, path: Optional[str] = None) -> StoreBackend:
+    """Backend named by STORE_BACKEND; a file RECOGNITION_LEDGER_PATH alone still selects sqlite."""
+    path = path or os.environ.get("RECOGNITION_LEDGER_PATH", ":memory:")
+    name = name or os.environ.get("STORE_BACKEND") or ("memory" if path == ":memory:" else "sqlite")
+    if name not in STORE_BACKENDS:
+        raise ValueError(f"Unknown STORE_BACKEND {name!r}; expected one of {', '.join(STORE_BACKENDS)}")
+    if name == "sqlite":
+        return SQLiteWALBackend(path)
+    return STORE_BACKENDS[name]()
@@ -0,0 +1,81 @@
+"""
+Binary snapshots of the in-memory store for fast restarts
+A snapshot is a JSON header followed by independently encoded sections
+(one per tenant for users and team views, plus the collaboration matrix).
+Readers memory-map the file and decode a section only when it is first
+needed, so startup cost does not grow with the size of the dataset
+"""
+import json
+import marshal
+import mmap
+import os
+import struct
+import sys
+from typing import Optional, Dict, Any, Iterable, Tuple
+
+SNAPSHOT_MAGIC = b"MCPS1\0"
+# marshal's format is tied to the interpreter, so snapshots record both; "layout" is
+# bumped whenever what a section holds changes
+FORMAT = {"python": list(sys.version_info[:2]), "marshal": marshal.version, "layout": 2}
+
+
+def encode(value: Any) -> bytes:
+    return marshal.dumps(value)
+
+
+def write_snapshot(path: str, ledger_seq: int, sections: Iterable[Tuple[str, bytes]]) -> Dict[str, Any]:
+    """Write ``sections`` (name, encoded bytes) after a header, atomically via temp file + rename."""
+    sections = list(sections)
+    index, offset = {}, 0
+    for name, blob in sections:
+        index[name] = [offset, len(blob)]
+        offset += len(blob)
+    header = {**FORMAT, "ledger_seq": ledger_seq, "sections": index}
+    encoded = json.dumps(header).encode()
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(SNAPSHOT_MAGIC)
+        f.write(struct.pack("<Q", len(encoded)))
+        f.write(encoded)
+        for _, blob in sections:
+            f.write(blob)
+    os.replace(tmp_path, path)
+    return header
+
+
+class StoreSnapshot:
+    """Read side of a snapshot: the header is parsed on open, sections are decoded on demand."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._map[:len(SNAPSHOT_MAGIC)] != SNAPSHOT_MAGIC:
+            raise ValueError(f"{path} is not a store snapshot")
+        (header_len,) = struct.unpack_from("<Q", self._map, len(SNAPSHOT_MAGIC))
+        start = len(SNAPSHOT_MAGIC) + 8
+        self.header: Dict[str, Any] = json.loads(self._map[start:start + header_len])
+        if {key: self.header.get(key) for key in FORMAT} != FORMAT:
+            raise ValueError(f"{path} was written by an incompatible interpreter")
+        self._data_start = start + header_len
+
+    @property
+    def ledger_seq(self) -> int:
+        return self.header["ledger_seq"]
+
+    def names(self, prefix: str = "") -> Iterable[str]:
+        return [name for name in self.header["sections"] if name.startswith(prefix)]
+
+    def has(self, name: str) -> bool:
+        return name in self.header["sections"]
+
+    def raw(self, name: str) -> memoryview:
+        """Encoded bytes of a section, without copying, e.g. to carry it unchanged into a new snapshot."""
+        offset, length = self.header["sections"][name]
+        start = self._data_start + offset
+        return memoryview(self._map)[start:start + length]
+
+    def load(self, name: str, default: Optional[Any] = None) -> Any:
+        if not self.has(name):
+            return default
+        return marshal.loads(self.raw(name))
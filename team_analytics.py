@@ -0,0 +1,240 @@
+"""
+Team-level materialized views maintained on the recognition write path
+lookup_team reads these precomputed results instead of aggregating raw
+recognitions per call; team-to-team counts live in collaboration_matrix
+"""
+import heapq
+import threading
+from typing import List, Optional, Dict, Any, Callable, Set, Tuple
+
+TOP_K = 10
+
+
+class BoundedTopK:
+    """Top-K keys by a monotonically increasing score.
+
+    Scores only grow, so a key outside the top K can only enter it through
+    its own increment; offering every updated score keeps the set exact
+    while holding at most K live entries. Stale heap entries are dropped
+    lazily and the heap is compacted once it exceeds 2*K entries.
+    """
+
+    def __init__(self, k: int = TOP_K):
+        self.k = k
+        self._scores: Dict[str, int] = {}
+        self._heap: List[Tuple[int, str]] = []
+
+    def offer(self, key: str, score: int) -> None:
+        if key in self._scores:
+            self._scores[key] = score
+            heapq.heappush(self._heap, (score, key))
+        elif len(self._scores) < self.k:
+            self._scores[key] = score
+            heapq.heappush(self._heap, (score, key))
+        else:
+            min_score, min_key = self._peek_min()
+            if score <= min_score:
+                return
+            del self._scores[min_key]
+            heapq.heappop(self._heap)
+            self._scores[key] = score
+            heapq.heappush(self._heap, (score, key))
+        if len(self._heap) > 2 * self.k:
+            self._heap = [(current, member) for member, current in self._scores.items()]
+            heapq.heapify(self._heap)
+
+    def _peek_min(self) -> Tuple[int, str]:
+        while True:
+            score, key = self._heap[0]
+            if self._scores.get(key) == score:
+                return score, key
+            heapq.heappop(self._heap)
+
+    def items(self) -> List[Tuple[str, int]]:
+        return sorted(self._scores.items(), key=lambda item: (-item[1], item[0]))
+
+    def scores(self) -> Dict[str, int]:
+        return dict(self._scores)
+
+    @classmethod
+    def from_scores(cls, k: int, scores: Dict[str, int]) -> "BoundedTopK":
+        top = cls(k)
+        top._scores = dict(scores)
+        top._heap = [(score, key) for key, score in top._scores.items()]
+        heapq.heapify(top._heap)
+        return top
+
+
+class MemberStats:
+    __slots__ = ("points_sent", "points_received", "recognitions_sent", "recognitions_received")
+
+    def __init__(self):
+        self.points_sent = 0
+        self.points_received = 0
+        self.recognitions_sent = 0
+        self.recognitions_received = 0
+
+    def as_dict(self) -> Dict[str, int]:
+        return {
+            "points_sent": self.points_sent,
+            "points_received": self.points_received,
+            "recognitions_sent": self.recognitions_sent,
+            "recognitions_received": self.recognitions_received,
+        }
+
+
+class TeamView:
+    def __init__(self, team: str, top_k: int = TOP_K):
+        self.team = team
+        self.total_recognitions = 0
+        self.total_points = 0
+        self.active_senders = 0
+        self.members: Dict[str, MemberStats] = {}
+        self.behaviors: Dict[str, List[int]] = {}
+        self.top_recognizers = BoundedTopK(top_k)
+        self.top_recipients = BoundedTopK(top_k)
+
+    def member(self, user_id: str) -> MemberStats:
+        stats = self.members.get(user_id)
+        if stats is None:
+            stats = self.members[user_id] = MemberStats()
+        return stats
+
+    def to_row(self) -> list:
+        """Plain-container form of the view for snapshots."""
+        return [
+            self.team, self.total_recognitions, self.total_points, self.active_senders,
+            {uid: [stats.points_sent, stats.points_received, stats.recognitions_sent, stats.recognitions_received]
+             for uid, stats in self.members.items()},
+            {name: list(totals) for name, totals in self.behaviors.items()},
+            self.top_recognizers.scores(),
+            self.top_recipients.scores(),
+        ]
+
+    @classmethod
+    def from_row(cls, row: list, top_k: int = TOP_K) -> "TeamView":
+        team, total_recognitions, total_points, active_senders, members, behaviors, recognizers, recipients = row
+        view = cls(team, top_k)
+        view.total_recognitions, view.total_points, view.active_senders = total_recognitions, total_points, active_senders
+        for uid, counts in members.items():
+            stats = view.members[uid] = MemberStats()
+            stats.points_sent, stats.points_received, stats.recognitions_sent, stats.recognitions_received = counts
+        view.behaviors = {name: list(totals) for name, totals in behaviors.items()}
+        view.top_recognizers = BoundedTopK.from_scores(top_k, recognizers)
+        view.top_recipients = BoundedTopK.from_scores(top_k, recipients)
+        return view
+
+
+class TeamAnalyticsViews:
+    """Per-tenant, per-team views: member counters, behavior totals and top-K heaps.
+
+    Recognitions are attributed to the teams the sender and recipient were
+    on when the recognition was written. Tenants restored from a store
+    snapshot are decoded the first time one of their views is touched.
+    """
+
+    def __init__(self, top_k: int = TOP_K):
+        self.top_k = top_k
+        self._lock = threading.Lock()
+        self._views: Dict[Tuple[str, str], TeamView] = {}
+        self._snapshot: Optional[Any] = None
+        self._pending: Set[str] = set()
+
+    def attach_snapshot(self, snapshot: Any) -> None:
+        with self._lock:
+            self._snapshot = snapshot
+            self._pending = {name[len("team_views/"):] for name in snapshot.names("team_views/")}
+
+    def _tenant_ready(self, tenant_id: str) -> None:
+        if tenant_id not in self._pending:
+            return
+        with self._lock:
+            if tenant_id in self._pending:
+                for row in self._snapshot.load(f"team_views/{tenant_id}"):
+                    view = TeamView.from_row(row, self.top_k)
+                    self._views[(tenant_id, view.team)] = view
+                self._pending.discard(tenant_id)
+
+    def snapshot_sections(self, encode: Callable[[Any], bytes]) -> List[Tuple[str, Any]]:
+        """(section name, encoded views) per tenant; tenants never touched are copied from the old snapshot."""
+        with self._lock:
+            rows: Dict[str, list] = {}
+            for (tenant_id, _), view in self._views.items():
+                rows.setdefault(tenant_id, []).append(view.to_row())
+            sections = [(f"team_views/{tenant_id}", encode(tenant_rows)) for tenant_id, tenant_rows in rows.items()]
+            sections += [(f"team_views/{tenant_id}", self._snapshot.raw(f"team_views/{tenant_id}"))
+                         for tenant_id in self._pending]
+        return sections
+
+    def _view(self, tenant_id: str, team: str) -> TeamView:
+        view = self._views.get((tenant_id, team))
+        if view is None:
+            view = self._views[(tenant_id, team)] = TeamView(team, self.top_k)
+        return view
+
+    def apply(self, record: Dict[str, Any], sender_team: Optional[str], recipient_team: Optional[str]) -> None:
+        tenant_id = record["tenant_id"]
+        sender_id, recipient_id = record["sender_id"], record["recipient_id"]
+        points = record.get("points") or 0
+        behavior_name = record.get("behavior_name")
+        self._tenant_ready(tenant_id)
+        with self._lock:
+            teams = {team for team in (sender_team, recipient_team) if team is not None}
+            for team in teams:
+                view = self._view(tenant_id, team)
+                view.total_recognitions += 1
+                view.total_points += points
+                if behavior_name:
+                    totals = view.behaviors.setdefault(behavior_name, [0, 0])
+                    totals[0] += 1
+                    totals[1] += points
+            if sender_team is not None:
+                view = self._view(tenant_id, sender_team)
+                stats = view.member(sender_id)
+                if not stats.recognitions_sent:
+                    view.active_senders += 1
+                stats.recognitions_sent += 1
+                stats.points_sent += points
+                view.top_recognizers.offer(sender_id, stats.recognitions_sent)
+            if recipient_team is not None:
+                view = self._view(tenant_id, recipient_team)
+                stats = view.member(recipient_id)
+                stats.recognitions_received += 1
+                stats.points_received += points
+                view.top_recipients.offer(recipient_id, stats.points_received)
+
+    def member_stats(self, tenant_id: str, team: str, user_id: str) -> Dict[str, int]:
+        self._tenant_ready(tenant_id)
+        view = self._views.get((tenant_id, team))
+        stats = view.members.get(user_id) if view is not None else None
+        return stats.as_dict() if stats is not None else MemberStats().as_dict()
+
+    def snapshot(self, tenant_id: str, team: str, member_count: int, limit: int = 5) -> Dict[str, Any]:
+        """Precomputed team_analytics block for lookup_team; names are resolved by the caller."""
+        self._tenant_ready(tenant_id)
+        with self._lock:
+            view = self._views.get((tenant_id, team))
+            if view is None:
+                view = TeamView(team)
+            behaviors = sorted(view.behaviors.items(), key=lambda item: (-item[1][0], item[0]))[:limit]
+            recognizers = view.top_recognizers.items()[:limit]
+            recipients = view.top_recipients.items()[:limit]
+            total, points, senders = view.total_recognitions, view.total_points, view.active_senders
+        return {
+            "recognition_summary": {
+                "total_recognitions": total,
+                "total_points_exchanged": points,
+                "average_recognition_value": round(points / total, 2) if total else 0,
+                "participation_rate": round(min(1.0, senders / member_count), 4) if member_count else 0
+            },
+            "trending_behaviors": [
+                {"behavior_name": name, "frequency": counts[0], "total_points": counts[1]}
+                for name, counts in behaviors
+            ],
+            "top_recognizers": [
+                {"user_id": user_id, "recognition_count": count} for user_id, count in recognizers
+            ],
+            "top_recipients": [
+                {"user_id": user_id, "points_received": points_received} for user_id, points_received in recipients
+            ],
+        }
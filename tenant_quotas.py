@@ -0,0 +1,228 @@
+"""
+Per-tenant rate limiting and fair scheduling of analytics work
+Each tenant has a token bucket in front of the tools, and expensive
+aggregations are queued per tenant and served round-robin with a cap on
+how many workers one tenant may hold, so a tenant flooding the server with
+large cohort queries only ever waits behind itself
+"""
+import functools
+import inspect
+import threading
+import time
+from collections import Counter, OrderedDict, deque
+from concurrent.futures import Executor, Future
+from typing import Optional, Dict, Any, Callable, Deque, Tuple, Type
+
+from mcp_schemas import BaseResponse, ErrorDetail, StatusType
+
+
+class TokenBucket:
+    __slots__ = ("rate", "burst", "tokens", "updated")
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+
+    def take(self, cost: float, now: float) -> float:
+        """Take ``cost`` tokens; returns 0 on success, else the seconds until they would be available.
+
+        A call costing more than ``burst`` needs a full bucket and leaves it
+        in debt, so such calls are still held to ``rate / cost`` per second.
+        """
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        needed = min(cost, self.burst)
+        if self.tokens >= needed:
+            self.tokens -= cost
+            return 0.0
+        return (needed - self.tokens) / self.rate
+
+
+class TenantRateLimiter:
+    """Token bucket per tenant_id; ``rate`` tokens/s refill up to ``burst``. A rate of 0 disables limiting.
+
+    ``overrides`` gives individual tenants their own (rate, burst).
+    """
+
+    def __init__(self, rate: float = 0.0, burst: Optional[float] = None,
+                 overrides: Optional[Dict[str, Tuple[float, float]]] = None):
+        self.rate = rate
+        self.burst = burst if burst is not None else max(1.0, 2 * rate)
+        self.overrides = dict(overrides or {})
+        self._lock = threading.Lock()
+        self._buckets: Dict[str, TokenBucket] = {}
+        self.allowed: Counter = Counter()
+        self.limited: Counter = Counter()
+
+    def set_limit(self, tenant_id: str, rate: float, burst: Optional[float] = None) -> None:
+        """Give one tenant its own rate (0 = unlimited) and burst, starting from a full bucket."""
+        with self._lock:
+            self.overrides[tenant_id] = (rate, burst if burst is not None else max(1.0, 2 * rate))
+            self._buckets.pop(tenant_id, None)
+
+    def acquire(self, tenant_id: str, cost: float = 1.0) -> float:
+        """Charge a call to the tenant; returns 0 if it may proceed, else the suggested retry delay."""
+        rate, burst = self.overrides.get(tenant_id, (self.rate, self.burst))
+        if rate <= 0:
+            return 0.0
+        with self._lock:
+            bucket = self._buckets.get(tenant_id)
+            if bucket is None:
+                bucket = self._buckets[tenant_id] = TokenBucket(rate, burst)
+            retry_after = bucket.take(cost, time.monotonic())
+            (self.limited if retry_after else self.allowed)[tenant_id] += 1
+        return retry_after
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "rate_per_second": self.rate,
+                "burst": self.burst,
+                "tenants": {
+                    tenant_id: {"allowed": self.allowed[tenant_id], "limited": self.limited[tenant_id]}
+                    for tenant_id in sorted(set(self.allowed) | set(self.limited))
+                },
+            }
+
+
+def rate_limited(limiter: TenantRateLimiter, response_model: Type[BaseResponse], cost: float = 1.0):
+    """Reject a tool call with RATE_LIMITED when its tenant_id is out of tokens; ``cost`` weighs heavy tools."""
+    def decorator(fn: Callable):
+        signature = inspect.signature(fn)
+
+        def rejection(args, kwargs) -> Optional[Dict[str, Any]]:
+            tenant_id = signature.bind(*args, **kwargs).arguments.get("tenant_id")
+            retry_after = limiter.acquire(tenant_id, cost) if tenant_id else 0.0
+            if not retry_after:
+                return None
+            return response_model.dump(
+                status=StatusType.error,
+                error=ErrorDetail(
+                    code="RATE_LIMITED",
+                    message=f"Too many requests for tenant {tenant_id}; retry in {retry_after:.2f}s",
+                    validation_errors=[f"retry_after_seconds={retry_after:.3f}"]
+                )
+            )
+
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            response = rejection(args, kwargs)
+            if response is not None:
+                return response
+            return await fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class _Job:
+    __slots__ = ("future", "fn", "args", "kwargs")
+
+    def __init__(self, future: Future, fn: Callable, args: tuple, kwargs: Dict[str, Any]):
+        self.future = future
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+
+
+class FairScheduler:
+    """Worker threads that serve per-tenant FIFO queues round-robin.
+
+    A tenant holds at most ``max_per_tenant`` workers at a time (default:
+    all but one), so however much work one tenant queues, another tenant's
+    job starts as soon as a worker is free instead of after the backlog.
+    """
+
+    def __init__(self, workers: int = 4, max_per_tenant: Optional[int] = None, thread_name_prefix: str = "fair"):
+        self.workers = workers
+        self.max_per_tenant = max_per_tenant or max(1, workers - 1)
+        self._cond = threading.Condition()
+        # Tenants with queued jobs, in the order they will next be served
+        self._queues: "OrderedDict[str, Deque[_Job]]" = OrderedDict()
+        self._running: Counter = Counter()
+        self.completed: Counter = Counter()
+        self._shutdown = False
+        self._threads = [
+            threading.Thread(target=self._work, name=f"{thread_name_prefix}-{i}", daemon=True) for i in range(workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, tenant_id: str, fn: Callable, *args, **kwargs) -> Future:
+        future: Future = Future()
+        with self._cond:
+            if self._shutdown:
+                raise RuntimeError("cannot schedule new work after shutdown")
+            queue = self._queues.get(tenant_id)
+            if queue is None:
+                queue = self._queues[tenant_id] = deque()
+            queue.append(_Job(future, fn, args, kwargs))
+            self._cond.notify()
+        return future
+
+    def executor(self, tenant_id: str) -> "TenantExecutor":
+        return TenantExecutor(self, tenant_id)
+
+    def _next(self) -> Optional[Tuple[str, _Job]]:
+        for tenant_id, queue in self._queues.items():
+            if self._running[tenant_id] < self.max_per_tenant:
+                job = queue.popleft()
+                if queue:
+                    self._queues.move_to_end(tenant_id)
+                else:
+                    del self._queues[tenant_id]
+                self._running[tenant_id] += 1
+                return tenant_id, job
+        return None
+
+    def _work(self) -> None:
+        while True:
+            with self._cond:
+                while (picked := self._next()) is None:
+                    if self._shutdown:
+                        return
+                    self._cond.wait()
+            tenant_id, job = picked
+            try:
+                if job.future.set_running_or_notify_cancel():
+                    try:
+                        job.future.set_result(job.fn(*job.args, **job.kwargs))
+                    except BaseException as e:
+                        job.future.set_exception(e)
+            finally:
+                with self._cond:
+                    self._running[tenant_id] -= 1
+                    if not self._running[tenant_id]:
+                        del self._running[tenant_id]
+                    self.completed[tenant_id] += 1
+                    # A freed per-tenant slot can unblock a waiting job
+                    self._cond.notify_all()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "workers": self.workers,
+                "max_per_tenant": self.max_per_tenant,
+                "queued": {tenant_id: len(queue) for tenant_id, queue in self._queues.items()},
+                "running": dict(self._running),
+            }
+
+    def shutdown(self, wait: bool = True) -> None:
+        with self._cond:
+            self._shutdown = True
+            self._cond.notify_all()
+        if wait:
+            for thread in self._threads:
+                thread.join()
+
+
+class TenantExecutor(Executor):
+    """One tenant's view of a FairScheduler, usable with loop.run_in_executor."""
+
+    def __init__(self, scheduler: FairScheduler, tenant_id: str):
+        self.scheduler = scheduler
+        self.tenant_id = tenant_id
+
+    def submit(self, fn: Callable, *args, **kwargs) -> Future:
+        return self.scheduler.submit(self.tenant_id, fn, *args, **kwargs)
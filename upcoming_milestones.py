@@ -0,0 +1,203 @@
+"""
+Upcoming service milestones computed from hire dates
+A tenant's hire dates are kept as one datetime64[D] column (with the year,
+month and day split out), rebuilt only when the roster changes. A report
+is then a vectorized pass over that column: live tenure for everyone, and
+each user's anniversary in every calendar year the window touches, kept
+when it falls in the window on a configured milestone. Rows come back
+ordered by group and date so they can be streamed one group at a time.
+NumPy is used when installed, with a pure-Python fallback otherwise
+"""
+import weakref
+from datetime import date, timedelta
+from typing import List, Optional, Dict, Any, Iterator, Sequence
+
+from cohort_aggregation import encode_column
+from mcp_schemas import TenantUserPartition, anniversary_in_year
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - exercised only without numpy
+    np = None
+
+GROUP_BY = ("manager", "department")
+DAYS_PER_YEAR = 365.25
+
+
+class HireDateColumns:
+    """One tenant's users as columns, for the roster version they were built from."""
+
+    def __init__(self, partition: TenantUserPartition):
+        self.version = partition.version
+        self.users = list(partition.users.values())
+        hire_dates = [user.hire_date for user in self.users]
+        self.group_codes = {
+            "manager": encode_column([user.manager_id for user in self.users]),
+            "department": encode_column([user.department for user in self.users]),
+        }
+        if np is not None:
+            self.hire_dates = np.array([value or "NaT" for value in hire_dates], dtype="datetime64[D]")
+            self.valid = ~np.isnat(self.hire_dates)
+            years = self.hire_dates.astype("datetime64[Y]")
+            months = self.hire_dates.astype("datetime64[M]")
+            self.hire_year = years.astype(np.int64) + 1970
+            self.month = (months - years.astype("datetime64[M]")).astype(np.int64)
+            self.day = (self.hire_dates - months.astype("datetime64[D]")).astype(np.int64)
+            self.group_codes = {name: (np.asarray(codes, dtype=np.int64), labels)
+                                for name, (codes, labels) in self.group_codes.items()}
+        else:
+            self.hire_dates = [date.fromisoformat(value) if isinstance(value, str) else value for value in hire_dates]
+
+
+_columns: "weakref.WeakKeyDictionary[TenantUserPartition, HireDateColumns]" = weakref.WeakKeyDictionary()
+
+
+def columns_for(partition: TenantUserPartition) -> HireDateColumns:
+    columns = _columns.get(partition)
+    if columns is None or columns.version != partition.version:
+        columns = _columns[partition] = HireDateColumns(partition)
+    return columns
+
+
+class UpcomingMilestones:
+    """Everyone reaching one of ``milestone_years`` of service in [as_of, as_of + days].
+
+    ``rows`` are positions into ``columns.users``, ordered by group label
+    and then anniversary date, with the matching ``anniversaries``,
+    ``years`` and live ``tenure`` per row.
+    """
+
+    def __init__(self, partition: TenantUserPartition, as_of: date, days: int, milestone_years: Sequence[int],
+                 group_by: str = "manager"):
+        if group_by not in GROUP_BY:
+            raise ValueError(f"group_by must be one of {', '.join(GROUP_BY)}")
+        self.partition = partition
+        self.columns = columns_for(partition)
+        self.as_of = as_of
+        self.end = as_of + timedelta(days=days)
+        self.days = days
+        self.milestone_years = sorted(set(milestone_years))
+        self.group_by = group_by
+        codes, self.labels = self.columns.group_codes[group_by]
+        # Rank of each group label, so groups come out sorted by label with None last
+        rank = {label: i for i, label in enumerate(sorted(self.labels, key=lambda label: (label is None, str(label))))}
+        self._vectorized = np is not None
+        if self._vectorized:
+            self._compute_numpy(codes, rank)
+        else:
+            self._compute_python(codes, rank)
+
+    def _compute_numpy(self, codes: Any, rank: Dict[Any, int]) -> None:
+        columns = self.columns
+        start, end = np.datetime64(self.as_of, "D"), np.datetime64(self.end, "D")
+        wanted_years = np.asarray(self.milestone_years, dtype=np.int64)
+        rows, anniversaries, years = [], [], []
+        for year in range(self.as_of.year, self.end.year + 1):
+            service = year - columns.hire_year
+            candidates = np.flatnonzero(columns.valid & np.isin(service, wanted_years))
+            if not len(candidates):
+                continue
+            month_start = ((year - 1970) * 12 + columns.month[candidates]).astype("datetime64[M]")
+            first_day = month_start.astype("datetime64[D]")
+            month_length = ((month_start + 1).astype("datetime64[D]") - first_day).astype(np.int64)
+            # Feb 29 hires celebrate on Feb 28 in non-leap years
+            anniversary = first_day + np.minimum(columns.day[candidates], month_length - 1)
+            inside = (anniversary >= start) & (anniversary <= end)
+            rows.append(candidates[inside])
+            anniversaries.append(anniversary[inside])
+            years.append(service[candidates[inside]])
+        if rows:
+            rows, anniversaries, years = np.concatenate(rows), np.concatenate(anniversaries), np.concatenate(years)
+        else:
+            rows, anniversaries, years = (np.empty(0, dtype=np.int64), np.empty(0, dtype="datetime64[D]"),
+                                          np.empty(0, dtype=np.int64))
+        ranks = np.asarray([rank[label] for label in self.labels], dtype=np.int64)
+        order = np.lexsort((rows, anniversaries, ranks[codes[rows]]))
+        self.rows = rows[order]
+        self.anniversaries = anniversaries[order]
+        self.years = years[order]
+        self.group_codes = codes[self.rows]
+        elapsed = (start - columns.hire_dates[columns.valid]).astype(np.int64)
+        self.headcount = int(columns.valid.sum())
+        self.average_tenure = float(elapsed.mean() / DAYS_PER_YEAR) if self.headcount else None
+        self.tenure = (start - columns.hire_dates[self.rows]).astype(np.int64) / DAYS_PER_YEAR
+
+    def _compute_python(self, codes: List[int], rank: Dict[Any, int]) -> None:
+        found = []
+        wanted = set(self.milestone_years)
+        tenure_days = []
+        for row, hired in enumerate(self.columns.hire_dates):
+            if hired is None:
+                continue
+            tenure_days.append((self.as_of - hired).days)
+            for year in range(self.as_of.year, self.end.year + 1):
+                anniversary = anniversary_in_year(hired, year)
+                if year - hired.year in wanted and self.as_of <= anniversary <= self.end:
+                    found.append((rank[self.labels[codes[row]]], anniversary, row, year - hired.year))
+        found.sort()
+        self.rows = [row for _, _, row, _ in found]
+        self.anniversaries = [anniversary for _, anniversary, _, _ in found]
+        self.years = [years for _, _, _, years in found]
+        self.group_codes = [codes[row] for row in self.rows]
+        self.headcount = len(tenure_days)
+        self.average_tenure = sum(tenure_days) / len(tenure_days) / DAYS_PER_YEAR if tenure_days else None
+        self.tenure = [(self.as_of - self.columns.hire_dates[row]).days / DAYS_PER_YEAR for row in self.rows]
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def by_milestone(self) -> Dict[str, int]:
+        counts = dict.fromkeys(self.milestone_years, 0)
+        for years in (self.years.tolist() if self._vectorized else self.years):
+            counts[years] += 1
+        return {f"{years}_years": count for years, count in counts.items()}
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "celebrants": len(self),
+            "groups": len(set(self.group_codes.tolist() if self._vectorized else self.group_codes)),
+            "by_milestone": self.by_milestone(),
+            "headcount": self.headcount,
+            "average_tenure_years": round(self.average_tenure, 2) if self.average_tenure is not None else None,
+        }
+
+    def _celebrant(self, row: int, anniversary: date, years: int, tenure: float) -> Dict[str, Any]:
+        user = self.columns.users[row]
+        return {
+            "user_id": user.user_id,
+            "name": user.name,
+            "title": user.title,
+            "department": user.department,
+            "team": user.team,
+            "manager_id": user.manager_id,
+            "hire_date": str(user.hire_date),
+            "anniversary_date": anniversary.isoformat(),
+            "milestone_years": years,
+            "days_until": (anniversary - self.as_of).days,
+            "tenure_years": round(tenure, 2),
+        }
+
+    def groups(self, limit: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """One dict per group in order, with its celebrants; stops after ``limit`` celebrants in total."""
+        if self._vectorized:
+            rows, years, codes = self.rows.tolist(), self.years.tolist(), self.group_codes.tolist()
+            anniversaries, tenure = self.anniversaries.tolist(), self.tenure.tolist()
+        else:
+            rows, years, codes, anniversaries, tenure = (self.rows, self.years, self.group_codes,
+                                                         self.anniversaries, self.tenure)
+        count = len(rows) if limit is None else min(limit, len(rows))
+        i = 0
+        while i < count:
+            code = codes[i]
+            label = self.labels[code]
+            group = {"group_by": self.group_by, "group": label}
+            if self.group_by == "manager":
+                manager = self.partition.get(label) if label is not None else None
+                group["manager_name"] = manager.name if manager is not None else None
+            celebrants = []
+            while i < count and codes[i] == code:
+                celebrants.append(self._celebrant(rows[i], anniversaries[i], years[i], tenure[i]))
+                i += 1
+            group["count"] = len(celebrants)
+            group["celebrants"] = celebrants
+            yield group